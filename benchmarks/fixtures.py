@@ -0,0 +1,130 @@
+import json
+import os
+import random
+
+from core.config import PlaylistConfig
+from core.models.playlist import CuratedPlaylist, CuratedPlaylistItem
+
+WORDS = (
+    "the record was cut in a single afternoon while the band argued about tempo and the "
+    "producer kept the tape rolling long after the session was supposed to end this is "
+    "where the sound of the city found its way onto vinyl radio stations picked it up "
+    "within weeks and a generation of musicians learned the groove by ear"
+).split()
+
+# Average track length used to pick a plausible config duration
+TRACK_SECONDS = 210
+NARRATION_WORDS_PER_SECOND = 2.5
+MAX_CONFIG_SECONDS = 3 * 60 * 60
+
+
+def synthetic_track_id(index: int) -> str:
+    """Deterministic 11-char YouTube-style video id."""
+    return f"vid{index:08d}"
+
+
+def synthetic_narration(rng: random.Random, min_words: int = 40, max_words: int = 160) -> str:
+    count = rng.randint(min_words, max_words)
+    words = [rng.choice(WORDS) for _ in range(count)]
+    sentences = []
+    for start in range(0, len(words), 12):
+        chunk = words[start:start + 12]
+        sentences.append(" ".join(chunk).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def _tracks_per_gap(segments: int, tracks: int) -> list:
+    """Spreads `tracks` as evenly as possible over the gaps after each segment but the last."""
+    gaps = max(1, segments - 1)
+    base, extra = divmod(tracks, gaps)
+    return [base + (1 if i < extra else 0) for i in range(gaps)]
+
+
+def synthetic_script(segments: int, image_base_url: str = None, seed: int = 0, tracks: int = None,
+                     min_words: int = 40, max_words: int = 160) -> str:
+    """
+    Builds a raw LLM-style script with `segments` narrative segments and `tracks` tracks
+    (default: one between each pair of segments), in the [TITLE]/[IMAGE_URL]/[TRACK]
+    format verify_curation_node parses.
+    """
+    rng = random.Random(seed)
+    if tracks is None:
+        tracks = max(0, segments - 1)
+    per_gap = _tracks_per_gap(segments, tracks)
+
+    lines = [f"[TITLE: Synthetic Benchmark Playlist ({segments} segments)]", ""]
+    track_index = 0
+    for i in range(segments):
+        lines.append(f"**(Part {i + 1})**")
+        lines.append(synthetic_narration(rng, min_words, max_words))
+        if image_base_url:
+            lines.append(f"[IMAGE_URL: {image_base_url}/images/segment_{i + 1:03d}.jpg]")
+        lines.append("")
+        if i < len(per_gap):
+            for _ in range(per_gap[i]):
+                track_index += 1
+                lines.append(f"[TRACK: Song {track_index} by Artist {track_index % 7 + 1} | ID: {synthetic_track_id(track_index)}]")
+                lines.append("")
+    return "\n".join(lines)
+
+
+def estimated_duration(segments: int, tracks: int, min_words: int, max_words: int) -> str:
+    """Config duration for a fixture, clamped to what PlaylistConfig accepts."""
+    narration = segments * (min_words + max_words) / 2 / NARRATION_WORDS_PER_SECOND
+    seconds = min(MAX_CONFIG_SECONDS, max(60, int(tracks * TRACK_SECONDS + narration)))
+    return f"{seconds // 60}m"
+
+
+def curated_playlist_from_script(script: str, topic: str) -> CuratedPlaylist:
+    """
+    The curated_playlist.json verify_curation_node would produce if every track verified:
+    the script goes through the production parser, then tracks get the details YTMusic would add.
+    """
+    from curation.nodes import _extract_title, _parse_script_items
+
+    title, body = _extract_title(script)
+    items, _, _ = _parse_script_items(body, yt=None, skip_validation=True)
+    for i, item in enumerate(items):
+        if item.type == "track":
+            song, _, artist = item.original_ref.partition(" by ")
+            items[i] = CuratedPlaylistItem.make_track(
+                video_id=item.video_id, title=song, artist=artist, duration=TRACK_SECONDS, original_ref=item.original_ref
+            )
+
+    return CuratedPlaylist(title=title or topic, topic=topic, items=items)
+
+
+def write_playlist_fixture(playlist_dir: str, segments: int, tracks: int = None, image_base_url: str = None,
+                           seed: int = 0, min_words: int = 40, max_words: int = 160,
+                           system_prompt: str = "default") -> CuratedPlaylist:
+    """
+    Writes config.json, prompt.txt, response.txt and curated_playlist.json for a synthetic
+    playlist. prompt.txt matches what curate_playlist_node builds, so the graph resumes from
+    response.txt without an LLM call and verify_curation_node and every later node run on it.
+    """
+    from curation.nodes import build_curation_prompt
+
+    if tracks is None:
+        tracks = max(0, segments - 1)
+    topic = f"Synthetic Playlist ({segments} segments, {tracks} tracks)"
+    os.makedirs(playlist_dir, exist_ok=True)
+
+    config = {
+        "topic": topic,
+        "duration": estimated_duration(segments, tracks, min_words, max_words),
+        "system_prompt": system_prompt,
+    }
+    with open(os.path.join(playlist_dir, "config.json"), "w") as f:
+        json.dump(config, f, indent=4)
+
+    _, _, full_prompt_text = build_curation_prompt(PlaylistConfig(**config))
+    script = synthetic_script(segments, image_base_url=image_base_url, seed=seed, tracks=tracks,
+                              min_words=min_words, max_words=max_words)
+    with open(os.path.join(playlist_dir, "prompt.txt"), "w") as f:
+        f.write(full_prompt_text)
+    with open(os.path.join(playlist_dir, "response.txt"), "w") as f:
+        f.write(script)
+
+    curated = curated_playlist_from_script(script, topic)
+    curated.save(playlist_dir)
+    return curated
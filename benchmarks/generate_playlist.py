@@ -0,0 +1,66 @@
+"""
+Generates a synthetic playlist of arbitrary size for scale testing, without LLM calls.
+
+Writes config.json, prompt.txt, response.txt and curated_playlist.json under
+data/playlists/<playlist_id>/. Image URLs point at a local image host; pass
+--serve-images to keep one running while you run the curator against the fixture.
+
+Usage:
+    python -m benchmarks.generate_playlist scale_200 --segments 200 --tracks 400 --serve-images
+    python curator.py scale_200          # in another shell (patch YTMusic or use --skip-validation)
+"""
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixtures import write_playlist_fixture
+from benchmarks.stubs import FakeWikimediaHost
+from core.config import get_playlist_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic playlist fixture")
+    parser.add_argument("playlist_id", help="ID/name of the playlist to create (under data/playlists/)")
+    parser.add_argument("--segments", type=int, default=20, help="Number of narrative segments")
+    parser.add_argument("--tracks", type=int, default=None, help="Number of tracks (default: segments - 1)")
+    parser.add_argument("--min-words", type=int, default=40, help="Shortest narration segment, in words")
+    parser.add_argument("--max-words", type=int, default=160, help="Longest narration segment, in words")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same fixture)")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the local image host the URLs point at")
+    parser.add_argument("--no-images", action="store_true", help="Don't emit [IMAGE_URL] tags")
+    parser.add_argument("--serve-images", action="store_true", help="Keep serving images on --port until Ctrl-C")
+    args = parser.parse_args()
+
+    playlist_dir = get_playlist_dir(args.playlist_id)
+    image_base_url = None if args.no_images else f"http://127.0.0.1:{args.port}"
+
+    curated = write_playlist_fixture(
+        playlist_dir,
+        segments=args.segments,
+        tracks=args.tracks,
+        image_base_url=image_base_url,
+        seed=args.seed,
+        min_words=args.min_words,
+        max_words=args.max_words,
+    )
+    narrations = sum(1 for i in curated.items if i.type == "narrative")
+    tracks = sum(1 for i in curated.items if i.type == "track")
+    print(f"✅ Wrote synthetic playlist to {playlist_dir}: {narrations} narrations, {tracks} tracks")
+
+    if args.serve_images:
+        host = FakeWikimediaHost().start(port=args.port)
+        print(f"🖼️  Serving images at {host.url}/images/ (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            host.stop()
+
+
+if __name__ == "__main__":
+    main()
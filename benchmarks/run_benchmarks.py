@@ -0,0 +1,224 @@
+"""
+End-to-end throughput benchmark for the curation graph.
+
+Runs build_workflow against local stand-ins (fake OpenRouter, fake YTMusic, a local
+image host in place of Wikimedia) with synthetic playlists, records per-stage wall
+time and compares it against a stored baseline.
+
+Usage:
+    python -m benchmarks.run_benchmarks                    # 5, 20 and 80 segments
+    python -m benchmarks.run_benchmarks --sizes 5 20 --repeat 3
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixtures import synthetic_script
+from benchmarks.stubs import FakeOpenRouter, FakeWikimediaHost, FakeYTMusic
+from core import rate_limit
+from core.clients import reset_clients
+
+DEFAULT_SIZES = [5, 20, 80]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+MODEL_FILES = ["kokoro-v1.0.onnx", "voices-v1.0.bin"]
+
+
+def full_pipeline_available() -> bool:
+    """Kokoro models and ffmpeg are needed for the speech/video stages."""
+    models_ok = all(os.path.exists(os.path.join(REPO_ROOT, "models", f)) for f in MODEL_FILES)
+    return models_ok and shutil.which("ffmpeg") is not None
+
+
+def make_timing_wrapper(timings: dict, memory: dict = None):
+    """Records wall time per node; with a memory dict also the tracemalloc peak (MB) per node."""
+    def wrap(name, node_fn):
+        def timed(state):
+            if memory is not None:
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                return node_fn(state)
+            finally:
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+                if memory is not None:
+                    memory[name] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        return timed
+    return wrap
+
+
+def prepare_workdir(workdir: str, playlist_id: str, segments: int, llm_base_url: str):
+    os.symlink(os.path.join(REPO_ROOT, "models"), os.path.join(workdir, "models"))
+    with open(os.path.join(workdir, "config.json"), "w") as f:
+        json.dump({
+            "model": "stub/benchmark-model",
+            "openrouter_api_key": "benchmark",
+            "openrouter_base_url": llm_base_url,
+        }, f)
+
+    playlist_dir = os.path.join(workdir, "data", "playlists", playlist_id)
+    os.makedirs(playlist_dir)
+    # Rough duration: ~3.5 minutes per track, capped by PlaylistConfig's limit
+    minutes = min(180, max(1, int((segments - 1) * 3.5)))
+    with open(os.path.join(playlist_dir, "config.json"), "w") as f:
+        json.dump({"topic": f"Benchmark {segments}", "duration": f"{minutes}m", "system_prompt": "default"}, f)
+
+
+UNLIMITED = (1e9, 10 ** 9)
+
+
+def run_once(segments: int, inference_only: bool, tracks: int = None, memory: dict = None) -> dict:
+    """Runs the graph once in a scratch directory and returns {stage: seconds}."""
+    playlist_id = f"bench_{segments}"
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="curator_bench_")
+    timings = {}
+
+    if memory is not None:
+        tracemalloc.start()
+    try:
+        with FakeWikimediaHost() as images:
+            script = synthetic_script(segments, image_base_url=images.url, tracks=tracks)
+            with FakeOpenRouter(script) as llm:
+                prepare_workdir(workdir, playlist_id, segments, llm.base_url)
+                os.chdir(workdir)
+
+                # Imported after chdir: the TTS engine loads models/ relative to the CWD
+                from curator import build_workflow
+
+                reset_clients()
+                rate_limit.reset_guards()
+                # The stand-ins are local: measure our code, not the per-host rate limits
+                with patch("ytmusicapi.YTMusic", FakeYTMusic), \
+                        patch.dict(rate_limit.HOST_LIMITS, clear=True), patch.object(rate_limit, "DEFAULT_LIMIT", UNLIMITED):
+                    app = build_workflow(inference_only=inference_only, node_wrapper=make_timing_wrapper(timings, memory))
+                    start = time.perf_counter()
+                    app.invoke({"playlist_id": playlist_id})
+                    timings["total"] = time.perf_counter() - start
+    finally:
+        if memory is not None:
+            tracemalloc.stop()
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return timings
+
+
+def run_size(segments: int, repeat: int, inference_only: bool, tracks: int = None, memory: dict = None) -> dict:
+    """Best-of-N per stage, which is less noisy than the mean for wall-clock timings."""
+    best = {}
+    for _ in range(repeat):
+        for stage, seconds in run_once(segments, inference_only, tracks=tracks, memory=memory).items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+    return best
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float, min_delta: float) -> list:
+    """Returns a list of human-readable regression messages (empty if none)."""
+    regressions = []
+    for size, stages in results.items():
+        base_stages = baseline.get(size, {})
+        for stage, seconds in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            if seconds > base * (1 + tolerance) and seconds - base > min_delta:
+                regressions.append(
+                    f"{size} segments / {stage}: {seconds:.3f}s vs baseline {base:.3f}s (+{(seconds / base - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def print_table(results: dict, baseline: dict):
+    stages = []
+    for per_size in results.values():
+        for stage in per_size:
+            if stage not in stages:
+                stages.append(stage)
+
+    print(f"\n{'stage':<20}" + "".join(f"{size + ' seg':>18}" for size in results))
+    for stage in stages:
+        row = f"{stage:<20}"
+        for size, per_size in results.items():
+            value = per_size.get(stage)
+            base = baseline.get(size, {}).get(stage)
+            if value is None:
+                row += f"{'-':>18}"
+            elif base:
+                row += f"{value:>9.3f}s ({value / base:>4.2f}x)"
+            else:
+                row += f"{value:>17.3f}s"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the curation graph against local stand-ins")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Number of narrative segments per synthetic playlist")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size (best time per stage is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging a regression")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--tracks-per-segment", type=float, default=None, help="Tracks per narrative segment (default: one between each pair)")
+    parser.add_argument("--memory", action="store_true", help="Also report peak traced memory per stage (slower; not compared to the baseline)")
+    parser.add_argument("--inference-only", action="store_true", help="Only benchmark curate_playlist and verify_curation")
+    args = parser.parse_args()
+
+    inference_only = args.inference_only
+    if not inference_only and not full_pipeline_available():
+        print("⚠️ Kokoro models or ffmpeg not found; benchmarking curation stages only.")
+        inference_only = True
+
+    results = {}
+    memory_results = {}
+    for segments in args.sizes:
+        print(f"🏁 Benchmarking {segments} segments...")
+        tracks = int(segments * args.tracks_per_segment) if args.tracks_per_segment is not None else None
+        memory = {} if args.memory else None
+        results[str(segments)] = run_size(segments, args.repeat, inference_only, tracks=tracks, memory=memory)
+        if memory is not None:
+            memory_results[str(segments)] = memory
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+    if memory_results:
+        print("\nPeak traced memory (MB):")
+        for size, per_stage in memory_results.items():
+            print(f"  {size} segments: " + ", ".join(f"{stage}={mb:.1f}" for stage, mb in per_stage.items()))
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=4)
+        print(f"\n💾 Baseline written to {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}. Run with --update-baseline to record one.")
+        return
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        print("\n❌ Regressions detected:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Deterministic local stand-ins for the external services the curation graph talks to.
+Everything binds to 127.0.0.1 on an ephemeral port and runs in a background thread.
+"""
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """Base class: runs a handler class on a local ThreadingHTTPServer. Use as a context manager."""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self):
+        self.server = None
+        self.thread = None
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.request_count += 1
+
+    def start(self, port: int = 0):
+        stub = self
+
+        class Handler(self.handler_class):
+            def log_message(self, format, *args):
+                pass
+
+        Handler.stub = stub
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _OpenRouterHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.stub.count_request()
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        if self.stub.latency:
+            time.sleep(self.stub.latency)
+
+        content = self.stub.script
+        model = body.get("model", "stub-model")
+        created = int(time.time())
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            size = self.stub.chunk_size
+            chunks = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+            for i, piece in enumerate(chunks):
+                delta = {"content": piece}
+                if i == 0:
+                    delta["role"] = "assistant"
+                self._send_event({
+                    "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                    "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                })
+            self._send_event({
+                "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            })
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            return
+
+        payload = json.dumps({
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_event(self, data: dict):
+        self.wfile.write(f"data: {json.dumps(data)}\n\n".encode())
+
+
+class FakeOpenRouter(StubServer):
+    """OpenAI-compatible /chat/completions endpoint that replays a canned script as the final answer."""
+
+    handler_class = _OpenRouterHandler
+
+    def __init__(self, script: str, latency: float = 0.0, chunk_size: int = 256):
+        super().__init__()
+        self.script = script
+        self.latency = latency
+        self.chunk_size = chunk_size
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/api/v1"
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.stub.count_request()
+        if not self.path.startswith("/images/"):
+            self.send_error(404)
+            return
+        payload = self.stub.image_bytes
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeWikimediaHost(StubServer):
+    """Serves the same generated JPEG for every /images/<name>.jpg, standing in for upload.wikimedia.org."""
+
+    handler_class = _ImageHandler
+
+    def __init__(self, size=(1280, 720)):
+        super().__init__()
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new("RGB", size, color=(120, 80, 40)).save(buf, format="JPEG")
+        self.image_bytes = buf.getvalue()
+
+
+class FakeYTMusic:
+    """In-process stand-in for ytmusicapi.YTMusic (its innertube protocol isn't worth emulating over HTTP)."""
+
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_song(self, video_id):
+        FakeYTMusic.calls += 1
+        return {
+            "videoDetails": {
+                "videoId": video_id,
+                "title": f"Title for {video_id}",
+                "author": "Benchmark Artist",
+                "lengthSeconds": "210",
+            }
+        }
+
+    def search(self, query, filter=None, limit=3):
+        FakeYTMusic.calls += 1
+        return [
+            {"title": f"{query} #{i}", "artists": [{"name": "Benchmark Artist"}], "videoId": f"srch{i:07d}"}
+            for i in range(limit)
+        ]
@@ -0,0 +1,153 @@
+"""
+Throughput and API-call benchmark for the YouTube sync scripts (post_upload.py and
+update_youtube_playlist.py), run against the local FakeYouTube server.
+
+For each size it uploads synthetic narration parts into a manual playlist, then runs:
+    enrich   post_upload.main on the manual playlist
+    sync     update_youtube_playlist.main (songs inserted, metadata, podcast playlist)
+    noop     the same again with nothing to change
+    reorder  after shuffling part of the playlist on the server
+and reports wall time, HTTP round-trips, API calls and quota units per step.
+
+Usage:
+    python -m benchmarks.sync_benchmark
+    python -m benchmarks.sync_benchmark --sizes 30 150 --latency 0.05 --page-size 20
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixtures import write_playlist_fixture
+from benchmarks.youtube_stub import FakeYouTube
+
+DEFAULT_SIZES = [10, 30, 100]
+PODCAST_BACKLOG = 200
+
+
+def prepare(workdir, fake, segments, seed):
+    """Writes configs and the curated playlist and seeds the fake channel. Returns (playlist_dir, manual_id, podcast_id)."""
+    playlist_dir = os.path.join(workdir, "data", "playlists", f"sync_{segments}")
+    curated = write_playlist_fixture(playlist_dir, segments, seed=seed)
+
+    for item in curated.items:
+        if item.type == "track":
+            fake.add_video(item.video_id, title=item.title)
+
+    # Uploaded narration parts, titled by filename as YouTube does for uploads
+    uploads = []
+    for part in range(1, segments + 1):
+        uploads.append(fake.add_video(f"nar{part:08d}", title=f"part_{part:03d}.mp4"))
+    manual_id = fake.add_playlist("Manual uploads", uploads)
+
+    # Podcast playlist with earlier episodes from other playlists
+    podcast_id = fake.add_playlist("Podcast", [fake.add_video(f"old{i:08d}") for i in range(PODCAST_BACKLOG)])
+
+    with open(os.path.join(workdir, "config.json"), "w") as f:
+        json.dump({"channel_id": fake.channel_id, "podcast_playlist_id": podcast_id, "youtube_daily_quota": 10 ** 9}, f)
+    return playlist_dir, manual_id, podcast_id
+
+
+def run_step(fake, fn, argv, verbose=False):
+    """Runs one script main() and returns its counters."""
+    import yt_music.client
+
+    yt_music.client._list_cache = None
+    fake.reset_counters()
+    output = StringIO()
+    start = time.perf_counter()
+    with patch.object(sys, "argv", argv), \
+            patch("yt_music.post_upload.get_authenticated_service", fake.service), \
+            patch("yt_music.update_youtube_playlist.get_authenticated_service", fake.service):
+        if verbose:
+            fn()
+        else:
+            with redirect_stdout(output):
+                fn()
+    return {
+        "seconds": time.perf_counter() - start,
+        "round_trips": fake.request_count,
+        "calls": sum(fake.calls.values()),
+        "units": fake.quota_used,
+        "by_method": dict(fake.calls),
+    }
+
+
+def run_size(segments, latency, page_size, seed=0, verbose=False):
+    from core.models.playlist import CuratedPlaylist
+    from yt_music import post_upload, update_youtube_playlist
+
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="sync_bench_")
+    results = {}
+    try:
+        with FakeYouTube(page_size=page_size, latency=latency) as fake:
+            os.chdir(workdir)
+            playlist_dir, manual_id, _ = prepare(workdir, fake, segments, seed)
+            rel_dir = os.path.relpath(playlist_dir, workdir)
+
+            results["enrich"] = run_step(fake, post_upload.main, ["post_upload.py", rel_dir, "--playlist-id", manual_id], verbose)
+            update = ["update_youtube_playlist.py", rel_dir]
+            results["sync"] = run_step(fake, update_youtube_playlist.main, update, verbose)
+
+            desired = [item.video_id for item in CuratedPlaylist.load(playlist_dir).items if item.video_id]
+            if fake.playlist_video_ids(manual_id) != desired:
+                raise RuntimeError("Playlist does not match curated_playlist.json after sync")
+
+            results["noop"] = run_step(fake, update_youtube_playlist.main, update, verbose)
+
+            items = fake.items[manual_id]
+            rng = random.Random(seed)
+            window = items[:max(2, len(items) // 5)]
+            rng.shuffle(window)
+            items[:len(window)] = window
+            results["reorder"] = run_step(fake, update_youtube_playlist.main, update, verbose)
+            if fake.playlist_video_ids(manual_id) != desired:
+                raise RuntimeError("Playlist does not match curated_playlist.json after reorder")
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def print_results(all_results):
+    print(f"\n{'size':>6} {'step':<9}{'seconds':>10}{'round-trips':>13}{'calls':>8}{'units':>8}")
+    for size, steps in all_results.items():
+        for step, r in steps.items():
+            print(f"{size:>6} {step:<9}{r['seconds']:>10.3f}{r['round_trips']:>13}{r['calls']:>8}{r['units']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the YouTube sync scripts against a local fake API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Narration segments per synthetic playlist")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds of simulated latency per HTTP request")
+    parser.add_argument("--page-size", type=int, default=50, help="Largest page the fake API returns")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the scripts' own output")
+    args = parser.parse_args()
+
+    all_results = {}
+    for segments in args.sizes:
+        print(f"🏁 Syncing {segments} segments ({2 * segments - 1} items)...")
+        all_results[str(segments)] = run_size(segments, args.latency, args.page_size, verbose=args.verbose)
+
+    print_results(all_results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(all_results, f, indent=4)
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
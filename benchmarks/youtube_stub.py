@@ -0,0 +1,313 @@
+"""
+In-process fake of the parts of the YouTube Data API v3 the yt_music scripts use:
+playlists, playlistItems and videos (list/insert/update/delete) plus the multipart
+/batch endpoint, served over real HTTP so googleapiclient's pagination, batching,
+conditional requests and error handling run unmodified.
+
+    with FakeYouTube(page_size=50, latency=0.02, quota_limit=10000) as fake:
+        playlist_id = fake.add_playlist("My playlist", video_ids=[...])
+        youtube = fake.service()   # use instead of get_authenticated_service()
+
+Quota is charged like the real API (1 unit per list, 50 per write); once quota_limit
+is reached every call fails with 403 quotaExceeded. `fields=` masks are accepted but
+not applied, so response sizes are those of the unmasked API.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from email.parser import Parser
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.stubs import StubServer
+
+API_PREFIX = "/youtube/v3/"
+WRITE_COST = 50
+LIST_COST = 1
+
+
+class ApiError(Exception):
+    def __init__(self, status, reason, message=""):
+        super().__init__(message or reason)
+        self.status = status
+        self.reason = reason
+
+    def body(self):
+        return {"error": {"code": self.status, "message": str(self), "errors": [{"reason": self.reason, "message": str(self)}]}}
+
+
+def _etag(payload) -> str:
+    return hashlib.md5(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class _YouTubeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        stub = self.stub
+        stub.count_request()
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if self.path.rstrip("/") == "/batch":
+            self._send_batch(body)
+            return
+        status, payload = stub.dispatch(self.command, self.path, dict(self.headers), body)
+        self._send(status, payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_batch(self, body):
+        content_type = self.headers.get("Content-Type", "")
+        message = Parser().parsestr(f"Content-Type: {content_type}\r\n\r\n" + body.decode("utf-8"))
+        boundary = uuid.uuid4().hex
+        out = []
+        for part in message.get_payload():
+            request_text = part.get_payload()
+            request_line, rest = request_text.split("\n", 1)
+            method, path, _ = request_line.split(" ", 2)
+            inner = Parser().parsestr(rest)
+            inner_body = inner.get_payload().encode("utf-8") if inner.get_payload() else b""
+            status, payload = self.stub.dispatch(method, path, dict(inner.items()), inner_body)
+            data = json.dumps(payload) if payload is not None else ""
+            content_id = part["Content-ID"].strip("<>")
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\nContent-Length: {len(data)}\r\n\r\n{data}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        data = "".join(out).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeYouTube(StubServer):
+    """Fake YouTube Data API v3; see the module docstring."""
+
+    handler_class = _YouTubeHandler
+
+    def __init__(self, page_size: int = 50, latency: float = 0.0, quota_limit: int = None, channel_id: str = "UC_FAKE_CHANNEL"):
+        super().__init__()
+        self.page_size = page_size
+        self.latency = latency
+        self.quota_limit = quota_limit
+        self.channel_id = channel_id
+        self.quota_used = 0
+        self.calls = {}
+        self.playlists = {}   # id -> {"title", "description"}
+        self.items = {}       # playlist id -> [{"id", "videoId"}]
+        self.videos = {}      # id -> {"snippet": {...}, "status": {...}}
+        self._state_lock = threading.Lock()
+        self._next_id = 0
+
+    # --- Fixture setup -------------------------------------------------------
+
+    def _new_id(self, prefix):
+        self._next_id += 1
+        return f"{prefix}{self._next_id:08d}"
+
+    def add_video(self, video_id: str, title: str = None, description: str = "", **status):
+        self.videos[video_id] = {
+            "snippet": {"title": title or video_id, "description": description, "categoryId": "22", "channelId": self.channel_id},
+            "status": {"privacyStatus": "private", "selfDeclaredMadeForKids": False, **status},
+        }
+        return video_id
+
+    def add_playlist(self, title: str, video_ids=(), description: str = "", playlist_id: str = None) -> str:
+        playlist_id = playlist_id or self._new_id("PL")
+        self.playlists[playlist_id] = {"title": title, "description": description}
+        self.items[playlist_id] = []
+        for video_id in video_ids:
+            if video_id not in self.videos:
+                self.add_video(video_id)
+            self.items[playlist_id].append({"id": self._new_id("PLI"), "videoId": video_id})
+        return playlist_id
+
+    def playlist_video_ids(self, playlist_id: str) -> list:
+        return [item["videoId"] for item in self.items.get(playlist_id, [])]
+
+    def reset_counters(self):
+        self.calls = {}
+        self.quota_used = 0
+        self.request_count = 0
+
+    def service(self):
+        """A googleapiclient service object pointed at this server (no auth)."""
+        import httplib2
+        from googleapiclient.discovery import build_from_document
+        from googleapiclient.discovery_cache import get_static_doc
+
+        document = json.loads(get_static_doc("youtube", "v3"))
+        document["rootUrl"] = self.url + "/"
+        return build_from_document(document, http=httplib2.Http())
+
+    # --- API -----------------------------------------------------------------
+
+    def dispatch(self, method, path, headers, body):
+        """Returns (status, payload) for one API call."""
+        parsed = urlparse(path)
+        if not parsed.path.startswith(API_PREFIX):
+            return 404, ApiError(404, "notFound").body()
+        resource = parsed.path[len(API_PREFIX):].strip("/")
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        verb = {"GET": "list", "POST": "insert", "PUT": "update", "DELETE": "delete"}.get(method)
+        name = f"{resource}.{verb}"
+        cost = LIST_COST if verb == "list" else WRITE_COST
+
+        with self._state_lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self.quota_limit is not None and self.quota_used + cost > self.quota_limit:
+                return 403, ApiError(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota.").body()
+            self.quota_used += cost
+            try:
+                handler = getattr(self, f"_{resource}_{verb}", None)
+                if handler is None:
+                    raise ApiError(404, "notFound", f"{name} is not implemented by the fake")
+                payload = handler(params, json.loads(body) if body else {})
+            except ApiError as e:
+                return e.status, e.body()
+
+        if verb == "list":
+            etag = payload["etag"]
+            if headers.get("If-None-Match") == etag or headers.get("if-none-match") == etag:
+                return 304, None
+        return (204, None) if payload is None else (200, payload)
+
+    def _page(self, kind, resources, params):
+        page_size = min(int(params.get("maxResults", 5)), self.page_size)
+        start = int(params.get("pageToken", 0))
+        page = resources[start:start + page_size]
+        payload = {"kind": kind, "items": page, "pageInfo": {"totalResults": len(resources), "resultsPerPage": page_size}}
+        if start + page_size < len(resources):
+            payload["nextPageToken"] = str(start + page_size)
+        payload["etag"] = _etag(payload)
+        return payload
+
+    def _playlist_resource(self, playlist_id):
+        playlist = self.playlists[playlist_id]
+        resource = {
+            "kind": "youtube#playlist",
+            "id": playlist_id,
+            "snippet": {"title": playlist["title"], "description": playlist["description"], "channelId": self.channel_id,
+                        "thumbnails": {"default": {"url": f"https://i.ytimg.com/vi/{playlist_id}/default.jpg"}}},
+            "contentDetails": {"itemCount": len(self.items[playlist_id])},
+        }
+        resource["etag"] = _etag(resource)
+        return resource
+
+    def _playlists_list(self, params, _):
+        if "id" in params:
+            ids = [i for i in params["id"].split(",") if i in self.playlists]
+        else:
+            ids = list(self.playlists)
+        return self._page("youtube#playlistListResponse", [self._playlist_resource(i) for i in ids], params)
+
+    def _playlists_update(self, _, body):
+        playlist = self.playlists.get(body.get("id"))
+        if playlist is None:
+            raise ApiError(404, "playlistNotFound")
+        playlist["title"] = body["snippet"]["title"]
+        playlist["description"] = body["snippet"].get("description", "")
+        return self._playlist_resource(body["id"])
+
+    def _item_resource(self, playlist_id, position, item):
+        video = self.videos.get(item["videoId"], {"snippet": {"title": item["videoId"], "description": ""}})
+        resource = {
+            "kind": "youtube#playlistItem",
+            "id": item["id"],
+            "snippet": {
+                "playlistId": playlist_id,
+                "position": position,
+                "title": video["snippet"]["title"],
+                "description": video["snippet"]["description"],
+                "resourceId": {"kind": "youtube#video", "videoId": item["videoId"]},
+                "thumbnails": {"default": {"url": f"https://i.ytimg.com/vi/{item['videoId']}/default.jpg"}},
+            },
+            "contentDetails": {"videoId": item["videoId"]},
+        }
+        resource["etag"] = _etag(resource)
+        return resource
+
+    def _playlist_items(self, playlist_id):
+        if playlist_id not in self.items:
+            raise ApiError(404, "playlistNotFound")
+        return self.items[playlist_id]
+
+    def _playlistItems_list(self, params, _):
+        playlist_id = params.get("playlistId")
+        items = self._playlist_items(playlist_id)
+        resources = [self._item_resource(playlist_id, pos, item) for pos, item in enumerate(items)]
+        if "videoId" in params:
+            resources = [r for r in resources if r["contentDetails"]["videoId"] == params["videoId"]]
+        return self._page("youtube#playlistItemListResponse", resources, params)
+
+    def _playlistItems_insert(self, _, body):
+        snippet = body["snippet"]
+        items = self._playlist_items(snippet["playlistId"])
+        video_id = snippet["resourceId"]["videoId"]
+        if video_id not in self.videos:
+            raise ApiError(404, "videoNotFound")
+        position = snippet.get("position", len(items))
+        if position > len(items):
+            raise ApiError(400, "invalidPlaylistItemPosition")
+        item = {"id": self._new_id("PLI"), "videoId": video_id}
+        items.insert(position, item)
+        return self._item_resource(snippet["playlistId"], position, item)
+
+    def _find_item(self, item_id):
+        for playlist_id, items in self.items.items():
+            for pos, item in enumerate(items):
+                if item["id"] == item_id:
+                    return playlist_id, pos, item
+        raise ApiError(404, "playlistItemNotFound")
+
+    def _playlistItems_update(self, _, body):
+        playlist_id, pos, item = self._find_item(body["id"])
+        items = self.items[playlist_id]
+        position = body["snippet"].get("position", pos)
+        if position >= len(items):
+            raise ApiError(400, "invalidPlaylistItemPosition")
+        items.pop(pos)
+        items.insert(position, item)
+        return self._item_resource(playlist_id, position, item)
+
+    def _playlistItems_delete(self, params, _):
+        playlist_id, pos, _ = self._find_item(params.get("id"))
+        self.items[playlist_id].pop(pos)
+        return None
+
+    def _video_resource(self, video_id):
+        video = self.videos[video_id]
+        resource = {"kind": "youtube#video", "id": video_id, "snippet": dict(video["snippet"]), "status": dict(video["status"])}
+        resource["snippet"]["thumbnails"] = {"default": {"url": f"https://i.ytimg.com/vi/{video_id}/default.jpg"}}
+        resource["etag"] = _etag(resource)
+        return resource
+
+    def _videos_list(self, params, _):
+        ids = [i for i in params.get("id", "").split(",") if i in self.videos]
+        return self._page("youtube#videoListResponse", [self._video_resource(i) for i in ids], {**params, "maxResults": 50})
+
+    def _videos_update(self, _, body):
+        video = self.videos.get(body.get("id"))
+        if video is None:
+            raise ApiError(404, "videoNotFound")
+        video["snippet"].update(body.get("snippet", {}))
+        video["status"].update(body.get("status", {}))
+        return self._video_resource(body["id"])
@@ -5,7 +5,10 @@ class AgentState(TypedDict, total=False):
     # Core identifiers / flags
     playlist_id: str
     skip_validation: bool
+    cassette_mode: Optional[str]  # "record" / "replay" agent runs to/from cassette.json
 
     # Curation payload between nodes
     raw_script: Optional[str]  # The original LLM output with [TRACK] tags
+    raw_script_chapters: Optional[List[str]]  # Long-form: paths of per-chapter scripts on disk
     curated_playlist: Optional[dict]
+    curated_item_counts: Optional[dict]  # Long-form: item counts by type (items stay on disk)
@@ -0,0 +1,110 @@
+"""
+Shared clients for the services the curation tools and nodes talk to.
+
+Each client is created on first use and then reused for the whole run, so search
+tools and nodes share keep-alive connections instead of paying connection setup
+and client initialisation on every call. Creation is guarded by a lock; clients
+that are not safe to share between threads (DuckDuckGo) are kept per thread.
+"""
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "PlaylistCurator/0.1 ( http://example.com )"
+# Connections kept per host; tool calls run on up to max_tool_concurrency threads
+HTTP_POOL_SIZE = 16
+HTTP_RETRIES = 2
+
+# Reentrant: a factory may ask for another client (YTMusic needs the HTTP session)
+_lock = threading.RLock()
+_clients = {}
+_thread_clients = threading.local()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _get_or_create(name, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def _new_http_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_SIZE, max_retries=HTTP_RETRIES)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """requests.Session with a connection pool sized for parallel tool calls."""
+    return _get_or_create("http", _new_http_session)
+
+
+def get_ytmusic():
+    """Unauthenticated YTMusic (search, get_song) on the shared session."""
+    from ytmusicapi import YTMusic
+    return _get_or_create("ytmusic", lambda: YTMusic(requests_session=get_http_session()))
+
+
+def get_musicbrainz():
+    """
+    The musicbrainzngs module with our user agent set. It opens a urllib connection
+    per request, so there is nothing to pool; the async tools use the JSON API on the
+    shared client. Its own throttle is off: core.rate_limit spaces out the calls.
+    """
+    def configure():
+        import musicbrainzngs
+        musicbrainzngs.set_useragent("PlaylistCurator", "0.1", "http://example.com")
+        musicbrainzngs.set_rate_limit(False)
+        return musicbrainzngs
+
+    return _get_or_create("musicbrainz", configure)
+
+
+def get_ddgs():
+    """DuckDuckGo search client, one per thread (its HTTP client keeps per-instance state)."""
+    ddgs = getattr(_thread_clients, "ddgs", None)
+    if ddgs is None:
+        from duckduckgo_search import DDGS
+        ddgs = _thread_clients.ddgs = DDGS()
+    return ddgs
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Keep-alive httpx client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=30,
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_http_client():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def reset_clients():
+    """Drops the cached clients (this thread's DuckDuckGo client only); for tests and benchmarks that patch a client class."""
+    with _lock:
+        session = _clients.pop("http", None)
+        _clients.clear()
+    if session is not None:
+        session.close()
+    _thread_clients.__dict__.clear()
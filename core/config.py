@@ -1,8 +1,8 @@
 import json
 import os
 import sys
-from typing import Optional, Union, List, Any
-from pydantic import BaseModel, Field, field_validator, ValidationError
+from typing import Optional, Union, List, Any, Dict
+from pydantic import BaseModel, Field, field_validator, model_validator, ValidationError
 import pytimeparse
 
 # Base data directory and playlist subdirectory helpers
@@ -21,9 +21,24 @@ def playlist_path(playlist_id: str, *relative_parts: str) -> str:
 
 class GlobalConfig(BaseModel):
     model: str = Field(default="google/gemini-2.0-flash-exp:free")
+    # Tried after `model`: when it fails, or as a hedge when it is slow to start answering
+    fallback_models: List[str] = Field(default_factory=list)
+    hedge_after_ms: int = Field(default=5000)
+    llm_turn_timeout: float = Field(default=180.0)
+    # USD per million [input, output] tokens, for the cost column of llm_metrics.json
+    model_prices: Dict[str, List[float]] = Field(default_factory=dict)
+    # Reuse identical LLM turns across runs and playlists (data/llm_cache/, see curation/llm_cache.py)
+    llm_cache: bool = Field(default=True)
     channel_id: Optional[str] = None
     podcast_playlist_id: Optional[str] = None
     openrouter_api_key: Optional[str] = None
+    openrouter_base_url: str = Field(default="https://openrouter.ai/api/v1")
+    # Daily YouTube Data API budget in units (the default project quota)
+    youtube_daily_quota: int = Field(default=10000)
+    # Tool calls of one agent turn run in parallel, at most this many at once...
+    max_tool_concurrency: int = Field(default=8)
+    # ...and at most this many per tool, e.g. {"search_google": 1} (see curation/concurrency.py)
+    tool_concurrency: Dict[str, int] = Field(default_factory=dict)
 
     @field_validator("openrouter_api_key")
     @classmethod
@@ -42,10 +57,21 @@ class GlobalConfig(BaseModel):
             data = json.load(f)
         return cls(**data)
 
+MAX_DURATION_SECONDS = 3 * 60 * 60  # 3 hours
+MAX_LONG_FORM_DURATION_SECONDS = 24 * 60 * 60  # 24 hours
+
+
 class PlaylistConfig(BaseModel):
     topic: Union[str, List[str]]
     duration: str
     system_prompt: str
+    # Long-form mode: curate in chapters and stream items to disk (for 10+ hour marathons)
+    long_form: bool = False
+    chapter_duration: str = "1h"
+    # Budget of each agent run (the whole playlist, or one long-form chapter; see curation/budget.py)
+    max_tool_calls: int = 30
+    max_llm_turns: int = 12
+    deadline: str = "10m"
 
     @field_validator("topic")
     @classmethod
@@ -60,13 +86,50 @@ class PlaylistConfig(BaseModel):
         seconds = pytimeparse.parse(v)
         if seconds is None:
             raise ValueError(f"Invalid duration format '{v}'")
-        if seconds > 3 * 60 * 60:  # 3 hours
-            raise ValueError(f"Duration '{v}' exceeds maximum of 3 hours.")
         return v
 
+    @field_validator("chapter_duration")
+    @classmethod
+    def validate_chapter_duration(cls, v):
+        seconds = pytimeparse.parse(v)
+        if not seconds:
+            raise ValueError(f"Invalid chapter duration format '{v}'")
+        return v
+
+    @field_validator("deadline")
+    @classmethod
+    def validate_deadline(cls, v):
+        seconds = pytimeparse.parse(v)
+        if not seconds:
+            raise ValueError(f"Invalid deadline format '{v}'")
+        return v
+
+    @model_validator(mode="after")
+    def check_duration_limit(self):
+        seconds = self.get_duration_seconds()
+        if self.long_form:
+            if seconds > MAX_LONG_FORM_DURATION_SECONDS:
+                raise ValueError(f"Duration '{self.duration}' exceeds long-form maximum of 24 hours.")
+        elif seconds > MAX_DURATION_SECONDS:
+            raise ValueError(f"Duration '{self.duration}' exceeds maximum of 3 hours. Set \"long_form\": true for longer playlists.")
+        return self
+
     def get_duration_seconds(self) -> int:
         return pytimeparse.parse(self.duration)
 
+    def get_deadline_seconds(self) -> int:
+        return pytimeparse.parse(self.deadline)
+
+    def get_chapter_durations(self) -> List[int]:
+        """Chapter lengths in seconds for long-form curation (the last chapter takes the remainder)."""
+        total = self.get_duration_seconds()
+        chapter = pytimeparse.parse(self.chapter_duration)
+        full, remainder = divmod(total, chapter)
+        chapters = [chapter] * full
+        if remainder:
+            chapters.append(remainder)
+        return chapters or [total]
+
     @classmethod
     def load(cls, playlist_dir: str) -> "PlaylistConfig":
         """Loads and validates the playlist configuration. Raises exceptions on failure."""
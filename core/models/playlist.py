@@ -1,9 +1,17 @@
 import os
 import json
-from typing import Optional, Union, List, Literal
+from typing import Iterator, Optional, Union, List, Literal
 from pydantic import BaseModel, Field
 from core.config import get_playlist_dir
 
+CURATED_PLAYLIST_FILENAME = "curated_playlist.json"
+# Long-form playlists also keep their items as JSON Lines so nodes can stream them
+CURATED_ITEMS_FILENAME = "curated_items.jsonl"
+# Suffix of files still being written; they are renamed into place once complete
+PARTIAL_SUFFIX = ".partial"
+# Narration segments rewritten with --regenerate-part, by filename base (part_NNN)
+NARRATION_OVERRIDES_FILENAME = "narration_overrides.json"
+
 class CuratedPlaylistItem(BaseModel):
     type: Literal["narrative", "track", "invalid"]
     # Common fields
@@ -84,7 +92,7 @@ class CuratedPlaylist(BaseModel):
     @classmethod
     def load(cls, playlist_dir: str) -> "CuratedPlaylist":
         """Loads and validates the curated playlist JSON. Raises exceptions on failure."""
-        json_path = os.path.join(playlist_dir, "curated_playlist.json")
+        json_path = os.path.join(playlist_dir, CURATED_PLAYLIST_FILENAME)
         if not os.path.exists(json_path):
              raise FileNotFoundError(f"Curated playlist file '{json_path}' not found.")
         
@@ -94,9 +102,13 @@ class CuratedPlaylist(BaseModel):
 
     def save(self, playlist_dir: str):
         """Saves the curated playlist to JSON."""
-        json_path = os.path.join(playlist_dir, "curated_playlist.json")
+        json_path = os.path.join(playlist_dir, CURATED_PLAYLIST_FILENAME)
         with open(json_path, "w") as f:
             f.write(self.model_dump_json(indent=4))
+        # The full JSON is now the source of truth; drop any stale long-form item stream
+        items_path = os.path.join(playlist_dir, CURATED_ITEMS_FILENAME)
+        if os.path.exists(items_path):
+            os.remove(items_path)
 
     @classmethod
     def load_for_id(cls, playlist_id: str) -> "CuratedPlaylist":
@@ -109,3 +121,94 @@ class CuratedPlaylist(BaseModel):
         playlist_dir = get_playlist_dir(playlist_id)
         self.save(playlist_dir)
 
+
+
+class CuratedPlaylistStreamWriter:
+    """
+    Writes a curated playlist item by item, for long-form playlists that shouldn't be
+    held in memory as one CuratedPlaylist. Items are appended to curated_items.jsonl.partial
+    as they are produced; finalize() streams them into a regular curated_playlist.json and
+    only then renames the stream to curated_items.jsonl, so an interrupted run never leaves
+    a half-written curated_items.jsonl behind. Use it as a context manager: leaving the
+    block without finalize() closes and removes the partial stream.
+    """
+
+    def __init__(self, playlist_dir: str):
+        self.playlist_dir = playlist_dir
+        self.items_path = os.path.join(playlist_dir, CURATED_ITEMS_FILENAME)
+        self.partial_path = self.items_path + PARTIAL_SUFFIX
+        self.counts = {"narrative": 0, "track": 0, "invalid": 0}
+        self._file = open(self.partial_path, "w")
+
+    def __enter__(self) -> "CuratedPlaylistStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, item: CuratedPlaylistItem):
+        self._file.write(item.model_dump_json() + "\n")
+        self._file.flush()
+        self.counts[item.type] += 1
+
+    def close(self):
+        """Closes the stream; an unfinalized one is removed."""
+        self._file.close()
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+
+    def finalize(self, title: str, topic: str):
+        """Writes curated_playlist.json from the stream without loading every item, then publishes curated_items.jsonl."""
+        self._file.close()
+        header = CuratedPlaylist(title=title, topic=topic, items=[]).model_dump(exclude={"items"})
+        json_path = os.path.join(self.playlist_dir, CURATED_PLAYLIST_FILENAME)
+        json_partial_path = json_path + PARTIAL_SUFFIX
+        with open(json_partial_path, "w") as out, open(self.partial_path, "r") as items:
+            out.write("{\n")
+            for key, value in header.items():
+                out.write(f"    {json.dumps(key)}: {json.dumps(value)},\n")
+            out.write('    "items": [')
+            first = True
+            for line in items:
+                line = line.strip()
+                if not line:
+                    continue
+                out.write("\n        " if first else ",\n        ")
+                out.write(line)
+                first = False
+            out.write("\n    ]\n}\n")
+        os.replace(self.partial_path, self.items_path)
+        os.replace(json_partial_path, json_path)
+
+
+def iter_curated_items(playlist_dir: str) -> Iterator[dict]:
+    """
+    Yields curated playlist items as dicts. Streams curated_items.jsonl when a long-form
+    run produced one, otherwise reads curated_playlist.json.
+    """
+    items_path = os.path.join(playlist_dir, CURATED_ITEMS_FILENAME)
+    if os.path.exists(items_path):
+        with open(items_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    json_path = os.path.join(playlist_dir, CURATED_PLAYLIST_FILENAME)
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    yield from data.get("items", [])
+
+
+def load_narration_overrides(playlist_dir: str) -> dict:
+    """{"part_NNN": {"original": script text, "text": replacement}}, or {} if none were made."""
+    path = os.path.join(playlist_dir, NARRATION_OVERRIDES_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_narration_overrides(playlist_dir: str, overrides: dict):
+    with open(os.path.join(playlist_dir, NARRATION_OVERRIDES_FILENAME), "w") as f:
+        json.dump(overrides, f, indent=4)
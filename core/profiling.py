@@ -0,0 +1,146 @@
+import cProfile
+import functools
+import inspect
+import os
+import pstats
+from typing import Callable, Iterable, List, Optional
+
+from core.config import playlist_path
+
+PROFILE_DIRNAME = "profiles"
+MERGED_PROFILE_FILENAME = "profile.folded"
+
+
+def profile_output_dir(playlist_id: str) -> str:
+    """Directory (inside the playlist dir) where per-node profiles are written."""
+    return playlist_path(playlist_id, PROFILE_DIRNAME)
+
+
+def make_profiling_wrapper(node_names: Optional[Iterable[str]] = None) -> Callable:
+    """
+    Returns a node wrapper for build_workflow that runs the selected nodes under cProfile.
+    If node_names is None/empty, every node is profiled.
+    """
+    selected = set(node_names or [])
+
+    def wrap(name: str, node_fn: Callable) -> Callable:
+        if selected and name not in selected:
+            return node_fn
+        return _profiled_node(name, node_fn)
+
+    return wrap
+
+
+def _profiled_node(name: str, node_fn: Callable) -> Callable:
+    if inspect.iscoroutinefunction(node_fn):
+        # Also samples whatever else runs on the loop meanwhile
+        @functools.wraps(node_fn)
+        async def async_wrapper(state):
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return await node_fn(state)
+            finally:
+                profiler.disable()
+                _write_node_profile(state["playlist_id"], name, profiler)
+
+        return async_wrapper
+
+    @functools.wraps(node_fn)
+    def wrapper(state):
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(node_fn, state)
+        finally:
+            _write_node_profile(state["playlist_id"], name, profiler)
+
+    return wrapper
+
+
+def _write_node_profile(playlist_id: str, node_name: str, profiler: cProfile.Profile):
+    out_dir = profile_output_dir(playlist_id)
+    os.makedirs(out_dir, exist_ok=True)
+
+    prof_path = os.path.join(out_dir, f"{node_name}.prof")
+    profiler.dump_stats(prof_path)
+
+    folded_path = os.path.join(out_dir, f"{node_name}.folded")
+    with open(folded_path, "w") as f:
+        f.write("\n".join(folded_stacks(pstats.Stats(profiler), root=node_name)))
+        f.write("\n")
+
+    merge_folded_profiles(out_dir)
+    print(f"  ⏱️  Profile for '{node_name}' written to {prof_path}")
+
+
+def merge_folded_profiles(out_dir: str) -> str:
+    """Concatenates every per-node .folded file into a single flamegraph input."""
+    merged_path = os.path.join(out_dir, MERGED_PROFILE_FILENAME)
+    lines = []
+    for filename in sorted(os.listdir(out_dir)):
+        if filename.endswith(".folded") and filename != MERGED_PROFILE_FILENAME:
+            with open(os.path.join(out_dir, filename), "r") as f:
+                lines.extend(line for line in f.read().splitlines() if line)
+    with open(merged_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return merged_path
+
+
+def _func_label(func) -> str:
+    filename, lineno, funcname = func
+    if filename == "~":
+        # Built-ins, e.g. "<built-in method time.sleep>"
+        return funcname
+    return f"{os.path.basename(filename)}:{lineno}:{funcname}"
+
+
+def folded_stacks(stats: pstats.Stats, root: str) -> List[str]:
+    """
+    Converts cProfile stats into collapsed stacks ("a;b;c <microseconds>") that
+    flamegraph.pl / speedscope / inferno understand.
+
+    cProfile only keeps caller->callee edges, not full stacks, and expanding every
+    path through the call graph grows exponentially with its size. So each function
+    gets one stack, through its most expensive caller (memoized, cycles cut), and
+    the self time of every caller->callee edge is put under the caller's stack.
+    Total time is preserved; a function called from several places shows up under
+    each direct caller, but its own callees only under its main stack.
+    """
+    raw = stats.stats  # func -> (cc, nc, tt, ct, callers); callers: caller -> (cc, nc, tt, ct)
+
+    def main_caller(func):
+        callers = {c: edge for c, edge in raw[func][4].items() if c != func and c in raw}
+        return max(callers, key=lambda c: callers[c][3]) if callers else None
+
+    paths = {}
+
+    def path(func) -> str:
+        # Walk up the main callers to a memoized frame or a root, then fill in on the way down
+        chain, on_chain = [], set()
+        current = func
+        while current is not None and current not in paths and current not in on_chain:
+            chain.append(current)
+            on_chain.add(current)
+            current = main_caller(current)
+        prefix = paths[current] if current in paths else root
+        for f in reversed(chain):
+            prefix = paths[f] = f"{prefix};{_func_label(f)}"
+        return paths[func]
+
+    totals = {}
+    for func, (_, _, tt, _, callers) in raw.items():
+        edges = {c: edge for c, edge in callers.items() if c in raw}
+        if not edges:
+            totals[path(func)] = totals.get(path(func), 0.0) + tt
+            continue
+        for caller, edge in edges.items():
+            # A recursive call's time stays in the function's own frame
+            stack = path(func) if caller == func else f"{path(caller)};{_func_label(func)}"
+            totals[stack] = totals.get(stack, 0.0) + edge[2]
+
+    lines = []
+    for stack, seconds in totals.items():
+        micros = int(seconds * 1_000_000)
+        if micros > 0:
+            lines.append(f"{stack} {micros}")
+    return lines
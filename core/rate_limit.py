@@ -0,0 +1,284 @@
+"""
+Per-host rate limiting, circuit breaking and request coalescing for outbound calls.
+
+Every call to an external service goes through guarded_call / aguarded_call with
+the service's host:
+  - a token bucket per host spaces requests out (MusicBrainz: 1/s). On 429/503 the
+    bucket halves its rate (honouring Retry-After) and the call is retried; the rate
+    creeps back up with each success.
+  - a circuit breaker per host opens after CIRCUIT_FAILURES service failures in a
+    row (throttling, 5xx, timeouts, connection errors). While open, calls fail at
+    once with ServiceUnavailableError instead of waiting on a service that is down;
+    after CIRCUIT_RESET_SECONDS one trial call is let through.
+  - identical calls already in flight (same host and key) wait for that call's
+    result instead of sending the request again.
+Errors that say nothing about the service's health (e.g. an unknown video id)
+pass through untouched.
+"""
+import asyncio
+import random
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+# (requests per second, burst) per host
+HOST_LIMITS = {
+    "musicbrainz.org": (1.0, 1),
+    "music.youtube.com": (10.0, 20),
+    "duckduckgo.com": (0.5, 2),
+    "en.wikipedia.org": (10.0, 10),
+    "upload.wikimedia.org": (10.0, 10),
+}
+DEFAULT_LIMIT = (5.0, 5)
+# Never slow a host down below one request per this many seconds
+MIN_RATE = 1 / 30
+THROTTLE_RETRIES = 2
+CIRCUIT_FAILURES = 5
+CIRCUIT_RESET_SECONDS = 60.0
+
+THROTTLED = (429, 503)
+
+
+class ServiceUnavailableError(RuntimeError):
+    """Raised without calling the service while its circuit is open."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Slows down after a 429/503: half the rate, and nothing at all for retry_after seconds."""
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+
+    def reward(self):
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate * 1.1)
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int = CIRCUIT_FAILURES, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.max_failures = failures
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self, host: str) -> bool:
+        """Raises while the circuit is open; returns True if this call took the half-open trial slot."""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            remaining = self.opened_at + self.reset_seconds - time.monotonic()
+            if remaining > 0 or self.trial_running:
+                raise ServiceUnavailableError(
+                    f"{host} is unavailable after {self.failures} failed requests (retrying in {max(remaining, 0):.0f}s); continue without it for now"
+                )
+            # Half-open: let one call through to see whether the service is back
+            self.trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.opened_at = time.monotonic()
+
+    def end_trial(self):
+        """Frees the half-open slot however the trial call ended (also on KeyboardInterrupt or cancellation); only its owner may call this."""
+        with self._lock:
+            self.trial_running = False
+
+
+class HostGuard:
+    def __init__(self, host: str):
+        self.host = host
+        self.bucket = TokenBucket(*HOST_LIMITS.get(host, DEFAULT_LIMIT))
+        self.breaker = CircuitBreaker()
+        self._lock = threading.Lock()
+        self.in_flight = {}
+        self.async_in_flight = weakref.WeakKeyDictionary()
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(host: str) -> HostGuard:
+    with _guards_lock:
+        guard = _guards.get(host)
+        if guard is None:
+            guard = _guards[host] = HostGuard(host)
+        return guard
+
+
+def reset_guards():
+    """Forgets all rate and circuit state (tests)."""
+    with _guards_lock:
+        _guards.clear()
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """HTTP status behind an exception from requests, httpx, musicbrainzngs, ytmusicapi or duckduckgo_search."""
+    for candidate in (exc, getattr(exc, "cause", None)):
+        if candidate is None:
+            continue
+        response = getattr(candidate, "response", None)
+        status = getattr(response, "status_code", None) or getattr(candidate, "code", None)
+        if isinstance(status, int):
+            return status
+    if "ratelimit" in type(exc).__name__.lower():
+        return 429
+    # ytmusicapi: "Server returned HTTP 429: Too Many Requests."
+    match = re.search(r"HTTP (\d{3})", str(exc))
+    return int(match.group(1)) if match else None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_service_failure(exc: BaseException) -> bool:
+    status = error_status(exc)
+    if status is not None:
+        return status in THROTTLED or status >= 500
+    name = type(exc).__name__.lower()
+    return isinstance(exc, (ConnectionError, TimeoutError)) or any(word in name for word in ("timeout", "connect", "network"))
+
+
+def _attempts(guard: HostGuard):
+    """
+    Yields once per attempt; the caller sends back the exception (or None on success),
+    and closes the generator when it stops early.
+    """
+    for attempt in range(THROTTLE_RETRIES + 1):
+        owns_trial = guard.breaker.before_call(guard.host)
+        try:
+            exc = yield guard.bucket.reserve()
+            if exc is None:
+                guard.bucket.reward()
+                guard.breaker.record_success()
+                return
+            if not _is_service_failure(exc):
+                guard.breaker.record_success()
+                raise exc
+            guard.breaker.record_failure()
+            if error_status(exc) not in THROTTLED or attempt == THROTTLE_RETRIES:
+                raise exc
+        finally:
+            if owns_trial:
+                guard.breaker.end_trial()
+        guard.bucket.penalize(_retry_after(exc))
+        print(f"    ⏳ {guard.host} throttled us ({error_status(exc)}); slowing down and retrying...")
+
+
+def _call(guard: HostGuard, fn: Callable[[], Any]) -> Any:
+    attempts = _attempts(guard)
+    try:
+        delay = next(attempts)
+        while True:
+            time.sleep(delay + random.uniform(0, 0.05) if delay > 0 else 0)
+            try:
+                result = fn()
+            except Exception as e:
+                # Raises e unless it is worth another attempt
+                delay = attempts.send(e)
+                continue
+            try:
+                attempts.send(None)
+            except StopIteration:
+                pass
+            return result
+    finally:
+        attempts.close()
+
+
+def guarded_call(host: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+    """Runs fn() under host's rate limit and circuit breaker, sharing the result with identical in-flight calls."""
+    guard = get_guard(host)
+    with guard._lock:
+        future = guard.in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = guard.in_flight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = _call(guard, fn)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with guard._lock:
+            guard.in_flight.pop(key, None)
+
+
+async def _acall(guard: HostGuard, fn: Callable[[], Awaitable[Any]]) -> Any:
+    attempts = _attempts(guard)
+    try:
+        delay = next(attempts)
+        while True:
+            if delay > 0:
+                await asyncio.sleep(delay + random.uniform(0, 0.05))
+            try:
+                result = await fn()
+            except Exception as e:
+                # Raises e unless it is worth another attempt
+                delay = attempts.send(e)
+                continue
+            try:
+                attempts.send(None)
+            except StopIteration:
+                pass
+            return result
+    finally:
+        attempts.close()
+
+
+async def aguarded_call(host: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """guarded_call for coroutines; coalescing is per event loop."""
+    guard = get_guard(host)
+    in_flight = guard.async_in_flight.setdefault(asyncio.get_running_loop(), {})
+    task = in_flight.get(key)
+    if task is None:
+        task = in_flight[key] = asyncio.ensure_future(_acall(guard, fn))
+        task.add_done_callback(lambda _: in_flight.pop(key, None))
+    # shield: one waiter being cancelled must not cancel the shared request
+    return await asyncio.shield(task)
@@ -0,0 +1,108 @@
+"""
+Async variants of the curation tools, for running the agent with ainvoke.
+
+MusicBrainz and Wikipedia are queried directly over their JSON APIs with the shared
+httpx.AsyncClient from core.clients (one per event loop), through the same per-host
+limits as the blocking tools. ytmusicapi and duckduckgo_search have no async API, so
+those calls run in a worker thread. Each tool in CURATION_TOOLS keeps its blocking
+implementation for invoke() and gets the coroutine for ainvoke().
+"""
+import asyncio
+from typing import Callable
+
+from langchain_core.tools import StructuredTool
+
+from core.clients import get_async_http_client
+from core.rate_limit import aguarded_call
+from .image_tools import (
+    WIKIPEDIA_API_URL, WIKIPEDIA_HOST, format_page_images, image_urls, search_wikipedia_images,
+    wikipedia_images_params, wikipedia_search_params,
+)
+from .llm import rewrap_tool
+from .tools import MUSICBRAINZ_HOST, search_google, search_musicbrainz, search_youtube_music
+
+MUSICBRAINZ_API_URL = f"https://{MUSICBRAINZ_HOST}/ws/2"
+
+
+async def _get_json(host: str, url: str, params: dict) -> dict:
+    async def get():
+        response = await get_async_http_client().get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    return await aguarded_call(host, (url, tuple(sorted(params.items()))), get)
+
+
+async def asearch_youtube_music(query: str, limit: int = 3) -> str:
+    return await asyncio.to_thread(search_youtube_music.func, query, limit)
+
+
+async def asearch_google(query: str) -> str:
+    return await asyncio.to_thread(search_google.func, query)
+
+
+def _artist_credit_name(entity: dict) -> str:
+    credit = entity.get('artist-credit') or [{}]
+    return credit[0].get('artist', {}).get('name', 'Unknown')
+
+
+async def asearch_musicbrainz(query: str, type: str = "artist") -> str:
+    print(f"  🧠 Tool Call: Searching MusicBrainz for '{query}' (type: {type})...")
+    if type not in ("artist", "recording", "release"):
+        return "Invalid search type. Use 'artist', 'release', or 'recording'."
+    try:
+        # The JSON web service uses plural keys ("artists", "tags", ...) where musicbrainzngs has "-list"
+        result = await _get_json(MUSICBRAINZ_HOST, f"{MUSICBRAINZ_API_URL}/{type}", {"query": query, "limit": 3, "fmt": "json"})
+
+        output = []
+        if type == "artist":
+            for artist in result.get('artists', []):
+                tags = [t['name'] for t in artist.get('tags', [])[:5]]
+                output.append(f"Artist: {artist.get('name')} ({artist.get('country', 'Unknown')}) - {artist.get('disambiguation', '')}. Tags: {', '.join(tags)}")
+        elif type == "recording":
+            for rec in result.get('recordings', []):
+                releases = [f"{r.get('title')} ({r.get('date', 'Unknown Date')})" for r in rec.get('releases', [])[:3]]
+                output.append(f"Recording: {rec.get('title')} by {_artist_credit_name(rec)}. Releases: {', '.join(releases)}")
+        else:
+            for r in result.get('releases', []):
+                label_info = r.get('label-info') or [{}]
+                label = (label_info[0].get('label') or {}).get('name', 'Unknown Label')
+                output.append(f"Release: {r.get('title')} by {_artist_credit_name(r)}. Date: {r.get('date', 'Unknown Date')}. Label: {label}")
+        return "\n".join(output)
+    except Exception as e:
+        return f"Error searching MusicBrainz: {e}"
+
+
+async def asearch_wikipedia_images(query: str) -> str:
+    print(f"  🖼️ Tool Call: Searching Wikipedia images for '{query}'...")
+    try:
+        search = await _get_json(WIKIPEDIA_HOST, WIKIPEDIA_API_URL, wikipedia_search_params(query))
+        results = search.get('query', {}).get('search', [])
+        if not results:
+            return "No Wikipedia pages found."
+
+        page_title = results[0]['title']
+        params = wikipedia_images_params(page_title)
+        images = []
+        while True:
+            data = await _get_json(WIKIPEDIA_HOST, WIKIPEDIA_API_URL, params)
+            images.extend(image_urls(data))
+            if 'continue' not in data:
+                break
+            params = {**params, **data['continue']}
+        return format_page_images(page_title, images)
+    except Exception as e:
+        return f"Error searching Wikipedia: {str(e)}"
+
+
+def with_coroutine(tool: StructuredTool, coroutine: Callable) -> StructuredTool:
+    """Returns a copy of a blocking tool that uses coroutine when awaited."""
+    return rewrap_tool(tool, tool.func, coroutine)
+
+
+CURATION_TOOLS = [
+    with_coroutine(search_youtube_music, asearch_youtube_music),
+    with_coroutine(search_wikipedia_images, asearch_wikipedia_images),
+    with_coroutine(search_musicbrainz, asearch_musicbrainz),
+    with_coroutine(search_google, asearch_google),
+]
@@ -0,0 +1,157 @@
+"""
+Per-run budgets for the curation agent.
+
+An AgentBudget caps one agent run (a playlist, or one long-form chapter) at
+max_tool_calls tool calls, max_llm_turns LLM turns and deadline seconds of wall
+clock time. It plugs into the ReAct agent in three places:
+  - wrap_tools() counts tool calls; once any budget is spent, tools answer with a
+    note to finalize instead of searching.
+  - pre_model_hook() counts LLM turns and, once a budget is nearly spent, appends
+    an instruction to write the final script with what the agent already has.
+  - recursion_limit() is LangGraph's hard stop, a couple of turns past the budget,
+    for an agent that ignores both.
+finish() prints the usage and appends it to budget_usage.json in the playlist directory.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+
+from .llm import rewrap_tool
+
+BUDGET_USAGE_FILENAME = "budget_usage.json"
+# A budget is "nearly spent" from this fraction on (and on the last LLM turn)
+FINALIZE_AT = 0.8
+# LLM turns allowed past max_llm_turns before LangGraph stops the run
+GRACE_TURNS = 2
+# Graph steps per agent turn: pre_model_hook, agent, tools
+STEPS_PER_TURN = 3
+
+BUDGET_EXHAUSTED = "Budget exhausted: no more tool calls. Write the final script now with what you already have."
+
+
+class AgentBudget:
+    def __init__(self, max_tool_calls: int, max_llm_turns: int, deadline: float,
+                 path: Optional[str] = None, label: str = "curation"):
+        self.max_tool_calls = max_tool_calls
+        self.max_llm_turns = max_llm_turns
+        self.deadline = deadline
+        self.path = path
+        self.label = label
+        self.tool_calls = 0
+        self.llm_turns = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_playlist(cls, playlist_config, playlist_dir: str, label: str = "curation") -> "AgentBudget":
+        return cls(
+            playlist_config.max_tool_calls,
+            playlist_config.max_llm_turns,
+            playlist_config.get_deadline_seconds(),
+            path=os.path.join(playlist_dir, BUDGET_USAGE_FILENAME),
+            label=label,
+        )
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def exhausted(self) -> List[str]:
+        """Names of the budgets that are spent."""
+        spent = []
+        if self.tool_calls >= self.max_tool_calls:
+            spent.append("tool calls")
+        if self.llm_turns >= self.max_llm_turns:
+            spent.append("LLM turns")
+        if self.elapsed() >= self.deadline:
+            spent.append("time")
+        return spent
+
+    def nearly_exhausted(self) -> List[str]:
+        """Names of the budgets that call for finishing now (this turn should be the last)."""
+        near = []
+        if self.tool_calls >= self.max_tool_calls * FINALIZE_AT:
+            near.append(f"{self.tool_calls}/{self.max_tool_calls} tool calls")
+        if self.llm_turns >= max(self.max_llm_turns * FINALIZE_AT, self.max_llm_turns - 1):
+            near.append(f"{self.llm_turns}/{self.max_llm_turns} LLM turns")
+        if self.elapsed() >= self.deadline * FINALIZE_AT:
+            near.append(f"{self.elapsed():.0f}/{self.deadline:.0f}s")
+        return near
+
+    def recursion_limit(self) -> int:
+        return STEPS_PER_TURN * (self.max_llm_turns + GRACE_TURNS) + 1
+
+    def wrap_tools(self, tools: List[StructuredTool]) -> List[StructuredTool]:
+        """Copies of the tools that count calls against the budget and refuse once it is spent."""
+        budget = self
+
+        def admit() -> bool:
+            with budget._lock:
+                if budget.exhausted():
+                    return False
+                budget.tool_calls += 1
+                return True
+
+        def wrap(tool):
+            def run(**kwargs):
+                return tool.invoke(kwargs) if admit() else BUDGET_EXHAUSTED
+
+            arun = None
+            if tool.coroutine is not None:
+                async def arun(**kwargs):
+                    return await tool.ainvoke(kwargs) if admit() else BUDGET_EXHAUSTED
+
+            return rewrap_tool(tool, run, arun)
+
+        return [wrap(t) for t in tools]
+
+    def pre_model_hook(self, inner=None):
+        """pre_model_hook that counts LLM turns and asks for the final script once a budget is nearly spent (after inner, if given)."""
+        def hook(state):
+            update = inner(state) if inner is not None else {}
+            messages = update.get("llm_input_messages", state["messages"])
+            with self._lock:
+                self.llm_turns += 1
+                near = self.nearly_exhausted()
+            if near:
+                notice = (
+                    f"[Budget] You have used {', '.join(near)}. Do not call any more tools: "
+                    "write the complete final script now with the tracks and sources you already have."
+                )
+                messages = list(messages) + [HumanMessage(content=notice)]
+            return {**update, "llm_input_messages": messages}
+
+        return hook
+
+    def usage(self) -> dict:
+        return {
+            "label": self.label,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "tool_calls": {"used": self.tool_calls, "limit": self.max_tool_calls},
+            "llm_turns": {"used": self.llm_turns, "limit": self.max_llm_turns},
+            "seconds": {"used": round(self.elapsed(), 1), "limit": self.deadline},
+        }
+
+    def finish(self) -> dict:
+        usage = self.usage()
+        print(
+            f"📊 Budget used ({self.label}): {self.tool_calls}/{self.max_tool_calls} tool calls, "
+            f"{self.llm_turns}/{self.max_llm_turns} LLM turns, {self.elapsed():.0f}/{self.deadline:.0f}s"
+        )
+        if self.path:
+            history = []
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r") as f:
+                        history = json.load(f)
+                except (json.JSONDecodeError, OSError) as e:
+                    print(f"⚠️ Could not read budget usage {self.path} ({e}); starting a new file.")
+            history.append(usage)
+            with open(self.path, "w") as f:
+                json.dump(history, f, indent=4)
+        return usage
@@ -0,0 +1,161 @@
+"""
+Record/replay cassettes for curation agent runs.
+
+In record mode every LLM request/response and every tool invocation/result of an
+agent run is captured into cassette.json in the playlist directory. In replay mode
+the same agent graph runs offline, answering LLM turns and tool calls from the cassette.
+"""
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatResult
+from langchain_core.tools import StructuredTool
+
+from .llm import DelegatingChatModel, message_fingerprint, rewrap_tool
+
+CASSETTE_FILENAME = "cassette.json"
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMismatchError(RuntimeError):
+    """Raised when a replayed run asks for something the cassette doesn't contain."""
+
+
+def _tool_key(name: str, args: dict) -> str:
+    return f"{name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Invalid cassette mode '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.llm = []
+        self.tools = []
+        self._lock = threading.Lock()
+        self._llm_cursor = 0
+        self._tool_queues = defaultdict(deque)
+
+        if mode == REPLAY:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Cassette '{path}' not found. Record one first with --record.")
+            with open(path, "r") as f:
+                data = json.load(f)
+            self.llm = data.get("llm", [])
+            self.tools = data.get("tools", [])
+            for entry in self.tools:
+                self._tool_queues[_tool_key(entry["name"], entry["args"])].append(entry["result"])
+
+    @classmethod
+    def for_playlist_dir(cls, playlist_dir: str, mode: str) -> "Cassette":
+        return cls(os.path.join(playlist_dir, CASSETTE_FILENAME), mode)
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump({"llm": self.llm, "tools": self.tools}, f, indent=2)
+
+    # --- LLM turns ---
+
+    def record_llm(self, request: List[BaseMessage], response: BaseMessage):
+        with self._lock:
+            self.llm.append({
+                "request": messages_to_dict(request),
+                "response": messages_to_dict([response])[0],
+            })
+            self.save()
+
+    def replay_llm(self, request: List[BaseMessage]) -> BaseMessage:
+        with self._lock:
+            if self._llm_cursor >= len(self.llm):
+                raise CassetteMismatchError(
+                    f"Cassette has only {len(self.llm)} LLM turns; the agent asked for turn {self._llm_cursor + 1}."
+                )
+            entry = self.llm[self._llm_cursor]
+            self._llm_cursor += 1
+
+        recorded_request = messages_from_dict(entry["request"])
+        if message_fingerprint(recorded_request) != message_fingerprint(request):
+            print(f"  ⚠️ Cassette: LLM request for turn {self._llm_cursor} differs from the recording; replaying anyway.")
+        return messages_from_dict([entry["response"]])[0]
+
+    # --- Tool calls ---
+
+    def record_tool(self, name: str, args: dict, result: Any):
+        with self._lock:
+            self.tools.append({"name": name, "args": args, "result": result})
+            self.save()
+
+    def replay_tool(self, name: str, args: dict) -> Any:
+        key = _tool_key(name, args)
+        with self._lock:
+            queue = self._tool_queues.get(key)
+            if not queue:
+                raise CassetteMismatchError(f"No recorded result for tool call {key}")
+            return queue.popleft()
+
+    def wrap_tool(self, tool: StructuredTool) -> StructuredTool:
+        """Returns a copy of the tool that records to / replays from this cassette."""
+        cassette = self
+
+        def run(**kwargs):
+            if cassette.mode == REPLAY:
+                return cassette.replay_tool(tool.name, kwargs)
+            result = tool.invoke(kwargs)
+            cassette.record_tool(tool.name, kwargs, result)
+            return result
+
+        arun = None
+        if tool.coroutine is not None:
+            async def arun(**kwargs):
+                if cassette.mode == REPLAY:
+                    return cassette.replay_tool(tool.name, kwargs)
+                result = await tool.ainvoke(kwargs)
+                cassette.record_tool(tool.name, kwargs, result)
+                return result
+
+        return rewrap_tool(tool, run, arun)
+
+
+class CassetteChatModel(DelegatingChatModel):
+    """Chat model that records the inner model's turns, or replays them without an inner model."""
+
+    cassette: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.cassette.mode == REPLAY:
+            return self._as_result(self.cassette.replay_llm(messages))
+
+        response = self._invoke_inner(messages, stop=stop)
+        self.cassette.record_llm(messages, response)
+        return self._as_result(response)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.cassette.mode == REPLAY:
+            return self._as_result(self.cassette.replay_llm(messages))
+
+        response = await self._ainvoke_inner(messages, stop=stop)
+        self.cassette.record_llm(messages, response)
+        return self._as_result(response)
@@ -0,0 +1,148 @@
+"""
+Keeps the curation agent's context small.
+
+Every tool result stays in the ReAct history and is resent to the model on each
+later turn, so:
+  - compact_tools() wraps the tools of one agent run. Results are split into items
+    (one per song, artist, image or web source), flattened to one line each, and
+    each tool has a budget of items and characters per item.
+  - history_compactor() is a pre_model_hook. Going through the tool results in
+    message order, it drops items an earlier result already showed, and condenses
+    results older than the last few agent turns further. Doing this over the
+    history rather than in the tools keeps it independent of which parallel tool
+    call finishes first, so the same run always sends the same prompts (which the
+    LLM cache and cassettes rely on). The stored history is untouched.
+When an item is shortened, its video id ("ID: ...") and any URL are kept whole,
+since the final script needs them.
+"""
+import re
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import StructuredTool
+
+from .llm import rewrap_tool
+
+# max_items per result, max_chars per item
+TOOL_BUDGETS = {
+    "search_youtube_music": {"max_items": 5, "max_chars": 160},
+    "search_wikipedia_images": {"max_items": 5, "max_chars": 300},
+    "search_musicbrainz": {"max_items": 3, "max_chars": 300},
+    "search_google": {"max_items": 3, "max_chars": 400},
+}
+DEFAULT_BUDGET = {"max_items": 5, "max_chars": 300}
+# Tool results from before this many agent turns are condensed
+KEEP_RECENT_TURNS = 2
+STALE_MAX_CHARS = 120
+STALE_PREFIX = "[condensed earlier result] "
+
+_IMAGE_HEADER = re.compile(r"^Found images on page '.*':$")
+_OMITTED = re.compile(r"^\((\d+) results omitted: already shown\)$")
+# Parts of an item that are never cut
+_PROTECTED = re.compile(r"\bID: [\w-]+|https?://\S+")
+
+
+def split_items(text: str) -> List[str]:
+    """One item per result: web sources are separated by blank lines, everything else is a line per item."""
+    blocks = [b for b in re.split(r"\n\s*\n", text.strip()) if b.strip()]
+    if len(blocks) > 1:
+        return [" | ".join(line.strip() for line in block.splitlines() if line.strip()) for block in blocks]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _truncate(item: str, max_chars: int) -> str:
+    """Shortens the descriptive text of an item; its ID and URLs are kept whole (a cut one is useless to the script)."""
+    if len(item) <= max_chars:
+        return item
+    kept = _PROTECTED.findall(item)
+    if not kept:
+        return item[:max_chars - 1].rstrip() + "…"
+    text = re.sub(r"\s*[,|]\s*(?=[,|]|$)", "", _PROTECTED.sub("", item)).strip(" ,|")
+    tail = ", ".join(kept)
+    room = max_chars - len(tail) - 2
+    if not text or room < 2:
+        return tail
+    if len(text) > room:
+        text = text[:room - 1].rstrip(" ,|") + "…"
+    return f"{text}, {tail}"
+
+
+def _item_key(item: str) -> str:
+    match = re.search(r"\bID: ([\w-]+)", item)
+    return match.group(1) if match else " ".join(item.lower().split())
+
+
+def compact_text(name: str, text: str, seen: Optional[set] = None, max_chars: Optional[int] = None) -> str:
+    """Applies the tool's budget to a result, dropping repeats and items already in seen (and adding the kept ones to it)."""
+    if not isinstance(text, str) or text.startswith("Error") or text.startswith(STALE_PREFIX):
+        return text
+    budget = TOOL_BUDGETS.get(name, DEFAULT_BUDGET)
+    max_chars = max_chars or budget["max_chars"]
+
+    items = split_items(text)
+    header = items.pop(0) if items and _IMAGE_HEADER.match(items[0]) else None
+    seen = set() if seen is None else seen
+    fresh, fresh_keys, repeated = [], set(), 0
+    for item in items:
+        key = _item_key(item)
+        omitted = _OMITTED.match(item)
+        if omitted:
+            # Already compacted once: carry the count over
+            repeated += int(omitted.group(1))
+        elif key in seen or key in fresh_keys:
+            repeated += 1
+        elif len(fresh) < budget["max_items"]:
+            fresh.append(item)
+            fresh_keys.add(key)
+    # Items cut by the budget were never shown, so only the kept ones count as seen
+    seen.update(fresh_keys)
+
+    lines = ([header] if header else []) + [_truncate(item, max_chars) for item in fresh]
+    if repeated:
+        lines.append(f"({repeated} results omitted: already shown)")
+    return "\n".join(lines) if lines else "No results."
+
+
+def compact_tools(tools: List[StructuredTool]) -> List[StructuredTool]:
+    """Copies of the tools that apply their budget to each result (repeats across results are left to history_compactor)."""
+    def wrap(tool):
+        def run(**kwargs):
+            return compact_text(tool.name, tool.invoke(kwargs))
+
+        arun = None
+        if tool.coroutine is not None:
+            async def arun(**kwargs):
+                return compact_text(tool.name, await tool.ainvoke(kwargs))
+
+        return rewrap_tool(tool, run, arun)
+
+    return [wrap(t) for t in tools]
+
+
+def history_compactor(keep_recent_turns: int = KEEP_RECENT_TURNS):
+    """
+    pre_model_hook that drops items already shown by an earlier result of the same tool
+    (in message order) and condenses tool results from before the last keep_recent_turns
+    tool-calling turns.
+    """
+    def hook(state):
+        messages = state["messages"]
+        turn_starts = [i for i, m in enumerate(messages) if isinstance(m, AIMessage) and m.tool_calls]
+        cutoff = turn_starts[-keep_recent_turns] if len(turn_starts) >= keep_recent_turns else 0
+
+        seen: Dict[str, set] = {}
+        compacted = []
+        for i, message in enumerate(messages):
+            if isinstance(message, ToolMessage) and isinstance(message.content, str):
+                stale = i < cutoff
+                condensed = compact_text(
+                    message.name, message.content, seen.setdefault(message.name, set()),
+                    max_chars=STALE_MAX_CHARS if stale else None,
+                )
+                if condensed != message.content:
+                    prefix = STALE_PREFIX if stale else ""
+                    message = message.model_copy(update={"content": prefix + condensed})
+            compacted.append(message)
+        return {"llm_input_messages": compacted}
+
+    return hook
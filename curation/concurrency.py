@@ -0,0 +1,51 @@
+"""
+Concurrency caps for the curation agent's tools.
+
+LangGraph's ToolNode already runs the tool calls of one LLM turn in parallel on a
+thread pool (sized by the run's max_concurrency) and returns the ToolMessages in
+call order. What it doesn't know is how hard each backend can be hit: MusicBrainz
+allows about one request per second, DuckDuckGo blocks bursts. Each tool is wrapped
+so that at most N of its calls run at a time; the others wait for a slot. Async
+tools get the same cap with an asyncio.Semaphore per event loop.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+from langchain_core.tools import StructuredTool
+
+from .llm import rewrap_tool
+
+# Calls of the same tool allowed in flight at once
+DEFAULT_TOOL_LIMITS = {
+    "search_youtube_music": 4,
+    "search_wikipedia_images": 3,
+    # core/rate_limit.py paces musicbrainz.org to 1 request/second (HOST_LIMITS); more threads only queue up
+    "search_musicbrainz": 1,
+    "search_google": 2,
+}
+
+
+def limit_tool(tool: StructuredTool, max_concurrent: int) -> StructuredTool:
+    """Returns a copy of the tool that runs at most max_concurrent calls at a time."""
+    slots = threading.BoundedSemaphore(max_concurrent)
+    loop_slots = weakref.WeakKeyDictionary()
+
+    def run(**kwargs):
+        with slots:
+            return tool.invoke(kwargs)
+
+    arun = None
+    if tool.coroutine is not None:
+        async def arun(**kwargs):
+            async with loop_slots.setdefault(asyncio.get_running_loop(), asyncio.Semaphore(max_concurrent)):
+                return await tool.ainvoke(kwargs)
+
+    return rewrap_tool(tool, run, arun)
+
+
+def limit_tools(tools: List[StructuredTool], overrides: Optional[Dict[str, int]] = None) -> List[StructuredTool]:
+    """Applies DEFAULT_TOOL_LIMITS (updated with overrides) to the tools; 0 or missing means no cap."""
+    limits = {**DEFAULT_TOOL_LIMITS, **(overrides or {})}
+    return [limit_tool(t, limits[t.name]) if limits.get(t.name) else t for t in tools]
@@ -0,0 +1,317 @@
+"""
+Hedged, fallback-aware LLM turns for the curation agent.
+
+HedgedChatModel holds a ladder of chat models (GlobalConfig.model first, then
+fallback_models). Each turn is streamed from the first model; if no token has
+arrived after hedge_after_ms, the next model is asked as well, and the first
+complete answer wins (the others are cancelled). A model that fails, e.g. with a
+429, hands over to the next one straight away. A turn that nothing answers within
+turn_timeout seconds raises TimeoutError.
+
+Every attempt's time-to-first-token, latency, tokens, cost and outcome are
+appended to llm_metrics.json in the playlist directory.
+"""
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.outputs import ChatResult
+
+from .llm import DelegatingChatModel
+
+LLM_METRICS_FILENAME = "llm_metrics.json"
+WON, LOST, FAILED, TIMED_OUT = "won", "lost", "failed", "timed_out"
+
+
+class LLMMetrics:
+    """Per-attempt records for one playlist, with a per-model summary."""
+
+    def __init__(self, path: Optional[str] = None, prices: Optional[Dict[str, List[float]]] = None):
+        self.path = path
+        # USD per million input and output tokens, by model
+        self.prices = prices or {}
+        self.turns = []
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.turns = json.load(f).get("turns", [])
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️ Could not read LLM metrics {path} ({e}); starting empty.")
+
+    @classmethod
+    def for_playlist_dir(cls, playlist_dir: str, prices: Optional[Dict[str, List[float]]] = None) -> "LLMMetrics":
+        return cls(os.path.join(playlist_dir, LLM_METRICS_FILENAME), prices)
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+        if model.endswith(":free"):
+            return 0.0
+        price = self.prices.get(model)
+        if not price:
+            return None
+        return (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+
+    def record(self, turn: int, attempt: "_Attempt", outcome: str):
+        usage = attempt.usage or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "turn": turn,
+            "model": attempt.model,
+            "outcome": outcome,
+            "hedge": attempt.hedge,
+            "ttft_ms": round(attempt.ttft * 1000) if attempt.ttft is not None else None,
+            "latency_ms": round((attempt.finished or time.perf_counter()) * 1000 - attempt.started * 1000),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost": self.cost(attempt.model, input_tokens, output_tokens),
+        }
+        if attempt.error is not None:
+            entry["error"] = str(attempt.error)[:300]
+        with self._lock:
+            self.turns.append(entry)
+            self.save()
+
+    def summary(self) -> dict:
+        models = {}
+        for entry in self.turns:
+            s = models.setdefault(entry["model"], {
+                "attempts": 0, WON: 0, LOST: 0, FAILED: 0, TIMED_OUT: 0,
+                "ttft_ms": [], "input_tokens": 0, "output_tokens": 0, "cost": 0.0,
+            })
+            s["attempts"] += 1
+            s[entry["outcome"]] += 1
+            if entry["ttft_ms"] is not None:
+                s["ttft_ms"].append(entry["ttft_ms"])
+            s["input_tokens"] += entry["input_tokens"]
+            s["output_tokens"] += entry["output_tokens"]
+            s["cost"] += entry["cost"] or 0.0
+        for s in models.values():
+            ttfts = sorted(s.pop("ttft_ms"))
+            s["ttft_ms_median"] = ttfts[len(ttfts) // 2] if ttfts else None
+            s["ttft_ms_p95"] = ttfts[min(len(ttfts) - 1, int(len(ttfts) * 0.95))] if ttfts else None
+        return models
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"models": self.summary(), "turns": self.turns}, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+
+class _Attempt:
+    def __init__(self, model: str, runnable, hedge: bool):
+        self.model = model
+        self.runnable = runnable
+        self.hedge = hedge
+        self.started = time.perf_counter()
+        self.ttft = None
+        self.finished = None
+        self.message = None
+        self.usage = None
+        self.error = None
+        self.cancelled = False
+
+    def add(self, final, chunk):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+        return chunk if final is None else final + chunk
+
+    def finish(self, final):
+        self.finished = time.perf_counter()
+        if final is None:
+            raise RuntimeError(f"{self.model} returned an empty response")
+        self.message = message_chunk_to_message(final)
+        # Which rung of the ladder answered (the LLM response cache keys on it)
+        self.message.response_metadata["ladder_model"] = self.model
+        self.usage = getattr(final, "usage_metadata", None)
+
+
+class HedgedChatModel(DelegatingChatModel):
+    """Chat model that races a ladder of models per turn (see module docstring)."""
+
+    models: List[Any] = []
+    model_names: List[str] = []
+    hedge_after_ms: int = 5000
+    turn_timeout: float = 180.0
+    metrics: Any = None
+    turns: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"models": [m.bind_tools(tools, **kwargs) for m in self.models]})
+
+    def _kwargs(self, stop):
+        return {"stop": stop} if stop else {}
+
+    def _next_turn(self) -> int:
+        # Counted on the copy bind_tools gave the agent, i.e. per agent run
+        self.turns += 1
+        return self.turns
+
+    def _settle(self, turn: int, attempts: List[_Attempt], winner: Optional[_Attempt]):
+        for attempt in attempts:
+            if attempt is winner:
+                outcome = WON
+            elif attempt.error is not None:
+                outcome = FAILED
+            elif winner is None:
+                outcome = TIMED_OUT
+            else:
+                outcome = LOST
+            attempt.cancelled = True
+            if self.metrics is not None:
+                self.metrics.record(turn, attempt, outcome)
+        if winner is not None and winner.hedge:
+            print(f"  ⚡ LLM turn {turn}: hedged request to {winner.model} answered first")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        turn = self._next_turn()
+        events = queue.Queue()
+        attempts = []
+
+        def stream(attempt):
+            final = None
+            try:
+                for chunk in attempt.runnable.stream(messages, **self._kwargs(stop)):
+                    if attempt.cancelled:
+                        return
+                    if final is None:
+                        events.put(("first_token", attempt))
+                    final = attempt.add(final, chunk)
+                attempt.finish(final)
+            except Exception as e:
+                attempt.error = e
+                attempt.finished = time.perf_counter()
+            events.put(("done", attempt))
+
+        def launch(hedge=False):
+            index = len(attempts)
+            attempt = _Attempt(self.model_names[index], self.models[index], hedge)
+            attempts.append(attempt)
+            threading.Thread(target=stream, args=(attempt,), daemon=True).start()
+
+        start = time.perf_counter()
+        deadline = start + self.turn_timeout
+        hedge_at = start + self.hedge_after_ms / 1000
+        got_token = False
+        launch()
+        while True:
+            now = time.perf_counter()
+            can_hedge = not got_token and len(attempts) < len(self.models)
+            wait_until = min(deadline, hedge_at) if can_hedge else deadline
+            try:
+                kind, attempt = events.get(timeout=max(0.0, wait_until - now))
+            except queue.Empty:
+                if time.perf_counter() >= deadline:
+                    self._settle(turn, attempts, None)
+                    raise TimeoutError(f"No model answered LLM turn {turn} within {self.turn_timeout:.0f}s")
+                launch(hedge=True)
+                hedge_at = time.perf_counter() + self.hedge_after_ms / 1000
+                continue
+
+            if kind == "first_token":
+                got_token = True
+                continue
+            if attempt.error is None:
+                self._settle(turn, attempts, attempt)
+                return self._as_result(attempt.message)
+
+            print(f"  ⚠️ LLM turn {turn}: {attempt.model} failed ({attempt.error})")
+            running = [a for a in attempts if a.finished is None]
+            if len(attempts) < len(self.models):
+                launch()
+                hedge_at = time.perf_counter() + self.hedge_after_ms / 1000
+            elif not running:
+                self._settle(turn, attempts, None)
+                raise attempt.error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        turn = self._next_turn()
+        first_token = asyncio.Event()
+        attempts, tasks = [], {}
+
+        async def stream(attempt):
+            final = None
+            try:
+                async for chunk in attempt.runnable.astream(messages, **self._kwargs(stop)):
+                    final = attempt.add(final, chunk)
+                    first_token.set()
+                attempt.finish(final)
+            except Exception as e:
+                attempt.error = e
+                attempt.finished = time.perf_counter()
+            return attempt
+
+        def launch(hedge=False):
+            attempt = _Attempt(self.model_names[len(attempts)], self.models[len(attempts)], hedge)
+            attempts.append(attempt)
+            tasks[asyncio.ensure_future(stream(attempt))] = attempt
+
+        def cancel_all():
+            for task in tasks:
+                task.cancel()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.turn_timeout
+        hedge_at = loop.time() + self.hedge_after_ms / 1000
+        launch()
+        while True:
+            can_hedge = not first_token.is_set() and len(attempts) < len(self.models)
+            wait_until = min(deadline, hedge_at) if can_hedge else deadline
+            pending = [t for t in tasks if not t.done()]
+            waiters = pending + ([asyncio.ensure_future(first_token.wait())] if can_hedge else [])
+            done, _ = await asyncio.wait(waiters, timeout=max(0.0, wait_until - loop.time()), return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                if waiter not in tasks:
+                    waiter.cancel()
+
+            finished = [tasks[t] for t in done if t in tasks]
+            winner = next((a for a in finished if a.error is None), None)
+            if winner is not None:
+                cancel_all()
+                self._settle(turn, attempts, winner)
+                return self._as_result(winner.message)
+            for attempt in finished:
+                print(f"  ⚠️ LLM turn {turn}: {attempt.model} failed ({attempt.error})")
+                if len(attempts) < len(self.models):
+                    launch()
+                    hedge_at = loop.time() + self.hedge_after_ms / 1000
+
+            if finished and all(t.done() for t in tasks):
+                self._settle(turn, attempts, None)
+                raise finished[-1].error
+            if not done:
+                if loop.time() >= deadline:
+                    cancel_all()
+                    self._settle(turn, attempts, None)
+                    raise TimeoutError(f"No model answered LLM turn {turn} within {self.turn_timeout:.0f}s")
+                if can_hedge:
+                    launch(hedge=True)
+                    hedge_at = loop.time() + self.hedge_after_ms / 1000
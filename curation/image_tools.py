@@ -1,7 +1,43 @@
-import wikipedia
 from langchain_core.tools import tool
-import requests
-from typing import Optional
+from core.clients import get_http_session
+from core.rate_limit import guarded_call
+
+WIKIPEDIA_HOST = "en.wikipedia.org"
+WIKIPEDIA_API_URL = f"https://{WIKIPEDIA_HOST}/w/api.php"
+
+
+def wikipedia_search_params(query: str) -> dict:
+    return {"action": "query", "list": "search", "srsearch": query, "srlimit": 1, "srprop": "", "format": "json"}
+
+
+def wikipedia_images_params(page_title: str) -> dict:
+    """Every file on the page with its URL, as wikipedia.page(...).images lists them."""
+    return {
+        "action": "query", "generator": "images", "gimlimit": "max", "titles": page_title,
+        "prop": "imageinfo", "iiprop": "url", "redirects": 1, "format": "json"
+    }
+
+
+def image_urls(data: dict) -> list:
+    return [page['imageinfo'][0]['url'] for page in data.get('query', {}).get('pages', {}).values() if page.get('imageinfo')]
+
+
+def format_page_images(page_title: str, images: list) -> str:
+    # Filter images (avoid SVGs, small icons, etc if possible, but for now just return list)
+    valid_images = [img for img in sorted(images) if img.lower().endswith(('.jpg', '.jpeg', '.png'))]
+
+    # Limit to top 5
+    return f"Found images on page '{page_title}':\n" + "\n".join(valid_images[:5])
+
+
+def _get_json(params: dict) -> dict:
+    def get():
+        response = get_http_session().get(WIKIPEDIA_API_URL, params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    return guarded_call(WIKIPEDIA_HOST, tuple(sorted(params.items())), get)
+
 
 @tool
 def search_wikipedia_images(query: str) -> str:
@@ -12,28 +48,22 @@ def search_wikipedia_images(query: str) -> str:
     print(f"  🖼️ Tool Call: Searching Wikipedia images for '{query}'...")
     try:
         # Search for pages
-        search_results = wikipedia.search(query)
+        search_results = _get_json(wikipedia_search_params(query)).get('query', {}).get('search', [])
         if not search_results:
             return "No Wikipedia pages found."
-            
-        # Get the first result's page
-        page_title = search_results[0]
-        try:
-            page = wikipedia.page(page_title, auto_suggest=False)
-        except wikipedia.DisambiguationError as e:
-            # If disambiguation, try the first option
-            page = wikipedia.page(e.options[0], auto_suggest=False)
-        except wikipedia.PageError:
-            return f"Page '{page_title}' not found."
-            
-        images = page.images
-        
-        # Filter images (avoid SVGs, small icons, etc if possible, but for now just return list)
-        valid_images = [img for img in images if img.lower().endswith(('.jpg', '.jpeg', '.png'))]
-        
-        # Limit to top 5
-        return f"Found images on page '{page.title}':\n" + "\n".join(valid_images[:5])
-        
+
+        # Get the first result's images
+        page_title = search_results[0]['title']
+        params = wikipedia_images_params(page_title)
+        images = []
+        while True:
+            data = _get_json(params)
+            images.extend(image_urls(data))
+            if 'continue' not in data:
+                break
+            params = {**params, **data['continue']}
+
+        return format_page_images(page_title, images)
+
     except Exception as e:
         return f"Error searching Wikipedia: {str(e)}"
-
@@ -0,0 +1,68 @@
+import json
+from typing import Any, Callable, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+
+def message_fingerprint(messages: List[BaseMessage]) -> list:
+    """Comparable view of a message list that ignores run-specific ids."""
+    fingerprint = []
+    for m in messages:
+        tool_calls = [(c["name"], c["args"]) for c in getattr(m, "tool_calls", None) or []]
+        fingerprint.append([m.type, m.content, tool_calls])
+    return json.loads(json.dumps(fingerprint, sort_keys=True, default=str))
+
+
+def rewrap_tool(tool: StructuredTool, func: Optional[Callable], coroutine: Optional[Callable] = None) -> StructuredTool:
+    """
+    Copy of the tool that runs func (and coroutine when awaited) instead; everything else
+    (name, schema, return_direct, response_format, ...) is kept.
+    """
+    return tool.model_copy(update={"func": func, "coroutine": coroutine})
+
+
+class DelegatingChatModel(BaseChatModel):
+    """
+    Base for chat models that wrap another chat model (record/replay, caching, ...).
+    bind_tools() binds the inner model and returns a copy of the wrapper, so
+    create_react_agent still sees a chat model it can drive.
+    """
+
+    inner: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "delegating"
+
+    def bind_tools(self, tools, **kwargs):
+        inner = self.inner.bind_tools(tools, **kwargs) if self.inner is not None else None
+        return self.model_copy(update={"inner": inner})
+
+    def _invoke_inner(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+    ) -> AIMessage:
+        if self.inner is None:
+            raise RuntimeError(f"{type(self).__name__} has no inner model to call")
+        if stop:
+            return self.inner.invoke(messages, stop=stop)
+        return self.inner.invoke(messages)
+
+    async def _ainvoke_inner(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+    ) -> AIMessage:
+        if self.inner is None:
+            raise RuntimeError(f"{type(self).__name__} has no inner model to call")
+        if stop:
+            return await self.inner.ainvoke(messages, stop=stop)
+        return await self.inner.ainvoke(messages)
+
+    @staticmethod
+    def _as_result(message: BaseMessage) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,135 @@
+"""
+Content-addressed cache of curation LLM turns, shared by all playlists.
+
+Each agent turn is stored on its own under data/llm_cache/, keyed on a hash of the
+model, the full message list sent to it (ids ignored, see message_fingerprint) and
+the bound tool schemas. A re-run with the same prompt and tool results therefore
+replays every turn from disk, and a conversation that diverges part way still
+replays the turns before the divergence; only the new turns reach the model.
+
+With a model ladder (see hedging.py) a turn is looked up for each model in ladder
+order and stored under the model that actually answered it.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from core.config import DATA_DIR
+
+from .llm import DelegatingChatModel, message_fingerprint
+
+LLM_CACHE_DIR = os.path.join(DATA_DIR, "llm_cache")
+
+
+def _sha256(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def tools_hash(tools, **kwargs) -> str:
+    """Hash of the tool schemas (and binding options such as tool_choice) the model is bound to."""
+    return _sha256({"tools": [convert_to_openai_tool(t) for t in tools], "options": kwargs})
+
+
+def cache_key(model: str, messages: List[BaseMessage], tools: str = "", stop: Optional[List[str]] = None) -> str:
+    return _sha256({"model": model, "tools": tools, "stop": stop, "messages": message_fingerprint(messages)})
+
+
+class LLMCache:
+    """One JSON file per cached turn, under <root>/<first two hex digits>/<key>.json."""
+
+    def __init__(self, root: str = LLM_CACHE_DIR):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return messages_from_dict([json.load(f)["response"]])[0]
+        except (json.JSONDecodeError, KeyError, OSError) as e:
+            print(f"⚠️ Ignoring unreadable LLM cache entry {path} ({e}).")
+            return None
+
+    def put(self, key: str, model: str, response: BaseMessage):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name: parallel playlists may store the same turn at once
+        tmp_path = f"{path}.{os.getpid()}.{id(response)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "model": model,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "response": messages_to_dict([response])[0],
+            }, f)
+        os.replace(tmp_path, path)
+
+
+class CachedChatModel(DelegatingChatModel):
+    """Chat model that answers turns from an LLMCache and stores the inner model's new turns in it."""
+
+    store: Any = None
+    # Ladder of model names the inner model may answer with, in lookup order
+    models: List[str] = []
+    tools_hash: str = ""
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "cached"
+
+    def bind_tools(self, tools, **kwargs):
+        bound = super().bind_tools(tools, **kwargs)
+        bound.tools_hash = tools_hash(tools, **kwargs)
+        return bound
+
+    def _lookup(self, messages: List[BaseMessage], stop: Optional[List[str]]) -> Optional[BaseMessage]:
+        for model in self.models:
+            response = self.store.get(cache_key(model, messages, self.tools_hash, stop))
+            if response is not None:
+                self.hits += 1
+                print(f"  💾 LLM turn {self.hits + self.misses}: answered from cache ({model})")
+                return response
+        self.misses += 1
+        return None
+
+    def _store(self, messages: List[BaseMessage], stop: Optional[List[str]], response: BaseMessage):
+        model = response.response_metadata.get("ladder_model") or self.models[0]
+        self.store.put(cache_key(model, messages, self.tools_hash, stop), model, response)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        response = self._lookup(messages, stop)
+        if response is None:
+            response = self._invoke_inner(messages, stop)
+            self._store(messages, stop, response)
+        return self._as_result(response)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        response = self._lookup(messages, stop)
+        if response is None:
+            response = await self._ainvoke_inner(messages, stop)
+            self._store(messages, stop, response)
+        return self._as_result(response)
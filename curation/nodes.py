@@ -5,38 +5,33 @@ from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import HumanMessage
 from langchain_core.callbacks import StdOutCallbackHandler
-from ytmusicapi import YTMusic
 from core.agent_state import AgentState
+from core.clients import get_ytmusic
+from core.rate_limit import guarded_call
 from core.config import GlobalConfig, PlaylistConfig, get_playlist_dir, playlist_path
-from core.models.playlist import CuratedPlaylist, CuratedPlaylistItem
-from .tools import search_youtube_music, search_musicbrainz, search_google
-from .image_tools import search_wikipedia_images
+from core.models.playlist import CuratedPlaylist, CuratedPlaylistItem, CuratedPlaylistStreamWriter, load_narration_overrides
+from .async_tools import CURATION_TOOLS
+from .tools import YTMUSIC_HOST
+from .budget import AgentBudget
+from .cassette import Cassette, CassetteChatModel, REPLAY
+from .compaction import compact_tools, history_compactor
+from .concurrency import limit_tools
+from .hedging import HedgedChatModel, LLMMetrics
+from .llm_cache import CachedChatModel, LLMCache
 
-def curate_playlist_node(state: AgentState):
-    playlist_id = state["playlist_id"]
-    playlist_dir = get_playlist_dir(playlist_id)
-
-    # Load playlist config for topic/duration/system prompt
-    playlist_config = PlaylistConfig.load(playlist_dir)
+CHAPTERS_DIRNAME = "chapters"
+# How much of the previous chapter's script a long-form chapter prompt carries over
+LONG_FORM_CONTEXT_CHARS = 1500
+# [TRACK: Title by Artist | ID: video_id]
+TRACK_PATTERN = re.compile(r'\[TRACK:\s*(.*?)\s*\|\s*ID:\s*([\w-]+)\s*\]')
 
+def build_curation_prompt(playlist_config: PlaylistConfig):
+    """
+    Builds the agent prompt for a playlist config.
+    Returns (system_message, user_query, full_prompt_text); the latter is what prompt.txt caches.
+    """
     topic = playlist_config.topic
-    duration = playlist_config.duration
-    duration_text = duration
-
-    # Load global config
-    global_config = GlobalConfig.load()
-
-    model_name = global_config.model
-    api_key = global_config.openrouter_api_key or os.environ.get("OPENROUTER_API_KEY")
-
-    if not api_key or api_key == "YOUR_API_KEY_HERE":
-        print("Warning: OpenRouter API key not found in config.json or environment.")
-
-    # Ensure playlist directory exists (should be done by main, but safe to ensure)
-    os.makedirs(playlist_dir, exist_ok=True)
-
-    prompt_file = playlist_path(playlist_id, "prompt.txt")
-    response_file = playlist_path(playlist_id, "response.txt")
+    duration_text = playlist_config.duration
 
     # Load system prompt from file
     system_prompt_name = playlist_config.system_prompt
@@ -64,10 +59,148 @@ def curate_playlist_node(state: AgentState):
     
     user_query = f"Create the curated playlist for {topic}"
     full_prompt_text = f"SYSTEM:\n{system_message}\n\nUSER:\n{user_query}"
-    
-    # Check for resumability
+
+    return system_message, user_query, full_prompt_text
+
+def build_curation_llm(playlist_dir: str, global_config: GlobalConfig):
+    """The configured model ladder (hedged, see hedging.py) behind the shared LLM response cache."""
+    model_name = global_config.model
+    api_key = global_config.openrouter_api_key or os.environ.get("OPENROUTER_API_KEY")
+
+    if not api_key or api_key == "YOUR_API_KEY_HERE":
+        print("Warning: OpenRouter API key not found in config.json or environment.")
+
+    ladder = [model_name] + [m for m in global_config.fallback_models if m != model_name]
+    llm = HedgedChatModel(
+        models=[
+            ChatOpenAI(
+                model=name,
+                openai_api_key=api_key,
+                openai_api_base=global_config.openrouter_base_url,
+                streaming=True,
+                stream_usage=True,
+                verbose=True
+            )
+            for name in ladder
+        ],
+        model_names=ladder,
+        hedge_after_ms=global_config.hedge_after_ms,
+        turn_timeout=global_config.llm_turn_timeout,
+        metrics=LLMMetrics.for_playlist_dir(playlist_dir, global_config.model_prices),
+    )
+    if global_config.llm_cache:
+        llm = CachedChatModel(inner=llm, store=LLMCache(), models=ladder)
+    return llm
+
+def _build_llm_and_tools(state: AgentState, playlist_dir: str, global_config: GlobalConfig):
+    """Creates the chat model and tool list for the curation agent (wrapped in a cassette if requested)."""
+    tools = limit_tools(CURATION_TOOLS, global_config.tool_concurrency)
+    cassette_mode = state.get("cassette_mode")
+
+    llm = None
+    if cassette_mode != REPLAY:
+        llm = build_curation_llm(playlist_dir, global_config)
+
+    if cassette_mode:
+        cassette = Cassette.for_playlist_dir(playlist_dir, cassette_mode)
+        print(f"📼 Cassette {cassette_mode}: {cassette.path}")
+        llm = CassetteChatModel(inner=llm, cassette=cassette)
+        tools = [cassette.wrap_tool(t) for t in tools]
+
+    return llm, tools
+
+def _create_curation_agent(llm, tools, system_message: str, budget: AgentBudget = None):
+    """
+    ReAct agent whose tool results are compacted (and condensed once stale) to keep prompts short,
+    and which is told to finish once its budget is nearly spent.
+    """
+    tools = compact_tools(tools)
+    hook = history_compactor()
+    if budget is not None:
+        tools = budget.wrap_tools(tools)
+        hook = budget.pre_model_hook(hook)
+    return create_react_agent(llm, tools, prompt=system_message, pre_model_hook=hook)
+
+def _agent_config(max_concurrency: int = None, budget: AgentBudget = None) -> dict:
+    config = {"callbacks": [StdOutCallbackHandler()], "max_concurrency": max_concurrency}
+    if budget is not None:
+        config["recursion_limit"] = budget.recursion_limit()
+    return config
+
+def _run_curation_agent(llm, tools, system_message: str, user_query: str, max_concurrency: int = None, budget: AgentBudget = None) -> str:
+    """
+    Runs the ReAct curation agent and returns its final message content.
+    Tool calls from one LLM turn run concurrently, up to max_concurrency at once.
+    """
+    agent = _create_curation_agent(llm, tools, system_message, budget)
+    try:
+        result = agent.invoke({"messages": [HumanMessage(content=user_query)]}, config=_agent_config(max_concurrency, budget))
+    finally:
+        if budget is not None:
+            budget.finish()
+    return result["messages"][-1].content
+
+async def _arun_curation_agent(llm, tools, system_message: str, user_query: str, max_concurrency: int = None, budget: AgentBudget = None) -> str:
+    """_run_curation_agent with ainvoke: the LLM and the tools' coroutines share the caller's event loop."""
+    agent = _create_curation_agent(llm, tools, system_message, budget)
+    try:
+        result = await agent.ainvoke({"messages": [HumanMessage(content=user_query)]}, config=_agent_config(max_concurrency, budget))
+    finally:
+        if budget is not None:
+            budget.finish()
+    return result["messages"][-1].content
+
+def curate_playlist_node(state: AgentState):
+    steps = _curation_steps(state)
+    try:
+        agent_run = next(steps)
+        while True:
+            agent_run = steps.send(_run_curation_agent(*agent_run))
+    except StopIteration as done:
+        return done.value
+
+async def acurate_playlist_node(state: AgentState):
+    """curate_playlist_node for async graphs (curator.py --async)."""
+    steps = _curation_steps(state)
+    try:
+        agent_run = next(steps)
+        while True:
+            agent_run = steps.send(await _arun_curation_agent(*agent_run))
+    except StopIteration as done:
+        return done.value
+
+def _curation_steps(state: AgentState):
+    """
+    The curation node as a generator, shared by the sync and async nodes: it yields
+    the arguments of every agent run it needs, is sent back the agent's final
+    content, and returns the state update.
+    """
+    playlist_id = state["playlist_id"]
+    playlist_dir = get_playlist_dir(playlist_id)
+
+    # Load playlist config for topic/duration/system prompt
+    playlist_config = PlaylistConfig.load(playlist_dir)
+
+    topic = playlist_config.topic
+
+    # Load global config
+    global_config = GlobalConfig.load()
+
+    # Ensure playlist directory exists (should be done by main, but safe to ensure)
+    os.makedirs(playlist_dir, exist_ok=True)
+
+    if playlist_config.long_form:
+        return (yield from curate_long_form(state, playlist_config, global_config))
+
+    prompt_file = playlist_path(playlist_id, "prompt.txt")
+    response_file = playlist_path(playlist_id, "response.txt")
+
+    system_message, user_query, full_prompt_text = build_curation_prompt(playlist_config)
+
+    # Check for resumability (record/replay always run the agent)
     skip_validation = state.get("skip_validation", False)
-    if os.path.exists(prompt_file) and os.path.exists(response_file):
+    cassette_mode = state.get("cassette_mode")
+    if not cassette_mode and os.path.exists(prompt_file) and os.path.exists(response_file):
         try:
             with open(prompt_file, "r") as f:
                 cached_prompt = f.read()
@@ -89,29 +222,11 @@ def curate_playlist_node(state: AgentState):
     with open(prompt_file, "w") as f:
         f.write(full_prompt_text)
 
-    llm = ChatOpenAI(
-        model=model_name,
-        openai_api_key=api_key,
-        openai_api_base="https://openrouter.ai/api/v1",
-        streaming=True,
-        verbose=True
-    )
-    
-    tools = [search_youtube_music, search_wikipedia_images, search_musicbrainz, search_google]
-    
-    # Create the agent
-    agent = create_react_agent(llm, tools, prompt=system_message)
+    llm, tools = _build_llm_and_tools(state, playlist_dir, global_config)
     
     print(f"🤖 Consulting LLM Curator Agent for '{topic}'...")
-    # Run the agent
-    result = agent.invoke(
-        {"messages": [HumanMessage(content=user_query)]},
-        config={"callbacks": [StdOutCallbackHandler()]}
-    )
-    
-    # Extract the final response
-    last_message = result["messages"][-1]
-    content = last_message.content
+    budget = AgentBudget.for_playlist(playlist_config, playlist_dir)
+    content = yield (llm, tools, system_message, user_query, global_config.max_tool_concurrency, budget)
     
     # Save the response
     with open(response_file, "w") as f:
@@ -121,6 +236,79 @@ def curate_playlist_node(state: AgentState):
     
     return {"raw_script": content}
 
+def curate_long_form(state: AgentState, playlist_config: PlaylistConfig, global_config: GlobalConfig):
+    """
+    Long-form curation: runs the agent once per chapter and persists each chapter's script
+    to chapters/chapter_NNN.txt as soon as it is produced. Finished chapters whose prompt is
+    unchanged are skipped, so an interrupted marathon resumes where it stopped. Only chapter
+    paths go into the state; verify_curation_node streams them from disk.
+    A generator like _curation_steps: yields each chapter's agent run.
+    """
+    playlist_id = state["playlist_id"]
+    playlist_dir = get_playlist_dir(playlist_id)
+    chapters_dir = playlist_path(playlist_id, CHAPTERS_DIRNAME)
+    os.makedirs(chapters_dir, exist_ok=True)
+
+    topic = playlist_config.topic
+    chapter_seconds = playlist_config.get_chapter_durations()
+    total = len(chapter_seconds)
+    skip_validation = state.get("skip_validation", False)
+    cassette_mode = state.get("cassette_mode")
+
+    print(f"📚 Long-form mode: curating '{topic}' in {total} chapters...")
+
+    llm, tools = None, None
+    chapter_paths = []
+    previous_tail = ""
+    # original_ref by video id of every track the earlier chapters used
+    used_tracks = {}
+
+    for index, seconds in enumerate(chapter_seconds, start=1):
+        chapter_config = playlist_config.model_copy(update={"duration": f"{max(1, seconds // 60)}m"})
+        system_message, _, _ = build_curation_prompt(chapter_config)
+
+        user_query = f"Create chapter {index} of {total} of the curated playlist for {topic}. This chapter should last about {chapter_config.duration}."
+        if index > 1:
+            user_query += " Do not include a [TITLE] tag."
+        if used_tracks:
+            used = "\n".join(f"- {ref} | ID: {video_id}" for video_id, ref in used_tracks.items())
+            user_query += f" Earlier chapters already used these tracks; do not use these video IDs or songs again:\n{used}\n"
+        if previous_tail:
+            user_query += f" The previous chapter ended with:\n\n{previous_tail}\n\nContinue the story from there."
+        full_prompt_text = f"SYSTEM:\n{system_message}\n\nUSER:\n{user_query}"
+
+        chapter_base = os.path.join(chapters_dir, f"chapter_{index:03d}")
+        prompt_file = f"{chapter_base}.prompt.txt"
+        response_file = f"{chapter_base}.txt"
+
+        content = None
+        if not cassette_mode and os.path.exists(prompt_file) and os.path.exists(response_file):
+            with open(prompt_file, "r") as f:
+                cached_prompt = f.read()
+            if skip_validation or cached_prompt == full_prompt_text:
+                print(f"⏩ Chapter {index}/{total}: resuming from cached response...")
+                with open(response_file, "r") as f:
+                    content = f.read()
+
+        if content is None:
+            if llm is None:
+                llm, tools = _build_llm_and_tools(state, playlist_dir, global_config)
+            with open(prompt_file, "w") as f:
+                f.write(full_prompt_text)
+            print(f"🤖 Chapter {index}/{total}: consulting LLM Curator Agent...")
+            budget = AgentBudget.for_playlist(playlist_config, playlist_dir, label=f"chapter {index}")
+            content = yield (llm, tools, system_message, user_query, global_config.max_tool_concurrency, budget)
+            with open(response_file, "w") as f:
+                f.write(content)
+            print(f"✨ Chapter {index}/{total} complete! Script length: {len(content)} characters")
+
+        chapter_paths.append(response_file)
+        previous_tail = content[-LONG_FORM_CONTEXT_CHARS:]
+        for match in TRACK_PATTERN.finditer(content):
+            used_tracks.setdefault(match.group(2), match.group(1))
+
+    return {"raw_script_chapters": chapter_paths}
+
 def clean_narrative_segment(text: str) -> str:
     """
     Cleans up markdown artifacts, labels, and image prompts from the narrative text
@@ -153,58 +341,28 @@ def extract_image_url(text: str) -> str:
         return match.group(1).strip()
     return None
 
-def verify_curation_node(state: AgentState):
+def _narration_text(overrides: dict, filename_base: str, text: str) -> str:
+    """The --regenerate-part rewrite of a segment, as long as the script still has the text it replaced."""
+    override = (overrides or {}).get(filename_base)
+    if override and override.get("original") == text:
+        return override["text"]
+    return text
+
+def _parse_script_items(raw_script: str, yt, skip_validation: bool, narrative_count: int = 0, overrides: dict = None,
+                        exclude_ids: set = None):
     """
-    Parses the raw script, verifies tracks, extracts image URLs,
-    separates narrative text, and extracts the playlist title.
+    Splits a (title-free) script into narrative and track items, verifying each track with
+    YTMusic unless skip_validation. narrative_count continues part numbering across calls;
+    overrides (narration_overrides.json) replace the text of regenerated parts. Tracks whose
+    video id is in exclude_ids are dropped, and kept ones are added to it.
+    Returns (items, markdown_lines, narrative_count).
     """
-    playlist_id = state["playlist_id"]
-    playlist_dir = get_playlist_dir(playlist_id)
-
-    playlist_config = PlaylistConfig.load(playlist_dir)
-
-    raw_script = state.get("raw_script")
-    skip_validation = state.get("skip_validation", False)
-    
-    if not raw_script:
-        print("⚠️ No script to verify.")
-        return {"narrative_segments": [], "verified_tracks": [], "segment_visual_prompts": []}
-
-    # Extract Title
-    playlist_title = None
-    title_match = re.search(r'\[TITLE:\s*(.*?)\]', raw_script)
-    if title_match:
-        playlist_title = title_match.group(1).strip()
-        print(f"📝 Found Generated Title: {playlist_title}")
-    
-    # Clean the title tag from the script so it doesn't get narrated
-    raw_script = re.sub(r'\[TITLE:.*?\]', '', raw_script).strip()
-
-    print("🕵️ Verifying curation and checking tracks...")
-    
-    # Regex to find [TRACK: Title by Artist | ID: video_id]
-    track_pattern = re.compile(r'\[TRACK:\s*(.*?)\s*\|\s*ID:\s*([\w-]+)\s*\]')
-    
     playlist_items = []
-    
-    # Initialize Markdown content (keeping for human readability)
     md_lines = []
-    md_lines.append(f"# {playlist_title or playlist_config.topic or 'Curated Playlist'}")
-    md_lines.append(f"\n**Topic:** {playlist_config.topic}")
-    if playlist_config.duration:
-        md_lines.append(f"**Target Duration:** {playlist_config.duration}")
-    md_lines.append("\n---\n")
-    
-    yt = None
-    if not skip_validation:
-        yt = YTMusic()
-    else:
-        print("⏩ Skipping track validation (assuming tracks are valid)...")
     
     last_pos = 0
-    narrative_count = 0
     
-    for match in track_pattern.finditer(raw_script):
+    for match in TRACK_PATTERN.finditer(raw_script):
         # Add text before the match as a segment
         raw_segment = raw_script[last_pos:match.start()]
         
@@ -214,6 +372,7 @@ def verify_curation_node(state: AgentState):
         if clean_segment:
             narrative_count += 1
             filename_base = f"part_{narrative_count:03d}"
+            clean_segment = _narration_text(overrides, filename_base, clean_segment)
             
             # Add to JSON structure
             playlist_items.append(CuratedPlaylistItem.make_narrative(
@@ -230,6 +389,13 @@ def verify_curation_node(state: AgentState):
         
         title_artist = match.group(1)
         video_id = match.group(2)
+        last_pos = match.end()
+
+        if exclude_ids is not None:
+            if video_id in exclude_ids:
+                print(f"  ⏭️ Skipping repeated track: {title_artist} ({video_id})")
+                continue
+            exclude_ids.add(video_id)
         
         if skip_validation:
              # Assume valid
@@ -242,7 +408,7 @@ def verify_curation_node(state: AgentState):
             # Verify with YTMusic
             print(f"  Checking track: {title_artist} ({video_id})...")
             try:
-                song_details = yt.get_song(video_id)
+                song_details = guarded_call(YTMUSIC_HOST, ("get_song", video_id), lambda: yt.get_song(video_id))
                 video_details = song_details.get('videoDetails', {})
                 valid_title = video_details.get('title', 'Unknown Title')
                 valid_author = video_details.get('author', 'Unknown Artist')
@@ -275,8 +441,6 @@ def verify_curation_node(state: AgentState):
         if t_id:
              md_lines.append(f"[Listen on YouTube Music](https://music.youtube.com/watch?v={t_id})")
         md_lines.append("\n---\n")
-
-        last_pos = match.end()
     
     # Add remaining text as final segment
     final_raw_segment = raw_script[last_pos:]
@@ -286,6 +450,7 @@ def verify_curation_node(state: AgentState):
     if final_clean_segment:
         narrative_count += 1
         filename_base = f"part_{narrative_count:03d}"
+        final_clean_segment = _narration_text(overrides, filename_base, final_clean_segment)
         
         playlist_items.append(CuratedPlaylistItem.make_narrative(
             text=final_clean_segment,
@@ -298,6 +463,66 @@ def verify_curation_node(state: AgentState):
         if final_image_url:
             md_lines.append(f"![Visual]({final_image_url})")
         md_lines.append(f"\n{final_clean_segment}\n")
+
+    return playlist_items, md_lines, narrative_count
+
+def _extract_title(raw_script: str):
+    """Returns (title or None, script with [TITLE: ...] tags removed)."""
+    playlist_title = None
+    title_match = re.search(r'\[TITLE:\s*(.*?)\]', raw_script)
+    if title_match:
+        playlist_title = title_match.group(1).strip()
+        print(f"📝 Found Generated Title: {playlist_title}")
+    
+    # Clean the title tag from the script so it doesn't get narrated
+    return playlist_title, re.sub(r'\[TITLE:.*?\]', '', raw_script).strip()
+
+def _markdown_header(playlist_title, playlist_config: PlaylistConfig):
+    md_lines = []
+    md_lines.append(f"# {playlist_title or playlist_config.topic or 'Curated Playlist'}")
+    md_lines.append(f"\n**Topic:** {playlist_config.topic}")
+    if playlist_config.duration:
+        md_lines.append(f"**Target Duration:** {playlist_config.duration}")
+    md_lines.append("\n---\n")
+    return md_lines
+
+def verify_curation_node(state: AgentState):
+    """
+    Parses the raw script, verifies tracks, extracts image URLs,
+    separates narrative text, and extracts the playlist title.
+    """
+    playlist_id = state["playlist_id"]
+    playlist_dir = get_playlist_dir(playlist_id)
+
+    playlist_config = PlaylistConfig.load(playlist_dir)
+
+    if state.get("raw_script_chapters"):
+        return verify_long_form(state, playlist_config)
+
+    raw_script = state.get("raw_script")
+    skip_validation = state.get("skip_validation", False)
+    
+    if not raw_script:
+        print("⚠️ No script to verify.")
+        return {"narrative_segments": [], "verified_tracks": [], "segment_visual_prompts": []}
+
+    # Extract Title
+    playlist_title, raw_script = _extract_title(raw_script)
+
+    print("🕵️ Verifying curation and checking tracks...")
+    
+    # Initialize Markdown content (keeping for human readability)
+    md_lines = _markdown_header(playlist_title, playlist_config)
+    
+    yt = None
+    if not skip_validation:
+        yt = get_ytmusic()
+    else:
+        print("⏩ Skipping track validation (assuming tracks are valid)...")
+    
+    overrides = load_narration_overrides(playlist_dir)
+    playlist_items, body_lines, _ = _parse_script_items(raw_script, yt, skip_validation, overrides=overrides)
+    md_lines.extend(body_lines)
     
     print(f"✨ Verification Complete! Generated {len(playlist_items)} items.")
 
@@ -325,3 +550,58 @@ def verify_curation_node(state: AgentState):
         "curated_playlist": curated_playlist.model_dump(),
         "playlist_title": playlist_title
     }
+
+def verify_long_form(state: AgentState, playlist_config: PlaylistConfig):
+    """
+    Long-form verification: parses one chapter at a time and appends its items to
+    curated_items.jsonl and playlist.md as it goes, so memory stays bounded by the
+    chapter size. The full curated_playlist.json is streamed out at the end, and only
+    item counts go back into the state.
+    """
+    playlist_id = state["playlist_id"]
+    playlist_dir = get_playlist_dir(playlist_id)
+    chapter_paths = state["raw_script_chapters"]
+    skip_validation = state.get("skip_validation", False)
+
+    print(f"🕵️ Verifying {len(chapter_paths)} chapters and checking tracks...")
+
+    yt = None
+    if not skip_validation:
+        yt = get_ytmusic()
+    else:
+        print("⏩ Skipping track validation (assuming tracks are valid)...")
+
+    overrides = load_narration_overrides(playlist_dir)
+    md_path = playlist_path(playlist_id, "playlist.md")
+    playlist_title = None
+    narrative_count = 0
+    # A track already played in an earlier chapter is dropped, however the chapter prompt fared
+    seen_ids = set()
+
+    with CuratedPlaylistStreamWriter(playlist_dir) as writer, open(md_path, "w") as md_file:
+        for index, chapter_path in enumerate(chapter_paths, start=1):
+            with open(chapter_path, "r") as f:
+                raw_script = f.read()
+
+            chapter_title, raw_script = _extract_title(raw_script)
+            if index == 1:
+                playlist_title = chapter_title
+                md_file.write("\n".join(_markdown_header(playlist_title, playlist_config)) + "\n")
+
+            items, body_lines, narrative_count = _parse_script_items(
+                raw_script, yt, skip_validation, narrative_count, overrides, exclude_ids=seen_ids
+            )
+            for item in items:
+                writer.append(item)
+            md_file.write("\n".join([f"# Chapter {index}"] + body_lines) + "\n")
+            print(f"  📚 Chapter {index}/{len(chapter_paths)}: {len(items)} items")
+
+        writer.finalize(title=playlist_title or playlist_config.topic, topic=playlist_config.topic)
+    print(f"✨ Verification Complete! Generated {sum(writer.counts.values())} items.")
+    print(f"📄 Saved formatted playlist to: {md_path}")
+    print(f"💾 Saved structured playlist to: {playlist_path(playlist_id, 'curated_playlist.json')}")
+
+    return {
+        "playlist_title": playlist_title,
+        "curated_item_counts": writer.counts
+    }
@@ -0,0 +1,95 @@
+"""
+Rewrites a single narration segment of a curated playlist (curator.py --regenerate-part N).
+
+Only the neighbouring items from curated_playlist.json go to the LLM, not the
+curation prompt or the rest of the script. The new text replaces the item's text
+in curated_playlist.json and is kept in narration_overrides.json, so
+verify_curation_node applies it again when the script is re-parsed. The part's
+audio and video are deleted so the speech and video nodes rebuild just that part;
+every other part's files are reused.
+"""
+import os
+from typing import Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from core.config import GlobalConfig, get_playlist_dir
+from core.models.playlist import CuratedPlaylist, load_narration_overrides, save_narration_overrides
+
+from .nodes import build_curation_llm, clean_narrative_segment
+
+# Items on each side of the segment that are shown to the LLM
+CONTEXT_ITEMS = 2
+CONTEXT_MAX_CHARS = 600
+
+SYSTEM_MESSAGE = (
+    "You write the spoken narration of a curated music playlist about \"{topic}\". "
+    "Rewrite the narration segment you are given so that it is engaging, accurate and flows "
+    "from what plays before it into what plays after it. Keep roughly the same length. "
+    "Reply with the narration text only: no track tags, image tags, headings or markdown."
+)
+
+
+def _describe(item) -> Optional[str]:
+    if item.type == "track":
+        return f"[Track] {item.title} by {item.artist}"
+    if item.type == "narrative":
+        text = item.text or ""
+        if len(text) > CONTEXT_MAX_CHARS:
+            text = text[:CONTEXT_MAX_CHARS - 1].rstrip() + "…"
+        return f"[Narration] {text}"
+    return None
+
+
+def build_part_prompt(playlist: CuratedPlaylist, index: int, part: int):
+    """(system message, user message) for rewriting playlist.items[index]."""
+    before = [_describe(i) for i in playlist.items[max(0, index - CONTEXT_ITEMS):index]]
+    after = [_describe(i) for i in playlist.items[index + 1:index + 1 + CONTEXT_ITEMS]]
+    sections = []
+    if any(before):
+        sections.append("Before this segment:\n" + "\n".join(d for d in before if d))
+    sections.append(f"Narration segment to rewrite (part {part}):\n{playlist.items[index].text}")
+    if any(after):
+        sections.append("After this segment:\n" + "\n".join(d for d in after if d))
+    return SYSTEM_MESSAGE.format(topic=playlist.topic), "\n\n".join(sections)
+
+
+def regenerate_part(playlist_id: str, part: int, llm=None) -> str:
+    """Rewrites narration part N and removes its audio/video for a rebuild; returns the new text."""
+    playlist_dir = get_playlist_dir(playlist_id)
+    playlist = CuratedPlaylist.load(playlist_dir)
+
+    filename_base = f"part_{part:03d}"
+    index = next(
+        (i for i, item in enumerate(playlist.items)
+         if item.type == "narrative" and item.audio_filename == f"{filename_base}.wav"),
+        None,
+    )
+    if index is None:
+        raise ValueError(f"Part {part} is not a narration segment of '{playlist_id}'.")
+    item = playlist.items[index]
+
+    if llm is None:
+        llm = build_curation_llm(playlist_dir, GlobalConfig.load())
+    system_message, user_message = build_part_prompt(playlist, index, part)
+    print(f"✍️ Regenerating narration for part {part}...")
+    response = llm.invoke([SystemMessage(content=system_message), HumanMessage(content=user_message)])
+    text = clean_narrative_segment(response.content)
+    if not text:
+        raise ValueError(f"The LLM returned no narration for part {part}.")
+
+    # "original" stays the text the script produces, however often the part is rewritten
+    overrides = load_narration_overrides(playlist_dir)
+    previous = overrides.get(filename_base, {})
+    original = previous["original"] if previous.get("text") == item.text else item.text
+    overrides[filename_base] = {"original": original, "text": text}
+    save_narration_overrides(playlist_dir, overrides)
+
+    playlist.items[index] = item.model_copy(update={"text": text})
+    playlist.save(playlist_dir)
+
+    for filename in (item.audio_filename, item.video_filename):
+        if filename and os.path.exists(os.path.join(playlist_dir, filename)):
+            os.remove(os.path.join(playlist_dir, filename))
+    print(f"💾 Part {part} rewritten ({len(text)} characters); its audio and video will be rebuilt.")
+    return text
@@ -0,0 +1,107 @@
+"""
+Targeted repair of tracks that failed verification.
+
+verify_curation_node keeps a track it could not verify as an "invalid" item (the
+video id was wrong or the video is gone). Instead of re-running the whole agent,
+repair_playlist() looks each one up on YouTube Music by the title/artist the
+curator wrote (original_ref) and swaps in the first song found that isn't already
+in the playlist. Only the invalid items of curated_playlist.json change, so the
+narration text, audio, images and videos stay valid. The [TRACK: ...] tags in
+response.txt (or the long-form chapter scripts) are patched as well, so a later
+run that re-verifies the script keeps the replacements.
+"""
+import glob
+import os
+import re
+from typing import Optional
+
+from core.clients import get_ytmusic
+from core.config import get_playlist_dir
+from core.models.playlist import CuratedPlaylist, CuratedPlaylistItem
+from core.rate_limit import guarded_call
+
+from .nodes import CHAPTERS_DIRNAME
+from .tools import YTMUSIC_HOST
+
+# Songs considered per invalid track
+SEARCH_LIMIT = 5
+
+
+def find_replacement(original_ref: str, exclude: set, yt=None) -> Optional[CuratedPlaylistItem]:
+    """First song on YouTube Music for original_ref whose video id is not in exclude, as a verified track item."""
+    yt = yt or get_ytmusic()
+    results = guarded_call(YTMUSIC_HOST, ("search", original_ref, SEARCH_LIMIT),
+                           lambda: yt.search(original_ref, filter="songs", limit=SEARCH_LIMIT))
+    for result in results or []:
+        video_id = result.get("videoId")
+        if not video_id or video_id in exclude:
+            continue
+        return CuratedPlaylistItem.make_track(
+            video_id=video_id,
+            title=result.get("title") or original_ref,
+            artist=", ".join(a["name"] for a in result.get("artists") or []) or "Unknown Artist",
+            duration=result.get("duration_seconds") or 0,
+            original_ref=original_ref,
+        )
+    return None
+
+
+def _script_paths(playlist_dir: str):
+    paths = [os.path.join(playlist_dir, "response.txt")]
+    paths += sorted(glob.glob(os.path.join(playlist_dir, CHAPTERS_DIRNAME, "chapter_*[0-9].txt")))
+    return [p for p in paths if os.path.exists(p)]
+
+
+def patch_scripts(playlist_dir: str, replacements: list) -> int:
+    """Rewrites the [TRACK: ref | ID: id] tag of each (invalid, replacement) pair in the saved scripts."""
+    patched = 0
+    for path in _script_paths(playlist_dir):
+        with open(path, "r") as f:
+            script = f.read()
+        updated = script
+        for invalid, track in replacements:
+            pattern = re.compile(
+                r"\[TRACK:\s*" + re.escape(invalid.original_ref) + r"\s*\|\s*ID:\s*" + re.escape(invalid.video_id) + r"\s*\]"
+            )
+            updated = pattern.sub(lambda _: f"[TRACK: {track.original_ref} | ID: {track.video_id}]", updated, count=1)
+        if updated != script:
+            with open(path, "w") as f:
+                f.write(updated)
+            patched += 1
+    return patched
+
+
+def repair_playlist(playlist_id: str, yt=None) -> int:
+    """Replaces the invalid tracks of a curated playlist in place; returns how many were repaired."""
+    playlist_dir = get_playlist_dir(playlist_id)
+    playlist = CuratedPlaylist.load(playlist_dir)
+
+    invalid = [i for i, item in enumerate(playlist.items) if item.type == "invalid"]
+    if not invalid:
+        print("✅ No invalid tracks to repair.")
+        return 0
+
+    print(f"🔧 Repairing {len(invalid)} invalid tracks...")
+    in_playlist = {item.video_id for item in playlist.items if item.video_id}
+    replacements = []
+    for index in invalid:
+        item = playlist.items[index]
+        print(f"  🔍 {item.original_ref} ({item.video_id}: {item.error})")
+        try:
+            track = find_replacement(item.original_ref, in_playlist, yt)
+        except Exception as e:
+            print(f"    ❌ Search failed: {e}")
+            continue
+        if track is None:
+            print("    ⚠️ No replacement found; keeping it as invalid.")
+            continue
+        print(f"    ✅ Replaced with: {track.title} by {track.artist} ({track.video_id})")
+        playlist.items[index] = track
+        in_playlist.add(track.video_id)
+        replacements.append((item, track))
+
+    if replacements:
+        playlist.save(playlist_dir)
+        patched = patch_scripts(playlist_dir, replacements)
+        print(f"💾 Repaired {len(replacements)}/{len(invalid)} tracks in curated_playlist.json ({patched} script files patched).")
+    return len(replacements)
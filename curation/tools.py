@@ -1,11 +1,11 @@
-from ytmusicapi import YTMusic
 from langchain_core.tools import tool
-import musicbrainzngs
 import json
-from duckduckgo_search import DDGS
+from core.clients import get_ddgs, get_musicbrainz, get_ytmusic
+from core.rate_limit import guarded_call
 
-# Initialize MusicBrainz
-musicbrainzngs.set_useragent("PlaylistCurator", "0.1", "http://example.com")
+YTMUSIC_HOST = "music.youtube.com"
+MUSICBRAINZ_HOST = "musicbrainz.org"
+DUCKDUCKGO_HOST = "duckduckgo.com"
 
 @tool
 def search_youtube_music(query: str, limit: int = 3) -> str:
@@ -17,8 +17,7 @@ def search_youtube_music(query: str, limit: int = 3) -> str:
     # We'll try without headers first.
     print(f"  🔍 Tool Call: Searching YouTube Music for '{query}'...")
     try:
-        yt = YTMusic()
-        results = yt.search(query, filter="songs", limit=limit)
+        results = guarded_call(YTMUSIC_HOST, ("search", query, limit), lambda: get_ytmusic().search(query, filter="songs", limit=limit))
         
         formatted_results = []
         for result in results:
@@ -43,9 +42,10 @@ def search_musicbrainz(query: str, type: str = "artist") -> str:
     """
     print(f"  🧠 Tool Call: Searching MusicBrainz for '{query}' (type: {type})...")
     try:
+        musicbrainzngs = get_musicbrainz()
         if type == "artist":
             # Search for artist
-            result = musicbrainzngs.search_artists(artist=query, limit=3)
+            result = guarded_call(MUSICBRAINZ_HOST, ("artist", query), lambda: musicbrainzngs.search_artists(artist=query, limit=3))
             artists = result.get('artist-list', [])
             
             output = []
@@ -59,7 +59,7 @@ def search_musicbrainz(query: str, type: str = "artist") -> str:
             return "\n".join(output)
             
         elif type == "recording":
-             result = musicbrainzngs.search_recordings(recording=query, limit=3)
+             result = guarded_call(MUSICBRAINZ_HOST, ("recording", query), lambda: musicbrainzngs.search_recordings(recording=query, limit=3))
              recordings = result.get('recording-list', [])
              output = []
              for rec in recordings:
@@ -77,7 +77,7 @@ def search_musicbrainz(query: str, type: str = "artist") -> str:
              return "\n".join(output)
              
         elif type == "release":
-            result = musicbrainzngs.search_releases(release=query, limit=3)
+            result = guarded_call(MUSICBRAINZ_HOST, ("release", query), lambda: musicbrainzngs.search_releases(release=query, limit=3))
             releases = result.get('release-list', [])
             output = []
             for r in releases:
@@ -101,7 +101,7 @@ def search_google(query: str) -> str:
     """
     print(f"  🌐 Tool Call: Searching Web for '{query}'...")
     try:
-        results = DDGS().text(query, max_results=3)
+        results = guarded_call(DUCKDUCKGO_HOST, ("text", query), lambda: get_ddgs().text(query, max_results=3))
         output = []
         for r in results:
             title = r.get('title')
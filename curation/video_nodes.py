@@ -1,9 +1,22 @@
 import os
-import requests
 import shutil
 import json
+import itertools
+from urllib.parse import urlparse
 from core.agent_state import AgentState
+from core.clients import get_http_session
+from core.rate_limit import THROTTLED, guarded_call
 from core.config import get_playlist_dir, playlist_path
+from core.models.playlist import iter_curated_items
+
+def _get_image(url, headers):
+    response = get_http_session().get(url, headers=headers, stream=True, timeout=10)
+    # Let the rate limiter see throttling and outages; other statuses are reported below
+    if response.status_code in THROTTLED or response.status_code >= 500:
+        # Hand the pooled connection back before raising
+        response.close()
+        response.raise_for_status()
+    return response
 
 def generate_images_node(state: AgentState):
     """
@@ -19,20 +32,18 @@ def generate_images_node(state: AgentState):
         raise FileNotFoundError(f"{curated_json_path} missing")
         
     try:
-        with open(curated_json_path, "r") as f:
-            curated_data = json.load(f)
+        # Streamed so long-form playlists never load every item at once
+        narrative_items = (item for item in iter_curated_items(playlist_dir) if item.get("type") == "narrative")
+        first_item = next(narrative_items, None)
     except json.JSONDecodeError:
         print(f"❌ Error: Invalid JSON in {curated_json_path}")
         raise
-
-    items = curated_data.get("items", [])
-    # Filter for narrative items that have an image_url
-    narrative_items = [item for item in items if item.get("type") == "narrative"]
     
-    if not narrative_items:
+    if first_item is None:
         return {}
+    narrative_items = itertools.chain([first_item], narrative_items)
         
-    print(f"🖼️  Processing images for {len(narrative_items)} segments...")
+    print("🖼️  Processing images for narrative segments...")
     
     # Ensure we have a default placeholder just in case
     placeholder_path = playlist_path(playlist_id, "placeholder.jpg")
@@ -73,15 +84,14 @@ def generate_images_node(state: AgentState):
         if url and url.startswith("http"):
             print(f"  - Downloading image for {base_name}: {url}...")
             try:
-                response = requests.get(url, headers=headers, stream=True, timeout=10)
-                if response.status_code == 200:
-                    with open(target_path, 'wb') as f:
-                        for chunk in response.iter_content(1024):
-                            f.write(chunk)
-                    print(f"    ✅ Saved to {target_path}")
-                    downloaded_images.append(target_path)
-                    continue
-                else:
+                with guarded_call(urlparse(url).netloc, url, lambda: _get_image(url, headers)) as response:
+                    if response.status_code == 200:
+                        with open(target_path, 'wb') as f:
+                            for chunk in response.iter_content(1024):
+                                f.write(chunk)
+                        print(f"    ✅ Saved to {target_path}")
+                        downloaded_images.append(target_path)
+                        continue
                     print(f"    ❌ Failed to download (status {response.status_code})")
             except Exception as e:
                 print(f"    ❌ Error downloading: {e}")
@@ -101,17 +111,12 @@ def create_video_node(state: AgentState):
         print(f"❌ Error: {curated_json_path} not found. Cannot create videos.")
         raise FileNotFoundError(f"{curated_json_path} missing")
         
-    try:
-        with open(curated_json_path, "r") as f:
-            curated_data = json.load(f)
-    except json.JSONDecodeError:
-        raise
-
-    items = curated_data.get("items", [])
-    narrative_items = [item for item in items if item.get("type") == "narrative"]
+    narrative_items = (item for item in iter_curated_items(playlist_dir) if item.get("type") == "narrative")
+    first_item = next(narrative_items, None)
     
-    if not narrative_items:
+    if first_item is None:
         return {"video_paths": []}
+    narrative_items = itertools.chain([first_item], narrative_items)
         
     video_paths = []
     
@@ -127,7 +132,7 @@ def create_video_node(state: AgentState):
         print("❌ Error: FFmpeg not found. Please install it (e.g., 'brew install ffmpeg').")
         raise RuntimeError("FFmpeg not found")
         
-    print(f"🎥 Creating videos for {len(narrative_items)} segments using {ffmpeg_cmd}...")
+    print(f"🎥 Creating videos for narrative segments using {ffmpeg_cmd}...")
     
     from speech_to_video.video_creator import VideoCreator
     creator = VideoCreator(output_dir=playlist_dir)
@@ -2,25 +2,45 @@ import sys
 import os
 import time
 import argparse
+import asyncio
 import shutil
 from langgraph.graph import StateGraph, END
 from core.agent_state import AgentState
 from text_to_speech.nodes import generate_speech_node
-from curation.nodes import curate_playlist_node, verify_curation_node
+from curation.nodes import curate_playlist_node, acurate_playlist_node, verify_curation_node
 from curation.video_nodes import generate_images_node, create_video_node
 from core.config import PlaylistConfig, get_playlist_dir
 
 # --- Graph Definition ---
 
-def build_workflow(inference_only=False):
+def build_workflow(inference_only=False, node_wrapper=None, use_async=False, render_only=False):
+    """
+    Builds the curation graph. node_wrapper(name, fn) -> fn, if given, is applied to
+    every node (used for profiling); without it the nodes are registered untouched.
+    use_async registers the async curation node; the graph must then be run with ainvoke.
+    render_only builds just speech -> images -> video from the saved curated_playlist.json.
+    """
     builder = StateGraph(AgentState)
 
-    builder.add_node("curate_playlist", curate_playlist_node)
-    builder.add_node("verify_curation", verify_curation_node)
+    def add_node(name, fn):
+        builder.add_node(name, node_wrapper(name, fn) if node_wrapper else fn)
+
+    if render_only:
+        add_node("generate_speech", generate_speech_node)
+        add_node("generate_images", generate_images_node)
+        add_node("create_video", create_video_node)
+        builder.set_entry_point("generate_speech")
+        builder.add_edge("generate_speech", "generate_images")
+        builder.add_edge("generate_images", "create_video")
+        builder.add_edge("create_video", END)
+        return builder.compile()
+
+    add_node("curate_playlist", acurate_playlist_node if use_async else curate_playlist_node)
+    add_node("verify_curation", verify_curation_node)
     if not inference_only:
-        builder.add_node("generate_speech", generate_speech_node)
-        builder.add_node("generate_images", generate_images_node)
-        builder.add_node("create_video", create_video_node)
+        add_node("generate_speech", generate_speech_node)
+        add_node("generate_images", generate_images_node)
+        add_node("create_video", create_video_node)
     builder.set_entry_point("curate_playlist")
 
     builder.add_edge("curate_playlist", "verify_curation")
@@ -35,6 +55,13 @@ def build_workflow(inference_only=False):
 
     return builder.compile()
 
+async def run_workflow_async(app, initial_state):
+    from core.clients import aclose_async_http_client
+    try:
+        return await app.ainvoke(initial_state)
+    finally:
+        await aclose_async_http_client()
+
 # --- Main Execution ---
 
 def main():
@@ -47,6 +74,19 @@ def main():
     parser.add_argument("--clean", action="store_true", help="Remove generated files before starting")
     parser.add_argument("--inference-only", action="store_true", help="Only generate the playlist text/script, skip TTS and video generation")
     parser.add_argument("--skip-validation", action="store_true", help="Skip checking for prompt equality and re-validating tracks (implies resume)")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", action="store_true", help="Run the curation agent and record every LLM turn and tool call to cassette.json")
+    cassette_group.add_argument("--replay", action="store_true", help="Re-run the curation agent offline from cassette.json")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run the graph with ainvoke and the curation tools' async variants on one event loop")
+    parser.add_argument("--repair", action="store_true",
+                        help="Replace the tracks verification marked invalid with YouTube Music matches for their title/artist, "
+                             "patching curated_playlist.json and response.txt in place, then exit")
+    parser.add_argument("--regenerate-part", type=int, metavar="N",
+                        help="Rewrite narration part N from its neighbouring items only, then rebuild just that part's audio and video")
+    parser.add_argument("--profile", nargs="?", const="all", default=None, metavar="NODE,...",
+                        help="Profile graph nodes with cProfile (all nodes, or a comma-separated list). "
+                             "Writes profiles/<node>.prof and a merged profile.folded into the playlist dir")
     args = parser.parse_args()
     
     playlist_id = args.playlist_id
@@ -61,6 +101,11 @@ def main():
         print(f"Expected structure: data/playlists/<id>/config.json")
         sys.exit(1)
 
+    if args.repair:
+        from curation.repair import repair_playlist
+        repair_playlist(playlist_id)
+        return
+
     # Handle --clean
     if args.clean:
         print(f"⚠️  WARNING: You are about to delete all generated files in '{playlist_dir}'.")
@@ -102,6 +147,20 @@ def main():
     seconds = playlist_config.get_duration_seconds()
 
     print(f"Target Duration: {duration_str} ({seconds} seconds)")
+    if playlist_config.long_form:
+        print(f"Mode: Long-form ({len(playlist_config.get_chapter_durations())} chapters of up to {playlist_config.chapter_duration})")
+
+    if args.regenerate_part is not None:
+        from curation.regenerate import regenerate_part
+        try:
+            regenerate_part(playlist_id, args.regenerate_part)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if not args.inference_only:
+            build_workflow(render_only=True).invoke({"playlist_id": playlist_id})
+        print(f"\n✅ Part {args.regenerate_part} regenerated in {time.time() - start_time:.2f} seconds")
+        return
 
     print(f"Running workflow for playlist: {playlist_id}")
     print(f"Topic: {topic}")
@@ -111,26 +170,43 @@ def main():
     
     initial_state = {
         "playlist_id": playlist_id,
-        "skip_validation": args.skip_validation
+        "skip_validation": args.skip_validation,
+        "cassette_mode": "record" if args.record else "replay" if args.replay else None
     }
     
     # Run the graph
     print("Building workflow graph...")
-    app = build_workflow(inference_only=args.inference_only)
+    node_wrapper = None
+    if args.profile:
+        from core.profiling import make_profiling_wrapper, profile_output_dir
+        profile_nodes = None if args.profile == "all" else [n.strip() for n in args.profile.split(",") if n.strip()]
+        node_wrapper = make_profiling_wrapper(profile_nodes)
+        print(f"Profiling: {', '.join(profile_nodes) if profile_nodes else 'all nodes'} -> {profile_output_dir(playlist_id)}")
+    app = build_workflow(inference_only=args.inference_only, node_wrapper=node_wrapper, use_async=args.use_async)
     print("Executing workflow...")
-    result = app.invoke(initial_state)
+    if args.use_async:
+        result = asyncio.run(run_workflow_async(app, initial_state))
+    else:
+        result = app.invoke(initial_state)
     
     end_time = time.time()
     duration = end_time - start_time
     print(f"\n✅ Workflow Complete in {duration:.2f} seconds")
     
     # Print summary
-    raw_script = result.get('raw_script')
-    script_preview = raw_script[:200] + "..." if raw_script and len(raw_script) > 200 else raw_script
-    print(f"Generated Script (preview): {script_preview}")
+    chapters = result.get("raw_script_chapters")
+    if chapters:
+        print(f"Generated Script: {len(chapters)} chapters in {os.path.dirname(chapters[0])}")
+    else:
+        raw_script = result.get('raw_script')
+        script_preview = raw_script[:200] + "..." if raw_script and len(raw_script) > 200 else raw_script
+        print(f"Generated Script (preview): {script_preview}")
     
+    counts = result.get("curated_item_counts")
     curated = result.get("curated_playlist")
-    if curated:
+    if counts:
+        print(f"\n📄 Curated items -> Narrations: {counts.get('narrative', 0)}, Tracks: {counts.get('track', 0)}")
+    elif curated:
         items = curated.get("items", [])
         narrations = sum(1 for i in items if i.get("type") == "narrative")
         tracks = sum(1 for i in items if i.get("type") == "track")
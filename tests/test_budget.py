@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langgraph.errors import GraphRecursionError
+
+from curation.budget import BUDGET_EXHAUSTED, BUDGET_USAGE_FILENAME, AgentBudget
+from curation.nodes import _run_curation_agent
+
+
+class SearchingChatModel(BaseChatModel):
+    """Keeps searching, two calls per turn, until it is told about the budget (unless stubborn)."""
+
+    stubborn: bool = False
+    turns: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "searching"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.turns += 1
+        if messages[-1].content.startswith("[Budget]") and not self.stubborn:
+            message = AIMessage(content="Final script")
+        else:
+            message = AIMessage(content="", tool_calls=[
+                {"name": "lookup", "args": {"query": f"q{self.turns}-{i}"}, "id": f"call_{self.turns}_{i}"} for i in range(2)
+            ])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class TestAgentBudget(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.lookups = []
+
+        @tool
+        def lookup(query: str) -> str:
+            """Looks something up."""
+            self.lookups.append(query)
+            return f"Title: Song, Artist: Artist, ID: {query}"
+
+        self.lookup = lookup
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _budget(self, **limits):
+        limits = {"max_tool_calls": 10, "max_llm_turns": 10, "deadline": 60, **limits}
+        return AgentBudget(path=os.path.join(self.temp_dir, BUDGET_USAGE_FILENAME), **limits)
+
+    def test_agent_is_told_to_finalize_and_usage_is_reported(self):
+        budget = self._budget(max_tool_calls=5)
+        llm = SearchingChatModel()
+        self.assertEqual(_run_curation_agent(llm, [self.lookup], "system", "Make a playlist", budget=budget), "Final script")
+
+        # 4 calls reach 80% of 5: the third turn is told to finish
+        self.assertEqual(len(self.lookups), 4)
+        self.assertEqual(llm.turns, 3)
+        with open(os.path.join(self.temp_dir, BUDGET_USAGE_FILENAME)) as f:
+            usage = json.load(f)
+        self.assertEqual(usage[-1]["tool_calls"], {"used": 4, "limit": 5})
+        self.assertEqual(usage[-1]["llm_turns"], {"used": 3, "limit": 10})
+
+    def test_tools_refuse_and_the_run_stops_when_the_agent_ignores_the_budget(self):
+        budget = self._budget(max_tool_calls=3, max_llm_turns=4)
+        results = [budget.wrap_tools([self.lookup])[0].invoke({"query": str(i)}) for i in range(4)]
+        self.assertEqual(results[-1], BUDGET_EXHAUSTED)
+
+        budget = self._budget(max_tool_calls=3, max_llm_turns=4)
+        self.lookups.clear()
+        with self.assertRaises(GraphRecursionError):
+            _run_curation_agent(SearchingChatModel(stubborn=True), [self.lookup], "system", "Make a playlist", budget=budget)
+        self.assertEqual(len(self.lookups), 3)
+        with open(os.path.join(self.temp_dir, BUDGET_USAGE_FILENAME)) as f:
+            self.assertEqual(len(json.load(f)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
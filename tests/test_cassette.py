@@ -0,0 +1,81 @@
+import unittest
+import os
+import shutil
+import tempfile
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from curation.cassette import Cassette, CassetteChatModel, CassetteMismatchError
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Asks for one tool call, then answers with the tool result."""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if self.calls == 1:
+            message = AIMessage(content="", tool_calls=[{"name": "lookup", "args": {"query": "Miles Davis"}, "id": "call_1"}])
+        else:
+            message = AIMessage(content=f"Final script using: {messages[-1].content}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.live_calls = []
+
+        @tool
+        def lookup(query: str) -> str:
+            """Looks something up."""
+            self.live_calls.append(query)
+            return f"result for {query}"
+
+        self.lookup = lookup
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _run(self, cassette, inner):
+        llm = CassetteChatModel(inner=inner, cassette=cassette)
+        agent = create_react_agent(llm, [cassette.wrap_tool(self.lookup)], prompt="system")
+        result = agent.invoke({"messages": [HumanMessage(content="Make a playlist")]})
+        return result["messages"][-1].content
+
+    def test_record_then_replay_offline(self):
+        recorded = self._run(Cassette.for_playlist_dir(self.temp_dir, "record"), ScriptedChatModel())
+        self.assertEqual(recorded, "Final script using: result for Miles Davis")
+        self.assertEqual(self.live_calls, ["Miles Davis"])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "cassette.json")))
+
+        # Replay: no inner model, and the live tool must not be called again
+        replayed = self._run(Cassette.for_playlist_dir(self.temp_dir, "replay"), None)
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(self.live_calls, ["Miles Davis"])
+
+    def test_replay_exhausted_raises(self):
+        cassette = Cassette.for_playlist_dir(self.temp_dir, "record")
+        cassette.save()
+        replay = Cassette.for_playlist_dir(self.temp_dir, "replay")
+        with self.assertRaises(CassetteMismatchError):
+            replay.replay_llm([HumanMessage(content="hi")])
+        with self.assertRaises(CassetteMismatchError):
+            replay.replay_tool("lookup", {"query": "x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import tempfile
+import shutil
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from yt_music.client import ListCache, execute_cached
+
+
+class NotModified(Exception):
+    resp = SimpleNamespace(status=304)
+
+
+class TestListCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = ListCache(path=os.path.join(self.test_dir, "cache.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def make_request(self, result):
+        request = MagicMock(uri="https://youtube/playlistItems?playlistId=PL", headers={})
+        if isinstance(result, Exception):
+            request.execute.side_effect = result
+        else:
+            request.execute.return_value = result
+        return request
+
+    def test_unchanged_page_served_from_cache(self):
+        page = {"etag": "e1", "items": [{"id": "item_1"}]}
+        self.assertEqual(execute_cached(self.make_request(page), self.cache), page)
+        self.cache.save()
+
+        cache = ListCache(path=self.cache.path)
+        request = self.make_request(NotModified())
+        self.assertEqual(execute_cached(request, cache), page)
+        self.assertEqual(request.headers["If-None-Match"], "e1")
+
+    def test_changed_page_replaces_cache_entry(self):
+        execute_cached(self.make_request({"etag": "e1", "items": []}), self.cache)
+        newer = {"etag": "e2", "items": [{"id": "item_2"}]}
+        self.assertEqual(execute_cached(self.make_request(newer), self.cache), newer)
+        self.assertEqual(self.cache.get("https://youtube/playlistItems?playlistId=PL"), newer)
+
+
+if __name__ == "__main__":
+    unittest.main()
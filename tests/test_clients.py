@@ -0,0 +1,37 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core import clients
+
+
+class TestClients(unittest.TestCase):
+    def setUp(self):
+        clients.reset_clients()
+
+    def tearDown(self):
+        clients.reset_clients()
+
+    def test_clients_are_created_once_and_shared(self):
+        fake_ytmusic = MagicMock()
+        with patch("ytmusicapi.YTMusic", fake_ytmusic):
+            seen = []
+            threads = [threading.Thread(target=lambda: seen.append(clients.get_ytmusic())) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(fake_ytmusic.call_count, 1)
+        self.assertTrue(all(yt is seen[0] for yt in seen))
+        fake_ytmusic.assert_called_once_with(requests_session=clients.get_http_session())
+
+    def test_http_session_pools_connections(self):
+        session = clients.get_http_session()
+        self.assertIs(session, clients.get_http_session())
+        adapter = session.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_maxsize, clients.HTTP_POOL_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
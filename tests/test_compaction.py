@@ -0,0 +1,131 @@
+import time
+import unittest
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from curation.compaction import STALE_MAX_CHARS, STALE_PREFIX, compact_text, compact_tools, history_compactor
+
+
+def song_lines(ids):
+    return "\n".join(f"Title: Song {i}, Artist: Artist {i}, ID: vid{i:08d}" for i in ids)
+
+
+def tool_turn(turn, name, content):
+    call_id = f"call_{turn}"
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": {"query": str(turn)}, "id": call_id}]),
+        ToolMessage(content=content, name=name, tool_call_id=call_id),
+    ]
+
+
+class ParallelSearchModel(BaseChatModel):
+    """Runs two searches in one turn, then records the tool results it was shown."""
+
+    shown: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "parallel-search"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if messages[-1].type == "human":
+            tool_calls = [{"name": "search_youtube_music", "args": {"query": q}, "id": f"call_{q}"} for q in ("slow", "fast")]
+            message = AIMessage(content="", tool_calls=tool_calls)
+        else:
+            self.shown.append([m.content for m in messages if m.type == "tool"])
+            message = AIMessage(content="done")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class TestCompaction(unittest.TestCase):
+    def test_results_are_budgeted_and_deduplicated(self):
+        @tool
+        def search_youtube_music(query: str, limit: int = 3) -> str:
+            """Searches."""
+            return song_lines(range(8)) if query == "first" else song_lines(range(3, 7))
+
+        search = compact_tools([search_youtube_music])[0]
+
+        first = search.invoke({"query": "first"})
+        self.assertEqual(len(first.splitlines()), 5)
+
+        messages = [HumanMessage(content="Make a playlist")]
+        messages += tool_turn(0, "search_youtube_music", first)
+        messages += tool_turn(1, "search_youtube_music", search.invoke({"query": "second"}))
+        compacted = history_compactor()({"messages": messages})["llm_input_messages"]
+
+        self.assertEqual(compacted[2].content, first)
+        # Songs 3 and 4 were shown; 5 and 6 were cut by the budget, so they are new
+        self.assertEqual(compacted[4].content.splitlines(), [
+            "Title: Song 5, Artist: Artist 5, ID: vid00000005",
+            "Title: Song 6, Artist: Artist 6, ID: vid00000006",
+            "(2 results omitted: already shown)",
+        ])
+
+    def test_parallel_results_are_deduplicated_in_call_order(self):
+        @tool
+        def search_youtube_music(query: str, limit: int = 3) -> str:
+            """Searches."""
+            # The first call finishes last
+            time.sleep(0.2 if query == "slow" else 0)
+            return song_lines(range(3))
+
+        model = ParallelSearchModel(shown=[])
+        agent = create_react_agent(model, compact_tools([search_youtube_music]), prompt="system",
+                                   pre_model_hook=history_compactor())
+        agent.invoke({"messages": [HumanMessage(content="Make a playlist")]}, config={"max_concurrency": 2})
+
+        self.assertEqual(model.shown, [[song_lines(range(3)), "(3 results omitted: already shown)"]])
+
+    def test_truncation_keeps_ids_and_urls(self):
+        line = f"Title: {'Very Long Title ' * 5}, Artist: {', '.join(f'Artist {i}' for i in range(6))}, ID: vid00000001"
+        self.assertGreater(len(line), STALE_MAX_CHARS)
+        condensed = compact_text("search_youtube_music", line, max_chars=STALE_MAX_CHARS)
+        self.assertLessEqual(len(condensed), STALE_MAX_CHARS)
+        self.assertTrue(condensed.startswith("Title: Very Long Title"))
+        self.assertTrue(condensed.endswith("…, ID: vid00000001"))
+
+        url = "https://upload.wikimedia.org/wikipedia/commons/a/ab/Miles_Davis.jpg"
+        source = f"Source: Page | Summary: {'words ' * 80} see {url}"
+        condensed = compact_text("search_google", source, max_chars=STALE_MAX_CHARS)
+        self.assertTrue(condensed.startswith("Source: Page | Summary: words"))
+        self.assertIn(url, condensed)
+
+    def test_web_sources_become_one_line_each(self):
+        @tool
+        def search_google(query: str) -> str:
+            """Searches."""
+            return "\n".join(f"Source: Page {i}\nSummary: {'words ' * 200}\n" for i in range(5))
+
+        lines = compact_tools([search_google])[0].invoke({"query": "jazz"}).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("Source: Page 0 | Summary: words"))
+        self.assertLessEqual(len(lines[0]), 400)
+
+    def test_stale_tool_results_are_condensed(self):
+        summaries = [f"Source: Page {turn} | Summary: " + ("words " * 60).rstrip() for turn in range(3)]
+        messages = [HumanMessage(content="Make a playlist")]
+        for turn, summary in enumerate(summaries):
+            messages += tool_turn(turn, "search_google", summary)
+
+        compacted = history_compactor(keep_recent_turns=2)({"messages": messages})["llm_input_messages"]
+
+        self.assertEqual(len(compacted), len(messages))
+        self.assertTrue(compacted[2].content.startswith(STALE_PREFIX))
+        self.assertLess(len(compacted[2].content), len(summaries[0]))
+        self.assertEqual(compacted[4].content, summaries[1])
+        self.assertEqual(compacted[6].content, summaries[2])
+        # The agent's own history keeps the full text
+        self.assertEqual(messages[2].content, summaries[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
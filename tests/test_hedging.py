@@ -0,0 +1,99 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from curation.hedging import HedgedChatModel, LLMMetrics
+
+
+class StreamingModel(BaseChatModel):
+    """Waits `delay` seconds, then streams `reply` word by word (or raises `error`)."""
+
+    reply: str = ""
+    delay: float = 0.0
+    error: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "streaming-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    def _chunks(self):
+        for word in self.reply.split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        yield from self._chunks()
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        for chunk in self._chunks():
+            yield chunk
+
+
+class TestHedgedChatModel(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.metrics = LLMMetrics.for_playlist_dir(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _model(self, *models, hedge_after_ms=100, turn_timeout=5.0):
+        return HedgedChatModel(
+            models=list(models), model_names=[f"model-{i}" for i in range(len(models))],
+            hedge_after_ms=hedge_after_ms, turn_timeout=turn_timeout, metrics=self.metrics,
+        )
+
+    def test_slow_primary_is_hedged(self):
+        llm = self._model(StreamingModel(reply="slow answer", delay=1.0), StreamingModel(reply="fast answer"))
+        start = time.perf_counter()
+        self.assertEqual(llm.invoke([HumanMessage(content="hi")]).content.strip(), "fast answer")
+        self.assertLess(time.perf_counter() - start, 0.8)
+
+        outcomes = {t["model"]: t["outcome"] for t in self.metrics.turns}
+        self.assertEqual(outcomes, {"model-0": "lost", "model-1": "won"})
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "llm_metrics.json")))
+
+    def test_primary_answering_in_time_is_not_hedged(self):
+        llm = self._model(StreamingModel(reply="primary answer"), StreamingModel(reply="never asked"))
+        self.assertEqual(llm.invoke([HumanMessage(content="hi")]).content.strip(), "primary answer")
+        self.assertEqual([t["model"] for t in self.metrics.turns], ["model-0"])
+        self.assertIsNotNone(self.metrics.turns[0]["ttft_ms"])
+
+    def test_failure_falls_back_to_the_next_model(self):
+        llm = self._model(StreamingModel(error="429 Too Many Requests"), StreamingModel(reply="fallback"), hedge_after_ms=10_000)
+        self.assertEqual(llm.invoke([HumanMessage(content="hi")]).content.strip(), "fallback")
+        self.assertEqual([t["outcome"] for t in self.metrics.turns], ["failed", "won"])
+
+    def test_turn_timeout(self):
+        llm = self._model(StreamingModel(reply="too late", delay=1.0), turn_timeout=0.2)
+        with self.assertRaises(TimeoutError):
+            llm.invoke([HumanMessage(content="hi")])
+
+    def test_async_hedging(self):
+        llm = self._model(StreamingModel(reply="slow answer", delay=1.0), StreamingModel(reply="fast answer"))
+        result = asyncio.run(llm.ainvoke([HumanMessage(content="hi")]))
+        self.assertEqual(result.content.strip(), "fast answer")
+        self.assertEqual({t["model"]: t["outcome"] for t in self.metrics.turns}, {"model-0": "lost", "model-1": "won"})
+
+
+if __name__ == '__main__':
+    unittest.main()
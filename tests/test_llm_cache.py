@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from curation.llm_cache import CachedChatModel, LLMCache
+
+
+class CountingChatModel(BaseChatModel):
+    """Asks for one tool call, then answers with the tool result; counts the turns it answers."""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if messages[-1].type == "human":
+            # A fresh id each time: the cache must not depend on it
+            message = AIMessage(content="", tool_calls=[{"name": "lookup", "args": {"query": "Miles Davis"}, "id": f"call_{self.calls}"}])
+        else:
+            message = AIMessage(content=f"Final script using: {messages[-1].content}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = LLMCache(os.path.join(self.temp_dir, "llm_cache"))
+        self.result = "Kind of Blue"
+
+        @tool
+        def lookup(query: str) -> str:
+            """Looks something up."""
+            return self.result
+
+        self.lookup = lookup
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _run(self, inner, tools=None, model="test/model"):
+        llm = CachedChatModel(inner=inner, store=self.store, models=[model])
+        agent = create_react_agent(llm, tools or [self.lookup], prompt="system")
+        result = agent.invoke({"messages": [HumanMessage(content="Make a playlist")]})
+        return result["messages"][-1].content
+
+    def test_identical_run_replays_from_cache(self):
+        first = CountingChatModel()
+        self.assertEqual(self._run(first), "Final script using: Kind of Blue")
+        self.assertEqual(first.calls, 2)
+
+        second = CountingChatModel()
+        self.assertEqual(self._run(second), "Final script using: Kind of Blue")
+        self.assertEqual(second.calls, 0)
+
+    def test_common_prefix_is_reused(self):
+        self._run(CountingChatModel())
+
+        # Same first turn, different tool result: only the second turn is new
+        self.result = "Bitches Brew"
+        inner = CountingChatModel()
+        self.assertEqual(self._run(inner), "Final script using: Bitches Brew")
+        self.assertEqual(inner.calls, 1)
+
+    def test_model_and_tool_schema_are_part_of_the_key(self):
+        self._run(CountingChatModel())
+
+        other_model = CountingChatModel()
+        self._run(other_model, model="test/other-model")
+        self.assertEqual(other_model.calls, 2)
+
+        @tool
+        def lookup(query: str, limit: int = 3) -> str:
+            """Looks something up."""
+            return "Kind of Blue"
+
+        other_tools = CountingChatModel()
+        self._run(other_tools, tools=[lookup])
+        self.assertEqual(other_tools.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
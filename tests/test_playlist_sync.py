@@ -0,0 +1,58 @@
+import unittest
+import random
+
+from yt_music.playlist_sync import plan_sync
+
+
+def make_items(video_ids):
+    return [{"id": f"item_{i}", "contentDetails": {"videoId": v}} for i, v in enumerate(video_ids)]
+
+
+def apply_ops(items, ops):
+    """Applies ops the way the YouTube API does, returning the resulting video order."""
+    playlist = [(item["id"], item["contentDetails"]["videoId"]) for item in items]
+    new_ids = 0
+    for op in ops:
+        if op["op"] == "delete":
+            playlist = [entry for entry in playlist if entry[0] != op["item_id"]]
+        elif op["op"] == "move":
+            entry = next(e for e in playlist if e[0] == op["item_id"])
+            playlist.remove(entry)
+            playlist.insert(op["position"], entry)
+        elif op["op"] == "insert":
+            new_ids += 1
+            playlist.insert(op["position"], (f"new_{new_ids}", op["video_id"]))
+    return [video_id for _, video_id in playlist]
+
+
+class TestPlanSync(unittest.TestCase):
+    def test_noop_when_unchanged(self):
+        videos = ["a", "b", "c"]
+        self.assertEqual(plan_sync(make_items(videos), videos), [])
+
+    def test_single_move_for_rotation(self):
+        current = ["a", "b", "c", "d", "e"]
+        desired = ["b", "c", "d", "e", "a"]
+        ops = plan_sync(make_items(current), desired)
+        self.assertEqual([op["op"] for op in ops], ["move"])
+        self.assertEqual(apply_ops(make_items(current), ops), desired)
+
+    def test_inserts_and_deletes(self):
+        current = ["a", "x", "b"]
+        desired = ["a", "b", "c"]
+        ops = plan_sync(make_items(current), desired)
+        self.assertEqual(sorted(op["op"] for op in ops), ["delete", "insert"])
+        self.assertEqual(apply_ops(make_items(current), ops), desired)
+
+    def test_duplicates_and_random_orders(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            pool = [f"v{i}" for i in range(8)]
+            current = [rng.choice(pool) for _ in range(rng.randint(0, 12))]
+            desired = [rng.choice(pool) for _ in range(rng.randint(0, 12))]
+            ops = plan_sync(make_items(current), desired)
+            self.assertEqual(apply_ops(make_items(current), ops), desired)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import tempfile
+import shutil
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from yt_music.podcast_index import PodcastIndex
+
+
+class NotModified(Exception):
+    resp = SimpleNamespace(status=304)
+
+
+class TestPodcastIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "podcast_index.json")
+        self.youtube = MagicMock()
+        self.youtube.playlistItems().list.return_value.execute.return_value = {
+            "items": [{"contentDetails": {"videoId": "ep1"}}, {"contentDetails": {"videoId": "ep2"}}]
+        }
+        self.youtube.playlistItems().list_next.return_value = None
+        self.playlist_request = MagicMock(headers={})
+        self.playlist_request.execute.return_value = {
+            "etag": "etag-1", "items": [{"etag": "item-etag", "contentDetails": {"itemCount": 2}}]
+        }
+        self.youtube.playlists().list.return_value = self.playlist_request
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def scans(self):
+        return self.youtube.playlistItems().list.call_count
+
+    def test_first_run_scans_then_uses_etag(self):
+        self.assertEqual(PodcastIndex("PL_POD", path=self.path).refresh(self.youtube), {"ep1", "ep2"})
+        self.assertEqual(self.scans(), 1)
+
+        self.playlist_request.execute.side_effect = NotModified()
+        self.assertEqual(PodcastIndex("PL_POD", path=self.path).refresh(self.youtube), {"ep1", "ep2"})
+        self.assertEqual(self.playlist_request.headers["If-None-Match"], "etag-1")
+        self.assertEqual(self.scans(), 1)
+
+    def test_own_inserts_avoid_rescan(self):
+        PodcastIndex("PL_POD", path=self.path).refresh(self.youtube)
+        index = PodcastIndex("PL_POD", path=self.path)
+        index.add(["ep3"])
+
+        self.playlist_request.execute.return_value = {
+            "etag": "etag-2", "items": [{"etag": "item-etag", "contentDetails": {"itemCount": 3}}]
+        }
+        self.assertEqual(PodcastIndex("PL_POD", path=self.path).refresh(self.youtube), {"ep1", "ep2", "ep3"})
+        self.assertEqual(self.scans(), 1)
+        # The count check stored the new ETag for the next run
+        PodcastIndex("PL_POD", path=self.path).refresh(self.youtube)
+        self.assertEqual(self.playlist_request.headers["If-None-Match"], "etag-2")
+        self.assertEqual(self.scans(), 1)
+
+    def test_outside_change_triggers_rescan(self):
+        PodcastIndex("PL_POD", path=self.path).refresh(self.youtube)
+        self.playlist_request.execute.return_value = {
+            "etag": "etag-2", "items": [{"etag": "item-etag", "contentDetails": {"itemCount": 5}}]
+        }
+        PodcastIndex("PL_POD", path=self.path).refresh(self.youtube)
+        self.assertEqual(self.scans(), 2)
+
+    def test_remove_and_add_with_the_same_count_triggers_rescan(self):
+        PodcastIndex("PL_POD", path=self.path).refresh(self.youtube)
+        self.playlist_request.execute.return_value = {
+            "etag": "etag-2", "items": [{"etag": "item-etag", "contentDetails": {"itemCount": 2}}]
+        }
+        PodcastIndex("PL_POD", path=self.path).refresh(self.youtube)
+        self.assertEqual(self.scans(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import cProfile
+import pstats
+import time
+import unittest
+
+from core.profiling import folded_stacks
+
+# Every function calls both functions of the next level, but only the first time it
+# runs: a handful of calls, yet 2**LEVELS distinct paths through the call graph.
+LEVELS = 40
+
+
+def make_lattice(levels: int):
+    lines = []
+    for i in range(levels):
+        for side in ("left", "right"):
+            lines.append(f"def {side}_{i}():")
+            if i + 1 < levels:
+                lines.append(f"    if not done.get('{side}_{i}'):")
+                lines.append(f"        done['{side}_{i}'] = True")
+                lines.append(f"        left_{i + 1}()")
+                lines.append(f"        right_{i + 1}()")
+            else:
+                lines.append("    sum(range(2000))")
+    namespace = {"done": {}}
+    exec(compile("\n".join(lines), "lattice.py", "exec"), namespace)
+    return namespace["left_0"]
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def workload(lattice):
+    lattice()
+    fib(18)
+
+
+class TestFoldedStacks(unittest.TestCase):
+    def test_dag_and_recursion_fold_quickly_and_keep_the_total_time(self):
+        profiler = cProfile.Profile()
+        profiler.runcall(workload, make_lattice(LEVELS))
+        stats = pstats.Stats(profiler)
+
+        start = time.perf_counter()
+        lines = folded_stacks(stats, root="node")
+        self.assertLess(time.perf_counter() - start, 5)
+
+        stacks = dict(line.rsplit(" ", 1) for line in lines)
+        self.assertTrue(all(stack.startswith("node;") for stack in stacks))
+        # The deepest function's own time may round to 0µs; its call to sum() still shows it
+        self.assertTrue(any(f":right_{LEVELS - 1}" in stack for stack in stacks))
+
+        fib_stacks = [s for s in stacks if s.endswith(":fib")]
+        self.assertTrue(fib_stacks)
+        self.assertFalse(any(":fib;" in s for s in fib_stacks))
+
+        total = sum(entry[2] for entry in stats.stats.values())
+        folded = sum(int(micros) for micros in stacks.values()) / 1_000_000
+        self.assertAlmostEqual(folded, total, delta=0.01 + total * 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
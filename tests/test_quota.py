@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import json
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from yt_music.quota import QuotaTracker, QuotaAwareService, method_cost
+
+
+class TestQuota(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "data", "youtube_quota.json")
+        self.day = "2026-01-01"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def make_tracker(self, limit=10000):
+        return QuotaTracker(daily_limit=limit, path=self.path, today=lambda: self.day)
+
+    def test_method_costs(self):
+        self.assertEqual(method_cost("playlistItems.list"), 1)
+        self.assertEqual(method_cost("playlistItems.insert"), 50)
+        self.assertEqual(method_cost("videos.update"), 50)
+        self.assertEqual(method_cost("search.list"), 100)
+
+    def test_usage_persists_per_day(self):
+        tracker = self.make_tracker(limit=100)
+        tracker.charge("videos.update")
+        tracker.charge("playlistItems.list")
+        self.assertEqual(self.make_tracker(limit=100).remaining(), 49)
+
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)[self.day]["by_method"]["videos.update"], 50)
+
+        self.day = "2026-01-02"
+        self.assertEqual(self.make_tracker(limit=100).remaining(), 100)
+
+    def test_service_wrapper_charges_calls_and_batches(self):
+        tracker = self.make_tracker()
+        service = MagicMock()
+        service.playlistItems().list_next.return_value = None
+        youtube = QuotaAwareService(service, tracker)
+
+        request = youtube.playlistItems().list(playlistId="PL")
+        request.execute()
+        self.assertIsNone(youtube.playlistItems().list_next(request, {}))
+        self.assertEqual(service.playlistItems().list_next.call_args[0][0], request.request)
+
+        batch = youtube.new_batch_http_request(callback=None)
+        batch.add(youtube.videos().update(body={}), request_id="0")
+        batch.add(youtube.playlistItems().delete(id="x"), request_id="1")
+        batch.execute()
+
+        self.assertEqual(tracker.used(), 101)
+        service.new_batch_http_request().execute.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from core import rate_limit
+from core.rate_limit import ServiceUnavailableError, aguarded_call, guarded_call
+
+
+class HttpError(Exception):
+    def __init__(self, status, retry_after="0"):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers={"Retry-After": retry_after})
+
+
+class TestRateLimit(unittest.TestCase):
+    def setUp(self):
+        rate_limit.reset_guards()
+
+    def tearDown(self):
+        rate_limit.reset_guards()
+
+    def test_throttled_calls_are_retried_slower(self):
+        responses = [HttpError(429), HttpError(503), "ok"]
+
+        def call():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self.assertEqual(guarded_call("test.local", "q", call), "ok")
+        guard = rate_limit.get_guard("test.local")
+        self.assertLess(guard.bucket.rate, guard.bucket.base_rate)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        calls = []
+
+        def down():
+            calls.append(1)
+            raise HttpError(500)
+
+        for _ in range(rate_limit.CIRCUIT_FAILURES):
+            with self.assertRaises(HttpError):
+                guarded_call("down.local", "q", down)
+        with self.assertRaises(ServiceUnavailableError):
+            guarded_call("down.local", "q", down)
+        self.assertEqual(len(calls), rate_limit.CIRCUIT_FAILURES)
+
+    def test_interrupted_trial_does_not_leave_the_circuit_half_open(self):
+        def down():
+            raise HttpError(500)
+
+        for _ in range(rate_limit.CIRCUIT_FAILURES):
+            with self.assertRaises(HttpError):
+                guarded_call("flaky.local", "q", down)
+        breaker = rate_limit.get_guard("flaky.local").breaker
+        breaker.opened_at -= breaker.reset_seconds
+
+        def interrupted():
+            raise KeyboardInterrupt
+
+        async def cancelled():
+            raise asyncio.CancelledError
+
+        with self.assertRaises(KeyboardInterrupt):
+            guarded_call("flaky.local", "q", interrupted)
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(aguarded_call("flaky.local", "q", cancelled))
+        # The next trial still gets through
+        self.assertEqual(guarded_call("flaky.local", "q", lambda: "back"), "back")
+
+    def test_rejected_calls_do_not_free_the_trial_slot(self):
+        def down():
+            raise HttpError(500)
+
+        for _ in range(rate_limit.CIRCUIT_FAILURES):
+            with self.assertRaises(HttpError):
+                guarded_call("halfopen.local", "q", down)
+        breaker = rate_limit.get_guard("halfopen.local").breaker
+        breaker.opened_at -= breaker.reset_seconds
+
+        started, release = threading.Event(), threading.Event()
+        reached = []
+
+        def trial():
+            started.set()
+            release.wait(5)
+            return "back"
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(guarded_call("halfopen.local", "a", trial)))
+        thread.start()
+        started.wait(5)
+        # While the trial runs, every other call is rejected without reaching the service
+        for key in ("b", "c"):
+            with self.assertRaises(ServiceUnavailableError):
+                guarded_call("halfopen.local", key, lambda: reached.append(key))
+        release.set()
+        thread.join(5)
+        self.assertEqual(reached, [])
+        self.assertEqual(results, ["back"])
+        self.assertEqual(guarded_call("halfopen.local", "d", lambda: "closed"), "closed")
+
+    def test_other_errors_pass_through_without_tripping_the_circuit(self):
+        def missing():
+            raise ValueError("Video unavailable")
+
+        for _ in range(rate_limit.CIRCUIT_FAILURES + 1):
+            with self.assertRaises(ValueError):
+                guarded_call("up.local", "q", missing)
+
+    def test_identical_in_flight_calls_are_coalesced(self):
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(guarded_call("test.local", ("search", "Miles"), slow))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, ["result"] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_async_calls_are_coalesced(self):
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(*(aguarded_call("test.local", "k", slow) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(run()), ["result"] * 3)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import json
+import tempfile
+import shutil
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock googleapiclient modules BEFORE importing the scripts
+sys.modules['googleapiclient'] = MagicMock()
+sys.modules['googleapiclient.discovery'] = MagicMock()
+sys.modules['google_auth_oauthlib'] = MagicMock()
+sys.modules['google_auth_oauthlib.flow'] = MagicMock()
+sys.modules['google.auth.transport.requests'] = MagicMock()
+
+from yt_music import update_youtube_playlist
+from yt_music.retry import call_with_retry, is_retryable
+from yt_music.sync_journal import SyncJournal, DONE, STARTED
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status, reason=None):
+        super().__init__(f"HTTP {status}")
+        self.resp = SimpleNamespace(status=status)
+        body = {"error": {"errors": [{"reason": reason}]}} if reason else {}
+        self.content = json.dumps(body).encode("utf-8")
+
+
+class TestRetry(unittest.TestCase):
+    def test_retries_server_errors_then_succeeds(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise FakeHttpError(503)
+            return "ok"
+
+        self.assertEqual(call_with_retry(flaky, sleep=lambda s: None), "ok")
+        self.assertEqual(len(attempts), 3)
+
+    def test_quota_exceeded_is_not_retried(self):
+        self.assertFalse(is_retryable(FakeHttpError(403, "quotaExceeded")))
+        self.assertTrue(is_retryable(FakeHttpError(403, "rateLimitExceeded")))
+        self.assertFalse(is_retryable(FakeHttpError(404)))
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        self.playlist_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.playlist_dir)
+
+    def test_resume_skips_finished_and_applied_ops(self):
+        ops = [
+            {"op": "delete", "item_id": "item_old", "video_id": "old"},
+            {"op": "insert", "video_id": "a", "position": 0},
+            {"op": "move", "item_id": "item_b", "video_id": "b", "position": 0},
+        ]
+        journal = SyncJournal.create(self.playlist_dir, "PL", ops, playlist_length=2, desired_video_ids=["b", "a"])
+        journal.mark([journal.ops[0]], DONE)
+        journal.mark([journal.ops[1]], STARTED)  # interrupted after sending the insert
+
+        journal = SyncJournal.load(self.playlist_dir)
+        youtube = MagicMock()
+        # The started insert did reach YouTube
+        youtube.playlistItems().list.return_value.execute.return_value = {
+            "items": [{"snippet": {"position": 0}}]
+        }
+
+        failures = update_youtube_playlist.apply_ops(
+            youtube, "PL", journal.ops, playlist_length=2, desired_video_ids=["b", "a"], journal=journal
+        )
+
+        self.assertEqual(failures, 0)
+        youtube.playlistItems().delete.assert_not_called()
+        youtube.playlistItems().insert.assert_not_called()
+        youtube.playlistItems().update.assert_called_once()
+        self.assertTrue(SyncJournal.load(self.playlist_dir).is_complete())
+
+    def test_delete_not_found_counts_as_done(self):
+        youtube = MagicMock()
+        youtube.new_batch_http_request.side_effect = lambda callback=None: SimpleNamespace(
+            add=lambda request, request_id=None: None,
+            execute=lambda: callback("0", None, FakeHttpError(404))
+        )
+        journal = SyncJournal.in_memory([{"op": "delete", "item_id": "gone", "video_id": "x"}])
+
+        failures = update_youtube_playlist.apply_ops(youtube, "PL", journal.ops, journal=journal)
+
+        self.assertEqual(failures, 0)
+        self.assertTrue(journal.is_complete())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool, tool
+from langgraph.prebuilt import create_react_agent
+
+from curation.budget import AgentBudget
+from curation.cassette import RECORD, Cassette
+from curation.compaction import compact_tools
+from curation.concurrency import limit_tools
+
+
+class FanOutChatModel(BaseChatModel):
+    """Asks for four lookups in one turn, then answers."""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fan-out"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if self.calls == 1:
+            tool_calls = [{"name": "lookup", "args": {"query": f"song {i}"}, "id": f"call_{i}"} for i in range(4)]
+            message = AIMessage(content="", tool_calls=tool_calls)
+        else:
+            message = AIMessage(content="done")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class TestToolConcurrency(unittest.TestCase):
+    def test_calls_run_in_parallel_up_to_the_tool_limit(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        @tool
+        def lookup(query: str) -> str:
+            """Looks something up."""
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            # Later calls finish first, to check results still come back in call order
+            time.sleep(0.2 - 0.04 * int(query.split()[-1]))
+            with lock:
+                state["running"] -= 1
+            return f"result for {query}"
+
+        agent = create_react_agent(FanOutChatModel(), limit_tools([lookup], {"lookup": 2}), prompt="system")
+        start = time.perf_counter()
+        result = agent.invoke({"messages": [HumanMessage(content="Make a playlist")]}, config={"max_concurrency": 8})
+        elapsed = time.perf_counter() - start
+
+        tool_results = [m.content for m in result["messages"] if m.type == "tool"]
+        self.assertEqual(tool_results, [f"result for song {i}" for i in range(4)])
+        self.assertEqual(state["peak"], 2)
+        # Sequential would take 0.2 + 0.16 + 0.12 + 0.08 = 0.56s
+        self.assertLess(elapsed, 0.5)
+
+    def test_async_calls_share_the_event_loop(self):
+        state = {"running": 0, "peak": 0}
+
+        async def alookup(query: str) -> str:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.2 - 0.04 * int(query.split()[-1]))
+            state["running"] -= 1
+            return f"result for {query}"
+
+        def lookup(query: str) -> str:
+            raise AssertionError("the blocking implementation should not run under ainvoke")
+
+        lookup_tool = StructuredTool.from_function(func=lookup, coroutine=alookup, name="lookup", description="Looks something up.")
+        agent = create_react_agent(FanOutChatModel(), limit_tools([lookup_tool], {"lookup": 3}), prompt="system")
+        result = asyncio.run(agent.ainvoke({"messages": [HumanMessage(content="Make a playlist")]}))
+
+        tool_results = [m.content for m in result["messages"] if m.type == "tool"]
+        self.assertEqual(tool_results, [f"result for song {i}" for i in range(4)])
+        self.assertEqual(state["peak"], 3)
+
+
+    def test_wrappers_keep_the_tool_attributes(self):
+        @tool(return_direct=True)
+        def lookup(query: str) -> str:
+            """Looks something up."""
+            return f"result for {query}"
+
+        lookup.tags, lookup.metadata = ["search"], {"source": "test"}
+        budget = AgentBudget(max_tool_calls=5, max_llm_turns=5, deadline=60)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cassette = Cassette(os.path.join(temp_dir, "cassette.json"), RECORD)
+            wrapped = cassette.wrap_tool(budget.wrap_tools(compact_tools(limit_tools([lookup], {"lookup": 2})))[0])
+
+            self.assertEqual((wrapped.name, wrapped.description, wrapped.args_schema), (lookup.name, lookup.description, lookup.args_schema))
+            self.assertTrue(wrapped.return_direct)
+            self.assertEqual((wrapped.tags, wrapped.metadata), (["search"], {"source": "test"}))
+            self.assertEqual(wrapped.invoke({"query": "Miles"}), "result for Miles")
+        self.assertEqual(budget.tool_calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,9 @@ import json
 import os
 import shutil
 import tempfile
-from curation.nodes import verify_curation_node
+from core.models.playlist import (CURATED_ITEMS_FILENAME, CURATED_PLAYLIST_FILENAME, PARTIAL_SUFFIX,
+                                  CuratedPlaylist, CuratedPlaylistStreamWriter, iter_curated_items)
+from curation.nodes import _curation_steps, verify_curation_node
 
 class TestVerifyCuration(unittest.TestCase):
 
@@ -47,10 +49,10 @@ Outro text.
         os.chdir(self.original_cwd)
         shutil.rmtree(self.temp_dir)
 
-    @patch("curation.nodes.YTMusic")
-    def test_verify_curation_structure(self, MockYTMusic):
+    @patch("curation.nodes.get_ytmusic")
+    def test_verify_curation_structure(self, mock_get_ytmusic):
         # Setup YTMusic mock
-        mock_yt = MockYTMusic.return_value
+        mock_yt = mock_get_ytmusic.return_value
         mock_yt.get_song.side_effect = [
             # Song 1
             {
@@ -105,6 +107,192 @@ Outro text.
         
         self.assertEqual(items[3]["video_id"], "video_id_2")
 
+    @patch("curation.nodes.get_ytmusic")
+    def test_repair_replaces_invalid_tracks_in_place(self, mock_get_ytmusic):
+        from curation.repair import repair_playlist
+
+        mock_yt = mock_get_ytmusic.return_value
+        mock_yt.get_song.side_effect = [
+            {"videoDetails": {"title": "Verified Title A", "author": "Verified Artist A", "lengthSeconds": "180"}},
+            Exception("Video unavailable"),
+        ]
+        with open(os.path.join(self.playlist_dir, "response.txt"), "w") as f:
+            f.write(self.sample_script)
+        items = verify_curation_node(self.state)["curated_playlist"]["items"]
+        self.assertEqual(items[3]["type"], "invalid")
+
+        # The first hit is already in the playlist, so the second one is used
+        mock_yt.search.return_value = [
+            {"videoId": "video_id_1", "title": "Song A", "artists": [{"name": "Artist A"}]},
+            {"videoId": "video_id_3", "title": "Song B", "artists": [{"name": "Artist B"}], "duration_seconds": 200},
+        ]
+        self.assertEqual(repair_playlist(self.playlist_id, yt=mock_yt), 1)
+
+        with open(os.path.join(self.playlist_dir, "curated_playlist.json")) as f:
+            repaired = json.load(f)["items"]
+        self.assertEqual(repaired[3]["type"], "track")
+        self.assertEqual(repaired[3]["video_id"], "video_id_3")
+        self.assertEqual(repaired[3]["duration"], 200)
+        # Everything else is untouched
+        self.assertEqual([i for n, i in enumerate(repaired) if n != 3], [i for n, i in enumerate(items) if n != 3])
+        with open(os.path.join(self.playlist_dir, "response.txt")) as f:
+            self.assertIn("[TRACK: Song B by Artist B | ID: video_id_3]", f.read())
+
+    @patch("curation.nodes.get_ytmusic")
+    def test_regenerate_part_rewrites_one_segment(self, mock_get_ytmusic):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from curation.regenerate import regenerate_part
+
+        song = {"videoDetails": {"title": "Verified Title", "author": "Verified Artist", "lengthSeconds": "180"}}
+        mock_get_ytmusic.return_value.get_song.return_value = song
+        verify_curation_node(self.state)
+        for filename in ("part_001.wav", "part_001.mp4", "part_002.wav", "part_002.mp4", "part_002.jpg"):
+            with open(os.path.join(self.playlist_dir, filename), "w") as f:
+                f.write("data")
+
+        llm = FakeListChatModel(responses=["A **brand new** second segment."])
+        self.assertEqual(regenerate_part(self.playlist_id, 2, llm=llm), "A brand new second segment.")
+
+        with open(os.path.join(self.playlist_dir, "curated_playlist.json")) as f:
+            items = json.load(f)["items"]
+        self.assertEqual(items[2]["text"], "A brand new second segment.")
+        self.assertIn("Welcome to the show", items[0]["text"])
+        # Only part 2's audio and video are left to rebuild
+        remaining = sorted(f for f in os.listdir(self.playlist_dir) if f.startswith("part_"))
+        self.assertEqual(remaining, ["part_001.mp4", "part_001.wav", "part_002.jpg"])
+
+        # Re-verifying the unchanged script keeps the rewrite
+        items = verify_curation_node(self.state)["curated_playlist"]["items"]
+        self.assertEqual(items[2]["text"], "A brand new second segment.")
+
+# Chapter 2 repeats Song A although it was told not to
+CHAPTER_SCRIPTS = [
+    "[TITLE: Marathon]\nChapter one begins.\n[TRACK: Song A by Artist A | ID: video_id_1]\nStill chapter one.\n[TRACK: Song B by Artist B | ID: video_id_2]",
+    "Chapter two begins.\n[TRACK: Song A by Artist A | ID: video_id_1]\nA new song.\n[TRACK: Song C by Artist C | ID: video_id_3]",
+    "The last chapter.\n[TRACK: Song D by Artist D | ID: video_id_4]\nGoodbye.",
+]
+
+
+class TestLongFormCuration(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+
+        self.playlist_id = "marathon"
+        self.playlist_dir = os.path.join("data", "playlists", self.playlist_id)
+        os.makedirs(self.playlist_dir, exist_ok=True)
+        with open(os.path.join(self.playlist_dir, "config.json"), "w") as f:
+            json.dump({
+                "topic": "Marathon Topic",
+                "duration": "2h30m",
+                "system_prompt": "default",
+                "long_form": True,
+                "chapter_duration": "1h"
+            }, f)
+        with open("config.json", "w") as f:
+            json.dump({}, f)
+        self.state = {"playlist_id": self.playlist_id}
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir)
+
+    @patch("curation.nodes._build_llm_and_tools", return_value=(None, []))
+    def _curate(self, _build):
+        """Runs long-form curation, answering each chapter from CHAPTER_SCRIPTS; returns (user queries, chapter paths)."""
+        queries = []
+        steps = _curation_steps(self.state)
+        try:
+            run = next(steps)
+            while True:
+                queries.append(run[3])
+                chapter = int(run[3].split(" of ")[0].rsplit(" ", 1)[1])
+                run = steps.send(CHAPTER_SCRIPTS[chapter - 1])
+        except StopIteration as done:
+            return queries, done.value["raw_script_chapters"]
+
+    def _verify(self, chapter_paths):
+        return verify_curation_node({**self.state, "raw_script_chapters": chapter_paths, "skip_validation": True})
+
+    def _json_items(self):
+        with open(os.path.join(self.playlist_dir, CURATED_PLAYLIST_FILENAME)) as f:
+            return json.load(f)["items"]
+
+    def test_chapters_list_used_tracks_and_repeats_are_dropped(self):
+        queries, chapter_paths = self._curate()
+
+        # 2h30m in 1h chapters: two full chapters and the 30m remainder
+        self.assertEqual(len(queries), 3)
+        self.assertIn("about 30m", queries[2])
+        self.assertNotIn("ID:", queries[0])
+        self.assertIn("- Song B by Artist B | ID: video_id_2", queries[1])
+        self.assertIn("- Song C by Artist C | ID: video_id_3", queries[2])
+        self.assertEqual(queries[2].count("- Song A by Artist A | ID: video_id_1"), 1)
+
+        # An unchanged marathon resumes every chapter without running the agent
+        self.assertEqual(self._curate(), ([], chapter_paths))
+
+        result = self._verify(chapter_paths)
+        self.assertEqual(result["playlist_title"], "Marathon")
+        self.assertEqual(result["curated_item_counts"], {"narrative": 6, "track": 4, "invalid": 0})
+
+        items = self._json_items()
+        self.assertEqual([i["video_id"] for i in items if i["type"] == "track"],
+                         ["video_id_1", "video_id_2", "video_id_3", "video_id_4"])
+        self.assertEqual([i["audio_filename"] for i in items if i["type"] == "narrative"],
+                         [f"part_{n:03d}.wav" for n in range(1, 7)])
+        self.assertEqual(list(iter_curated_items(self.playlist_dir)), items)
+        self.assertFalse(any(name.endswith(PARTIAL_SUFFIX) for name in os.listdir(self.playlist_dir)))
+
+    def test_interrupted_verification_keeps_the_last_complete_stream(self):
+        _, chapter_paths = self._curate()
+        self._verify(chapter_paths)
+        complete = self._json_items()
+
+        # A run killed outright leaves only a partial stream, which is never read
+        with open(os.path.join(self.playlist_dir, CURATED_ITEMS_FILENAME + PARTIAL_SUFFIX), "w") as f:
+            f.write('{"type": "narrative", "text": "half-wri')
+        self.assertEqual(list(iter_curated_items(self.playlist_dir)), complete)
+
+        # A run that fails mid-way cleans its partial stream up
+        os.remove(chapter_paths[2])
+        with self.assertRaises(FileNotFoundError):
+            self._verify(chapter_paths)
+        self.assertFalse(os.path.exists(os.path.join(self.playlist_dir, CURATED_ITEMS_FILENAME + PARTIAL_SUFFIX)))
+        self.assertEqual(list(iter_curated_items(self.playlist_dir)), complete)
+        self.assertEqual(self._json_items(), complete)
+
+        # Re-curating the missing chapter resumes the others and completes the stream
+        queries, chapter_paths = self._curate()
+        self.assertEqual(len(queries), 1)
+        self._verify(chapter_paths)
+        self.assertEqual(list(iter_curated_items(self.playlist_dir)), complete)
+
+    def test_writer_context_and_save_drop_the_stream(self):
+        with self.assertRaises(RuntimeError):
+            with CuratedPlaylistStreamWriter(self.playlist_dir) as writer:
+                writer.append(CuratedPlaylist.model_validate({"title": "t", "topic": "t", "items": [
+                    {"type": "narrative", "text": "Hello."}]}).items[0])
+                raise RuntimeError("interrupted")
+        self.assertTrue(writer._file.closed)
+        self.assertEqual(os.listdir(self.playlist_dir), ["config.json"])
+
+        _, chapter_paths = self._curate()
+        self._verify(chapter_paths)
+        items_path = os.path.join(self.playlist_dir, CURATED_ITEMS_FILENAME)
+        self.assertTrue(os.path.exists(items_path))
+
+        # Saving the full playlist (e.g. after a repair) makes the JSON the only source
+        playlist = CuratedPlaylist.load(self.playlist_dir)
+        playlist.items[1] = playlist.items[1].model_copy(update={"title": "Repaired"})
+        playlist.save(self.playlist_dir)
+        self.assertFalse(os.path.exists(items_path))
+        self.assertEqual(next(iter_curated_items(self.playlist_dir), None)["text"], "Chapter one begins.")
+        self.assertEqual([i for i in iter_curated_items(self.playlist_dir)][1]["title"], "Repaired")
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from yt_music import wikimedia
+
+
+def commons_response(titles_param):
+    """Fake imageinfo answer: every title exists except ones containing 'missing'."""
+    pages = {}
+    normalized = []
+    for index, title in enumerate(titles_param.split("|")):
+        canonical = title[:5] + title[5].upper() + title[6:]
+        if canonical != title:
+            normalized.append({"from": title, "to": canonical})
+        if "missing" in title.lower():
+            pages[str(-index - 1)] = {"title": canonical, "missing": ""}
+        else:
+            pages[str(index)] = {"title": canonical, "imageinfo": [{"extmetadata": {
+                "Artist": {"value": "<a href='x'>Someone</a>"},
+                "LicenseShortName": {"value": "CC BY-SA 4.0"},
+            }}]}
+    response = MagicMock()
+    response.json.return_value = {"query": {"normalized": normalized, "pages": pages}}
+    return response
+
+
+class TestWikimediaAttribution(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.test_dir, "attribution.json")
+        self.session = MagicMock()
+        self.session.get.side_effect = lambda url, params, **kwargs: commons_response(params["titles"])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_batches_titles_and_caches(self):
+        filenames = [f"https://upload.wikimedia.org/a/b/image_{i}.jpg" for i in range(60)] + ["file:///tmp/missing.jpg"]
+        with patch.object(wikimedia, "get_http_session", return_value=self.session):
+            results = wikimedia.fetch_attributions(filenames, cache_path=self.cache_path)
+            self.assertEqual(self.session.get.call_count, 2)
+            self.assertIn("Author: Someone", results[filenames[0]])
+            self.assertIsNone(results["file:///tmp/missing.jpg"])
+
+            # Second playlist with the same images: served from the cache
+            again = wikimedia.fetch_attributions(filenames[:3] + ["missing.jpg"], cache_path=self.cache_path)
+            self.assertEqual(self.session.get.call_count, 2)
+            self.assertEqual(again[filenames[0]], results[filenames[0]])
+            self.assertIsNone(again["missing.jpg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
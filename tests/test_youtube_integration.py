@@ -138,6 +138,112 @@ class TestPostUpload(unittest.TestCase):
         self.assertEqual(items[3]['kind'], 'song')
         self.assertEqual(items[3]['video_id'], 'song2_id')
 
+    def test_bulk_matching(self):
+        from core.models.playlist import CuratedPlaylist
+        curated = CuratedPlaylist.load(self.playlist_dir)
+
+        def item(title, video_id):
+            return {'snippet': {'title': title}, 'contentDetails': {'videoId': video_id}}
+
+        channel = {
+            "PL_OTHER": {"title": "Other", "items": [item("part_001.mp4", "other_1")]},
+            "PL_MINE": {"title": "Uploads", "items": [item("test_playlist_part_001.mp4", "mine_1"), item("test_playlist_part_002.mp4", "mine_2")]},
+        }
+        get_file_details = MagicMock()
+        self.assertEqual(
+            post_upload.match_playlist_uploads("test_playlist", self.playlist_dir, curated, channel, get_file_details),
+            ("PL_MINE", {1: "mine_1", 2: "mine_2"})
+        )
+        get_file_details.assert_not_called()
+
+        # Renamed uploads are found by the size of the local part files
+        with open(os.path.join(self.playlist_dir, "part_002.mp4"), "wb") as f:
+            f.write(b"0" * 1234)
+        channel["PL_MINE"]["items"] = [item("Intro", "mine_1"), item("Chapter two", "mine_2")]
+        file_details = {"mine_2": {"fileName": "clip.mp4", "fileSize": "1234"}, "other_1": {"fileSize": "99"}}
+        self.assertEqual(
+            post_upload.match_playlist_uploads("test_playlist", self.playlist_dir, curated, channel, lambda: file_details),
+            ("PL_MINE", {2: "mine_2"})
+        )
+
+    @patch('yt_music.post_upload.fetch_attributions', return_value={})
+    @patch('yt_music.post_upload.fetch_file_details')
+    @patch('yt_music.post_upload.crawl_channel')
+    def test_enrich_all_looks_up_renamed_uploads(self, mock_crawl, mock_fetch_details, _mock_attributions):
+        # "album" is matched by its upload titles; test_playlist's uploads were renamed
+        album_dir = os.path.join(self.test_dir, "data", "playlists", "album")
+        shutil.copytree(self.playlist_dir, album_dir)
+        with open(os.path.join(self.playlist_dir, "part_002.mp4"), "wb") as f:
+            f.write(b"0" * 1234)
+
+        def item(title, video_id):
+            return {'snippet': {'title': title}, 'contentDetails': {'videoId': video_id}}
+
+        mock_crawl.return_value = {
+            "PL_ALBUM": {"title": "Album", "items": [item("album_part_001.mp4", "album_1"), item("album_part_002.mp4", "album_2")]},
+            "PL_MINE": {"title": "Uploads", "items": [item("Intro", "mine_1"), item("Chapter two", "mine_2")]},
+        }
+        mock_fetch_details.return_value = {
+            "mine_1": {"fileName": "test_playlist_part_001.mp4"},
+            "mine_2": {"fileName": "clip.mp4", "fileSize": "1234"},
+        }
+        youtube = MagicMock()
+        post_upload.enrich_all(youtube, "test_channel_id")
+
+        mock_fetch_details.assert_called_once_with(youtube, ["mine_1", "mine_2"])
+        with open(os.path.join(self.playlist_dir, "curated_playlist.json")) as f:
+            data = json.load(f)
+        self.assertEqual(data['playlist_id'], "PL_MINE")
+        self.assertEqual([i['video_id'] for i in data['items'] if i['kind'] == 'narration'], ["mine_1", "mine_2"])
+        with open(os.path.join(album_dir, "curated_playlist.json")) as f:
+            self.assertEqual(json.load(f)['playlist_id'], "PL_ALBUM")
+
+    def test_folder_name_that_is_a_suffix_of_another_is_not_confused(self):
+        from core.models.playlist import CuratedPlaylist
+        curated = CuratedPlaylist.load(self.playlist_dir)
+
+        def item(title, video_id):
+            return {'snippet': {'title': title}, 'contentDetails': {'videoId': video_id}}
+
+        channel = {
+            "PL_SJ": {"title": "Space Jazz", "items": [item(f"space_jazz_part_00{n}.mp4", v) for n, v in ((1, "x"), (2, "y"), (3, "z"))]},
+            "PL_J": {"title": "Uploads", "items": [item("jazz_part_001.mp4", "j1")]},
+        }
+        self.assertEqual(post_upload.match_playlist_uploads("jazz", self.playlist_dir, curated, channel, MagicMock()), ("PL_J", {1: "j1"}))
+        self.assertEqual(post_upload.match_playlist_uploads("space_jazz", self.playlist_dir, curated, channel, MagicMock())[0], "PL_SJ")
+
+        # The same holds for the original file names of renamed uploads
+        channel["PL_SJ"]["items"] = [item("One", "x"), item("Two", "y")]
+        channel["PL_J"]["items"] = [item("Three", "j1")]
+        file_details = {"x": {"fileName": "space_jazz_part_001.mp4"}, "y": {"fileName": "space_jazz_part_002.mp4"},
+                        "j1": {"fileName": "jazz_part_001.mp4"}}
+        self.assertEqual(post_upload.match_playlist_uploads("jazz", self.playlist_dir, curated, channel, lambda: file_details), ("PL_J", {1: "j1"}))
+
+    @patch('yt_music.post_upload.fetch_attributions', return_value={})
+    @patch('yt_music.post_upload.crawl_channel')
+    def test_enrich_all_never_matches_the_podcast_or_claimed_playlists(self, mock_crawl, _mock_attributions):
+        # "album" is already linked to PL_ALBUM; both playlists' parts were synced to the podcast
+        album_dir = os.path.join(self.test_dir, "data", "playlists", "album")
+        os.makedirs(album_dir)
+        with open(os.path.join(album_dir, "curated_playlist.json"), "w") as f:
+            json.dump({**self.mock_curated_data, "playlist_id": "PL_ALBUM"}, f)
+
+        def item(title, video_id):
+            return {'snippet': {'title': title}, 'contentDetails': {'videoId': video_id}}
+
+        parts = [item("part_001.mp4", "mine_1"), item("part_002.mp4", "mine_2")]
+        mock_crawl.return_value = {
+            "PL_PODCAST": {"title": "Jazz History", "items": parts + [item("part_003.mp4", "album_1")]},
+            "PL_ALBUM": {"title": "Jazz History", "items": [item("part_001.mp4", "album_1"), item("part_002.mp4", "album_2"), item("part_003.mp4", "album_3")]},
+            "PL_MINE": {"title": "Jazz History", "items": parts},
+        }
+        post_upload.enrich_all(MagicMock(), "test_channel_id", include_enriched=True, podcast_playlist_id="PL_PODCAST")
+
+        with open(os.path.join(self.playlist_dir, "curated_playlist.json")) as f:
+            self.assertEqual(json.load(f)['playlist_id'], "PL_MINE")
+        with open(os.path.join(album_dir, "curated_playlist.json")) as f:
+            self.assertEqual(json.load(f)['playlist_id'], "PL_ALBUM")
+
     def test_description_truncation(self):
         # Test the specific logic for truncating descriptions
         # We'll simulate the logic block from post_upload.py
@@ -167,6 +273,20 @@ class TestPostUpload(unittest.TestCase):
         self.assertIn(links_text, final_desc)
 
 
+class FakeBatch:
+    """Stands in for BatchHttpRequest: executes the added requests in order."""
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            self.callback(request_id, request.execute(), None)
+
+
 class TestUpdatePlaylist(unittest.TestCase):
     def setUp(self):
         self.test_dir = tempfile.mkdtemp()
@@ -200,10 +320,12 @@ class TestUpdatePlaylist(unittest.TestCase):
     @patch('yt_music.update_youtube_playlist.get_authenticated_service')
     def test_update_flow(self, mock_get_auth):
         mock_youtube = MagicMock()
+        mock_youtube.new_batch_http_request.side_effect = lambda callback=None: FakeBatch(callback)
         mock_get_auth.return_value = mock_youtube
         
-        # Mock Current Playlist Items (to be cleared)
-        mock_youtube.playlistItems().list().execute.return_value = {'items': [{'id': 'item_1'}]}
+        # Mock Current Playlist Items (a stale video that the sync removes)
+        stale_item = {'id': 'item_1', 'contentDetails': {'videoId': 'stale_vid'}}
+        mock_youtube.playlistItems().list().execute.return_value = {'items': [stale_item]}
         mock_youtube.playlistItems().list_next.return_value = None
         
         # Mock Podcast Playlist Items (to check existence)
@@ -225,7 +347,7 @@ class TestUpdatePlaylist(unittest.TestCase):
         def list_side_effect(*args, **kwargs):
             pid = kwargs.get('playlistId')
             if pid == 'PL_CURATED':
-                return MagicMock(execute=lambda: {'items': [{'id': 'item_1'}]})
+                return MagicMock(execute=lambda: {'items': [stale_item]})
             elif pid == 'PL_PODCAST':
                 return MagicMock(execute=lambda: {'items': []})
             return MagicMock(execute=lambda: {'items': []})
@@ -251,6 +373,40 @@ class TestUpdatePlaylist(unittest.TestCase):
         self.assertEqual(len(podcast_calls), 1)
         self.assertEqual(podcast_calls[0][1]['body']['snippet']['resourceId']['videoId'], 'vid1')
 
+    def test_appends_are_batched(self):
+        ops = [
+            {"op": "move", "item_id": "i1", "video_id": "a", "position": 0},
+            {"op": "insert", "video_id": "b", "position": 2},
+            {"op": "insert", "video_id": "c", "position": 3},
+            {"op": "insert", "video_id": "d", "position": 1},
+        ]
+        steps = update_youtube_playlist.group_order_ops(ops, playlist_length=2)
+        self.assertEqual([len(step["ops"]) for step in steps], [1, 2, 1])
+        self.assertTrue(steps[1]["append"])
+
+    def test_ops_within_budget_keeps_a_prefix(self):
+        ops = [
+            {"op": "delete", "item_id": "i1", "video_id": "x"},
+            {"op": "insert", "video_id": "a", "position": 0},
+            {"op": "update_video", "video_id": "a", "body": {}},
+        ]
+        self.assertEqual(update_youtube_playlist.estimate_plan_cost(ops, desired_count=1), 151)
+        prefix = update_youtube_playlist.ops_within_budget(ops, 120, desired_count=1)
+        self.assertEqual([op["op"] for op in prefix], ["delete", "insert"])
+
+    def test_unchanged_video_metadata_is_skipped(self):
+        body = update_youtube_playlist.video_metadata_body("vid1", "Part 1", "Desc 1")
+        current = {
+            "id": "vid1",
+            "snippet": {"title": "Part 1", "description": "Desc 1", "categoryId": "10"},
+            "status": {"privacyStatus": "unlisted", "selfDeclaredMadeForKids": False}
+        }
+        self.assertFalse(update_youtube_playlist.video_metadata_changed(current, body))
+
+        current["status"]["privacyStatus"] = "public"
+        self.assertTrue(update_youtube_playlist.video_metadata_changed(current, body))
+        self.assertTrue(update_youtube_playlist.video_metadata_changed(None, body))
+
     @patch('yt_music.update_youtube_playlist.get_authenticated_service')
     def test_skip_existing_podcast_episode(self, mock_get_auth):
         # Scenario: Video is already in podcast playlist
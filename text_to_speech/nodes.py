@@ -3,6 +3,8 @@ from core.agent_state import AgentState
 from core.config import get_playlist_dir, playlist_path
 import os
 import json
+import itertools
+from core.models.playlist import iter_curated_items
 
 # Initialize TTS engine (doing this globally to avoid reloading model on every call, 
 # though in a real app you might want to manage this differently)
@@ -27,25 +29,24 @@ def generate_speech_node(state: AgentState):
         raise FileNotFoundError(f"{curated_json_path} missing")
         
     try:
-        with open(curated_json_path, "r") as f:
-            curated_data = json.load(f)
+        # Streamed so long-form playlists never load every item at once
+        narrative_items = (item for item in iter_curated_items(playlist_dir) if item.get("type") == "narrative")
+        first_item = next(narrative_items, None)
     except json.JSONDecodeError:
         print(f"❌ Error: Invalid JSON in {curated_json_path}")
         raise
-
-    items = curated_data.get("items", [])
-    narrative_items = [item for item in items if item.get("type") == "narrative"]
     
-    if not narrative_items:
+    if first_item is None:
         print("⚠️ No narrative segments found in curated playlist.")
         return {"audio_paths": []}
+    narrative_items = itertools.chain([first_item], narrative_items)
         
     if tts_engine:
         os.makedirs(playlist_dir, exist_ok=True)
         
         audio_paths = []
         
-        print(f"🗣️  Generating audio for {len(narrative_items)} segments...")
+        print("🗣️  Generating audio for narrative segments...")
         
         for i, item in enumerate(narrative_items):
             segment = item.get("text", "")
@@ -0,0 +1,63 @@
+"""
+Groups YouTube Data API requests into batch HTTP requests.
+
+googleapiclient's new_batch_http_request sends up to 50 calls in one multipart
+round-trip and reports each one through a callback. The API does not guarantee the
+order in which the calls of one batch are applied, so callers only batch requests
+whose relative order does not matter.
+"""
+
+import time
+
+try:
+    from .retry import backoff_delay, is_retryable
+except ImportError:
+    from yt_music.retry import backoff_delay, is_retryable
+
+# YouTube rejects batches with more than 50 calls
+MAX_BATCH_SIZE = 50
+
+
+def execute_batched(youtube, entries, batch_size=MAX_BATCH_SIZE, retries=0, sleep=time.sleep):
+    """
+    entries: list of (key, HttpRequest) pairs, e.g. youtube.videos().update(...) unexecuted.
+
+    Sends them in batches of batch_size and returns {key: (response, exception)}.
+    A request with no callback at all (e.g. the batch itself failed) is reported with
+    the batch's exception. Requests that fail with a retryable error (5xx, rate limit)
+    are re-sent in a new batch after a backoff, up to `retries` times.
+    """
+    results = _execute_once(youtube, entries, batch_size)
+    for attempt in range(retries):
+        retry = [(key, request) for key, request in entries if results[key][1] is not None and is_retryable(results[key][1])]
+        if not retry:
+            break
+        delay = backoff_delay(attempt)
+        print(f"    ⏳ {len(retry)} batched calls hit retryable errors, retrying in {delay:.1f}s...")
+        sleep(delay)
+        results.update(_execute_once(youtube, retry, batch_size))
+    return results
+
+
+def _execute_once(youtube, entries, batch_size):
+    results = {}
+    for start in range(0, len(entries), batch_size):
+        chunk = entries[start:start + batch_size]
+        keys = {str(index): key for index, (key, _) in enumerate(chunk)}
+
+        def callback(request_id, response, exception, keys=keys):
+            results[keys[request_id]] = (response, exception)
+
+        batch = youtube.new_batch_http_request(callback=callback)
+        for index, (_, request) in enumerate(chunk):
+            batch.add(request, request_id=str(index))
+
+        try:
+            batch.execute()
+        except Exception as e:
+            for key in keys.values():
+                results.setdefault(key, (None, e))
+
+        for key in keys.values():
+            results.setdefault(key, (None, RuntimeError("No response in batch")))
+    return results
@@ -0,0 +1,116 @@
+"""
+Shared helpers for YouTube Data API list calls.
+
+- Field masks: every list call asks only for the fields the scripts read (ids,
+  titles, videoIds, ...) instead of full snippets with thumbnails and descriptions.
+- Compression: googleapiclient already sends "Accept-Encoding: gzip" and the
+  "(gzip)" user agent Google requires, and httplib2 decompresses transparently.
+- ETag cache: list responses are cached by request URI in
+  data/youtube_list_cache.json and re-requested with If-None-Match, so a page
+  that has not changed comes back as an empty 304.
+"""
+import json
+import os
+from collections import OrderedDict
+
+from core.config import DATA_DIR
+
+try:
+    from .retry import call_with_retry, error_status
+except ImportError:
+    from yt_music.retry import call_with_retry, error_status
+
+LIST_CACHE_FILE = os.path.join(DATA_DIR, "youtube_list_cache.json")
+# Oldest pages are dropped beyond this many cached responses
+MAX_CACHED_RESPONSES = 500
+
+# Partial-response masks; "etag" is needed for conditional requests
+PLAYLIST_ITEM_FIELDS = "etag,nextPageToken,items(id,snippet(title,position),contentDetails(videoId))"
+PLAYLIST_FIELDS = "etag,nextPageToken,items(id,etag,snippet(title,description),contentDetails(itemCount))"
+VIDEO_FIELDS = "etag,items(id,snippet(title,description,categoryId),status(privacyStatus,selfDeclaredMadeForKids))"
+
+
+class ListCache:
+    def __init__(self, path: str = LIST_CACHE_FILE, max_entries: int = MAX_CACHED_RESPONSES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.entries = OrderedDict(json.load(f))
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️ Could not read list cache {path} ({e}); starting empty.")
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, response):
+        self.entries.pop(key, None)
+        self.entries[key] = response
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+_list_cache = None
+
+
+def get_list_cache() -> ListCache:
+    global _list_cache
+    if _list_cache is None:
+        _list_cache = ListCache()
+    return _list_cache
+
+
+def execute_cached(request, cache: ListCache = None):
+    """
+    Executes a list request, sending If-None-Match with the ETag of the cached
+    response for the same URI and returning the cached response on 304.
+    """
+    key = request.uri if cache is not None else None
+    cached = cache.get(key) if isinstance(key, str) else None
+    if cached:
+        request.headers["If-None-Match"] = cached["etag"]
+    try:
+        response = call_with_retry(request.execute)
+    except Exception as e:
+        if cached and error_status(e) == 304:
+            return cached
+        raise
+
+    if isinstance(key, str) and isinstance(response, dict) and isinstance(response.get("etag"), str):
+        cache.put(key, response)
+    return response
+
+
+def list_all(youtube, resource: str, fields: str = None, use_cache: bool = True, **params) -> list:
+    """
+    All items of a paginated list call, e.g.
+        list_all(youtube, "playlistItems", PLAYLIST_ITEM_FIELDS, part="snippet,contentDetails", playlistId=pid)
+    """
+    cache = get_list_cache() if use_cache else None
+    collection = getattr(youtube, resource)()
+    if fields:
+        params["fields"] = fields
+    params.setdefault("maxResults", 50)
+
+    items = []
+    request = collection.list(**params)
+    while request:
+        response = execute_cached(request, cache)
+        items.extend(response.get('items', []))
+        if 'nextPageToken' not in response:
+            break
+        request = collection.list_next(request, response)
+    if cache is not None:
+        cache.save()
+    return items
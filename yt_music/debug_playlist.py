@@ -3,6 +3,10 @@ import pickle
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+try:
+    from .client import list_all
+except ImportError:
+    from yt_music.client import list_all
 
 def get_authenticated_service():
     creds = None
@@ -14,17 +18,9 @@ def get_authenticated_service():
 def list_channel_playlists(channel_id):
     youtube = get_authenticated_service()
     print(f"Listing playlists for channel: {channel_id}")
-    request = youtube.playlists().list(
-        part="snippet",
-        channelId=channel_id,
-        maxResults=50
-    )
-    while request:
-        response = request.execute()
-        for item in response.get('items', []):
-            print(f"- Title: {item['snippet']['title']}")
-            print(f"  ID: {item['id']}")
-        request = youtube.playlists().list_next(request, response)
+    for item in list_all(youtube, "playlists", "etag,nextPageToken,items(id,snippet(title))", part="snippet", channelId=channel_id):
+        print(f"- Title: {item['snippet']['title']}")
+        print(f"  ID: {item['id']}")
 
 if __name__ == "__main__":
     # Channel ID from config.json
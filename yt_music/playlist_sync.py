@@ -0,0 +1,108 @@
+"""
+Minimal edit script between the current and desired order of a YouTube playlist.
+
+Items whose video appears in both lists are matched up; the longest run of matched
+items that is already in the right relative order (LIS) stays untouched, the other
+matched items are moved, unmatched desired videos are inserted and unmatched current
+items are deleted. Each operation carries the absolute position YouTube expects at the
+moment it is applied, so the ops must be executed in order.
+"""
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+
+def _longest_increasing_subsequence(values: List[int]) -> set:
+    """Indices (into values) of one longest strictly increasing subsequence."""
+    tails = []       # tails[k] = index of the smallest tail of an increasing run of length k+1
+    tail_values = []
+    parents = [None] * len(values)
+    for i, v in enumerate(values):
+        k = bisect_left(tail_values, v)
+        if k > 0:
+            parents[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(v)
+        else:
+            tails[k] = i
+            tail_values[k] = v
+
+    keep = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        keep.add(i)
+        i = parents[i]
+    return keep
+
+
+def plan_sync(current_items: List[Dict], desired_video_ids: List[str]) -> List[Dict]:
+    """
+    current_items: playlistItems resources in playlist order (need 'id' and contentDetails.videoId).
+    desired_video_ids: the target order of video ids.
+
+    Returns a list of ops, to be applied in order:
+        {"op": "delete", "item_id", "video_id"}
+        {"op": "move",   "item_id", "video_id", "position"}
+        {"op": "insert", "video_id", "position"}
+    An already-correct playlist yields no ops.
+    """
+    current = [(item["id"], item["contentDetails"]["videoId"]) for item in current_items]
+
+    # Match each desired slot with the first unused current item holding the same video
+    available = defaultdict(deque)
+    for index, (_, video_id) in enumerate(current):
+        available[video_id].append(index)
+
+    match: List[Optional[int]] = []
+    for video_id in desired_video_ids:
+        match.append(available[video_id].popleft() if available[video_id] else None)
+
+    matched_current = {ci: di for di, ci in enumerate(match) if ci is not None}
+
+    ops = []
+    for index, (item_id, video_id) in enumerate(current):
+        if index not in matched_current:
+            ops.append({"op": "delete", "item_id": item_id, "video_id": video_id})
+
+    # Matched items in current order; those on the LIS of desired indices stay put
+    survivors = sorted(matched_current)
+    desired_order = [matched_current[ci] for ci in survivors]
+    keep = {survivors[k] for k in _longest_increasing_subsequence(desired_order)}
+
+    # Simulated playlist after the deletes: [desired_index, settled]
+    sim = [[matched_current[ci], ci in keep] for ci in survivors]
+
+    def insert_position(desired_index: int) -> int:
+        """Right after the last settled entry that belongs before desired_index."""
+        position = 0
+        for pos, (d, settled) in enumerate(sim):
+            if settled and d < desired_index:
+                position = pos + 1
+        return position
+
+    for desired_index, current_index in enumerate(match):
+        video_id = desired_video_ids[desired_index]
+        if current_index is None:
+            position = insert_position(desired_index)
+            sim.insert(position, [desired_index, True])
+            ops.append({"op": "insert", "video_id": video_id, "position": position})
+        elif current_index not in keep:
+            sim.pop(next(pos for pos, entry in enumerate(sim) if entry[0] == desired_index))
+            position = insert_position(desired_index)
+            sim.insert(position, [desired_index, True])
+            ops.append({
+                "op": "move",
+                "item_id": current[current_index][0],
+                "video_id": video_id,
+                "position": position,
+            })
+
+    return ops
+
+
+def summarize_ops(ops: List[Dict]) -> str:
+    counts = {"insert": 0, "move": 0, "delete": 0}
+    for op in ops:
+        counts[op["op"]] = counts.get(op["op"], 0) + 1
+    return f"{counts['insert']} inserts, {counts['move']} moves, {counts['delete']} deletes"
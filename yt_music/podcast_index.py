@@ -0,0 +1,130 @@
+"""
+Local index of which videos are in the global podcast playlist.
+
+The podcast playlist only ever grows, so listing all of it on every run costs more
+and more. The index in data/podcast_index.json is updated with our own inserts and
+checked against YouTube with a single playlists.list call (1 unit): If-None-Match on
+the stored response ETag. Only when there is no ETag (our own inserts changed it) is
+itemCount compared instead. A full scan only happens when the index is missing, out
+of step, or older than RECONCILE_DAYS.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+from core.config import DATA_DIR
+
+try:
+    from .client import list_all
+    from .retry import call_with_retry, error_status
+except ImportError:
+    from yt_music.client import list_all
+    from yt_music.retry import call_with_retry, error_status
+
+PODCAST_INDEX_FILE = os.path.join(DATA_DIR, "podcast_index.json")
+# Full scan at least this often, in case items were removed and added in between
+RECONCILE_DAYS = 7
+# The response-level etag is what If-None-Match is checked against
+PLAYLIST_COUNT_FIELDS = "etag,items(contentDetails(itemCount))"
+
+
+class PodcastIndex:
+    def __init__(self, playlist_id: str, path: str = PODCAST_INDEX_FILE):
+        self.playlist_id = playlist_id
+        self.path = path
+        self.all = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.all = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️ Could not read podcast index {path} ({e}); it will be rebuilt.")
+        self.entry = self.all.get(playlist_id)
+
+    @property
+    def video_ids(self) -> set:
+        return set(self.entry["video_ids"]) if self.entry else set()
+
+    def _is_stale(self) -> bool:
+        if not self.entry:
+            return True
+        reconciled = datetime.fromisoformat(self.entry["reconciled"])
+        return datetime.now() - reconciled > timedelta(days=RECONCILE_DAYS)
+
+    def _check_unchanged(self, youtube) -> bool:
+        """One playlists.list call: True if the playlist still matches the index."""
+        request = youtube.playlists().list(part="contentDetails", id=self.playlist_id, fields=PLAYLIST_COUNT_FIELDS)
+        etag = self.entry.get("etag")
+        if etag:
+            request.headers["If-None-Match"] = etag
+        try:
+            response = call_with_retry(request.execute)
+        except Exception as e:
+            if error_status(e) == 304:
+                return True
+            raise
+
+        playlists = response.get("items", [])
+        if not playlists:
+            return False
+        if etag:
+            # A new ETag can hide a remove + add that leaves itemCount as it was
+            return response.get("etag") == etag
+        item_count = playlists[0].get("contentDetails", {}).get("itemCount")
+        if item_count != len(self.entry["video_ids"]):
+            return False
+        self.entry["etag"] = response.get("etag")
+        return True
+
+    def _scan(self, youtube):
+        # Not ETag-cached: the index itself is the cache for this playlist
+        items = list_all(
+            youtube, "playlistItems", "nextPageToken,items(contentDetails(videoId))",
+            use_cache=False, part="contentDetails", playlistId=self.playlist_id
+        )
+        video_ids = [item["contentDetails"]["videoId"] for item in items]
+
+        # Store the ETag that matches this listing for the next conditional check
+        response = call_with_retry(youtube.playlists().list(part="contentDetails", id=self.playlist_id, fields=PLAYLIST_COUNT_FIELDS).execute)
+        playlists = response.get("items", [])
+        self.entry = {
+            "video_ids": video_ids,
+            "etag": response.get("etag") if playlists else None,
+            "reconciled": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def refresh(self, youtube, force: bool = False) -> set:
+        """Makes sure the index matches YouTube and returns the video ids in the playlist."""
+        if force or self._is_stale():
+            print(f"Scanning podcast playlist ({self.playlist_id})...")
+            self._scan(youtube)
+        elif self._check_unchanged(youtube):
+            print(f"Podcast playlist index is up to date ({len(self.entry['video_ids'])} episodes).")
+        else:
+            print(f"Podcast playlist changed outside this tool; rescanning ({self.playlist_id})...")
+            self._scan(youtube)
+        self.save()
+        return self.video_ids
+
+    def add(self, video_ids):
+        """Records our own inserts. The ETag changes with them, so itemCount is checked next time."""
+        if not self.entry:
+            return
+        added = [video_id for video_id in video_ids if video_id not in self.entry["video_ids"]]
+        if not added:
+            return
+        self.entry["video_ids"].extend(added)
+        self.entry["etag"] = None
+        self.save()
+
+    def save(self):
+        if self.entry is None:
+            return
+        self.all[self.playlist_id] = self.entry
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.all, f, indent=4)
+        os.replace(tmp_path, self.path)
@@ -2,119 +2,63 @@ import os
 import json
 import argparse
 import re
-from urllib.parse import unquote
 from googleapiclient.discovery import build
 # Reuse authentication and helper from existing script
 try:
-    from .update_youtube_playlist import get_authenticated_service, get_wikimedia_attribution
+    from .update_youtube_playlist import get_authenticated_service
+    from .wikimedia import fetch_attributions, filename_from_url
+    from .client import list_all, PLAYLIST_ITEM_FIELDS
 except ImportError:
-    from yt_music.update_youtube_playlist import get_authenticated_service, get_wikimedia_attribution
+    from yt_music.update_youtube_playlist import get_authenticated_service
+    from yt_music.wikimedia import fetch_attributions, filename_from_url
+    from yt_music.client import list_all, PLAYLIST_ITEM_FIELDS
 
 def get_playlist_id_by_name(youtube, channel_id, playlist_name):
     print(f"Searching for playlist '{playlist_name}' in channel '{channel_id}'...")
-    request = youtube.playlists().list(
-        part="snippet",
-        channelId=channel_id,
-        maxResults=50
-    )
-    while request:
-        response = request.execute()
-        for item in response.get('items', []):
-            if item['snippet']['title'] == playlist_name:
-                return item['id']
-        request = youtube.playlists().list_next(request, response)
+    for item in list_all(youtube, "playlists", "etag,nextPageToken,items(id,snippet(title))", part="snippet", channelId=channel_id):
+        if item['snippet']['title'] == playlist_name:
+            return item['id']
     return None
 
 def get_all_playlist_items(youtube, playlist_id):
-    items = []
-    request = youtube.playlistItems().list(
-        part="snippet,contentDetails",
-        playlistId=playlist_id,
-        maxResults=50
-    )
-    while request:
-        response = request.execute()
-        items.extend(response.get('items', []))
-        request = youtube.playlistItems().list_next(request, response)
-    return items
-
-def main():
-    parser = argparse.ArgumentParser(description="Enrich curated_playlist.json with uploaded clips metadata.")
-    parser.add_argument("playlist_dir", help="Path to the playlist directory (e.g. data/playlists/space_jazz)")
-    parser.add_argument("--playlist-id", help="The ID of the manual playlist containing your uploads", required=True)
-    args = parser.parse_args()
-
-    playlist_dir = args.playlist_dir
-    if not os.path.exists(playlist_dir):
-        print(f"Error: Directory {playlist_dir} not found.")
-        return
-
-    # Load configs
-    from core.config import GlobalConfig, PlaylistConfig
-    from core.models.playlist import CuratedPlaylist
-
-    try:
-        global_config = GlobalConfig.load()
-    except Exception as e:
-        print(f"Error loading global config: {e}")
-        return
-    
-    try:
-        playlist_config = PlaylistConfig.load(playlist_dir)
-    except Exception as e:
-        print(f"Error loading playlist config: {e}")
-        return
-    
-    try:
-        curated_playlist = CuratedPlaylist.load(playlist_dir)
-    except Exception as e:
-        print(f"Error loading curated playlist: {e}")
-        return
+    return list_all(youtube, "playlistItems", PLAYLIST_ITEM_FIELDS, part="snippet,contentDetails", playlistId=playlist_id)
 
-    items = curated_playlist.items
-    if not items:
-        print("Error: curated_playlist.json has no items.")
-        return
+# Uploads are matched to narrative segments by a "part_N" in their title; the
+# assumption is the user uploaded the generated files part_001.mp4, etc.
+PART_PATTERN = re.compile(r'part[ _](\d+)', re.IGNORECASE)
 
-    channel_id = global_config.channel_id
-    if not channel_id or channel_id == "UC_YOUR_CHANNEL_ID_HERE":
-        print("Error: channel_id not set in config.json. Please add your YouTube Channel ID.")
-        return
-
-    youtube = get_authenticated_service()
-    if not youtube:
-        print("Authentication failed.")
-        return
-
-    playlist_title = curated_playlist.title or playlist_config.topic
-    playlist_title += " (Narrated)"
-    
-    playlist_id = args.playlist_id
-    if not playlist_id:
-        print("Error: Must provide --playlist-id")
-        return
-    
-    print(f"Found playlist ID: {playlist_id}")
-
-    # Get all items in the playlist to find uploaded videos
-    print("Fetching playlist items to find uploaded narration parts...")
-    yt_items = get_all_playlist_items(youtube, playlist_id)
-    
-    # Find narration parts by title matching "part_N" pattern
-    # The assumption is the user uploaded the generated files part_001.mp4, etc.
+def find_narration_uploads(yt_items, pattern=PART_PATTERN, verbose=True):
+    """Returns {part number: video id} for playlist items whose title matches pattern."""
     narration_uploads = {}
     for item in yt_items:
         title = item['snippet']['title']
         vid_id = item['contentDetails']['videoId']
         
-        match = re.search(r'part[ _](\d+)', title, re.IGNORECASE)
+        match = pattern.search(title)
         if match:
             part_num = int(match.group(1))
             narration_uploads[part_num] = vid_id
-            print(f"  Found narration part {part_num}: {title} ({vid_id})")
+            if verbose:
+                print(f"  Found narration part {part_num}: {title} ({vid_id})")
+    return narration_uploads
 
-    if not narration_uploads:
-        print("Warning: No narration parts found in playlist matching 'part_N' pattern.")
+def narration_image_filenames(curated_playlist):
+    return [filename_from_url(item.image_url) for item in curated_playlist.items if item.type == "narrative" and item.image_url]
+
+def enrich_playlist(playlist_dir, curated_playlist, playlist_config, playlist_id, narration_uploads, attributions=None):
+    """
+    Fills in kinds, YouTube video ids, episode titles and rich descriptions (links,
+    transcript, image credit) and writes curated_playlist.json back.
+    attributions: {image filename: credit} if already fetched (bulk mode).
+    """
+    items = curated_playlist.items
+    playlist_title = curated_playlist.title or playlist_config.topic
+    playlist_title += " (Narrated)"
+
+    # Image credits for all narrations, resolved in as few Commons queries as possible
+    if attributions is None:
+        image_filenames = narration_image_filenames(curated_playlist)
+        attributions = fetch_attributions(image_filenames) if image_filenames else {}
 
     # Assemble the plan
     print(f"Enriching curated playlist with {len(items)} items...")
@@ -178,9 +122,7 @@ def main():
             footer = ""
             image_url = item.image_url
             if image_url:
-                filename = image_url.split('/')[-1]
-                filename = unquote(filename)
-                attribution = get_wikimedia_attribution(filename)
+                attribution = attributions.get(filename_from_url(image_url))
                 if attribution:
                     footer = "\n\n---\n" + attribution
             
@@ -218,8 +160,243 @@ def main():
         curated_playlist.save(playlist_dir)
         print(f"\n✅ Enriched curated_playlist.json with YouTube metadata.")
         print("You can now run the update script to apply these changes.")
+        return True
     except Exception as e:
         print(f"Error saving enriched playlist: {e}")
+        return False
+
+def load_playlist(playlist_dir):
+    """Returns (playlist_config, curated_playlist), or None after printing why not."""
+    from core.config import PlaylistConfig
+    from core.models.playlist import CuratedPlaylist
+
+    try:
+        playlist_config = PlaylistConfig.load(playlist_dir)
+    except Exception as e:
+        print(f"Error loading playlist config: {e}")
+        return None
+    
+    try:
+        curated_playlist = CuratedPlaylist.load(playlist_dir)
+    except Exception as e:
+        print(f"Error loading curated playlist: {e}")
+        return None
+
+    if not curated_playlist.items:
+        print("Error: curated_playlist.json has no items.")
+        return None
+    return playlist_config, curated_playlist
+
+def linked_playlist_ids():
+    """{playlist dir: YouTube playlist id (or None)} for every local playlist with a curated_playlist.json."""
+    from core.config import PLAYLISTS_DIR
+    from core.models.playlist import CURATED_PLAYLIST_FILENAME
+
+    if not os.path.isdir(PLAYLISTS_DIR):
+        return {}
+    linked = {}
+    for name in sorted(os.listdir(PLAYLISTS_DIR)):
+        playlist_dir = os.path.join(PLAYLISTS_DIR, name)
+        path = os.path.join(playlist_dir, CURATED_PLAYLIST_FILENAME)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r") as f:
+            linked[playlist_dir] = json.load(f).get("playlist_id")
+    return linked
+
+def crawl_channel(youtube, channel_id):
+    """One pass over the channel: {YouTube playlist id: {"title", "items"}} for every playlist."""
+    playlists = list_all(youtube, "playlists", "etag,nextPageToken,items(id,snippet(title))", part="snippet", channelId=channel_id)
+    print(f"Crawling {len(playlists)} playlists of channel {channel_id}...")
+    return {
+        playlist['id']: {"title": playlist['snippet']['title'], "items": get_all_playlist_items(youtube, playlist['id'])}
+        for playlist in playlists
+    }
+
+def fetch_file_details(youtube, video_ids):
+    """{video id: fileDetails} (original upload fileName and fileSize; owner only), 50 ids per call."""
+    details = {}
+    video_ids = list(dict.fromkeys(video_ids))
+    for start in range(0, len(video_ids), 50):
+        chunk = video_ids[start:start + 50]
+        for video in list_all(youtube, "videos", "etag,items(id,fileDetails(fileName,fileSize))", part="fileDetails", id=",".join(chunk)):
+            details[video['id']] = video.get('fileDetails', {})
+    return details
+
+def match_playlist_uploads(name, playlist_dir, curated_playlist, channel, get_file_details, exclude=()):
+    """
+    Finds the YouTube playlist holding this local playlist's narration uploads.
+    Returns (YouTube playlist id, {part number: video id}), or (None, {}). Tried in order:
+      1. uploads titled "<name>_part_NNN" (the name of the exported files),
+      2. a YouTube playlist titled like the folder or the curated title, with "part_N" uploads,
+      3. the uploads' original fileName, or their fileSize against the local part_NNN.mp4 files.
+    Playlists in exclude (the podcast playlist, or ones other local playlists own) are never returned.
+    """
+    channel = {pid: p for pid, p in channel.items() if pid not in exclude}
+
+    def best_of(candidates):
+        candidates = [c for c in candidates if c[1]]
+        return max(candidates, key=lambda c: len(c[1])) if candidates else None
+
+    # Not preceded by a word character, so "jazz" doesn't match "space_jazz_part_001.mp4"
+    prefixed = re.compile(rf'(?<![\w-]){re.escape(name)}[ _]part[ _](\d+)', re.IGNORECASE)
+    best = best_of((pid, find_narration_uploads(p["items"], prefixed, verbose=False)) for pid, p in channel.items())
+    if best:
+        return best
+
+    titles = {name.lower(), (curated_playlist.title or "").lower()}
+    best = best_of(
+        (pid, find_narration_uploads(p["items"], verbose=False))
+        for pid, p in channel.items() if p["title"].lower() in titles
+    )
+    if best:
+        return best
+
+    local_sizes = {}
+    narrative_counter = 0
+    for item in curated_playlist.items:
+        if item.type != "narrative":
+            continue
+        narrative_counter += 1
+        path = os.path.join(playlist_dir, item.video_filename or "")
+        if item.video_filename and os.path.exists(path):
+            local_sizes[os.path.getsize(path)] = narrative_counter
+
+    file_details = get_file_details()
+    candidates = []
+    for pid, playlist in channel.items():
+        uploads = {}
+        for yt_item in playlist["items"]:
+            vid_id = yt_item['contentDetails']['videoId']
+            details = file_details.get(vid_id, {})
+            match = prefixed.search(details.get('fileName', ''))
+            if match:
+                uploads[int(match.group(1))] = vid_id
+            elif details.get('fileSize') is not None and int(details['fileSize']) in local_sizes:
+                uploads[local_sizes[int(details['fileSize'])]] = vid_id
+        candidates.append((pid, uploads))
+    return best_of(candidates) or (None, {})
+
+def enrich_all(youtube, channel_id, include_enriched=False, podcast_playlist_id=None):
+    """
+    Bulk mode: one channel crawl, then every pending playlist under data/playlists/ is enriched.
+    The podcast playlist holds every playlist's narration parts, so it is never matched, and
+    nor is a YouTube playlist another local playlist is (or was just) linked to.
+    """
+    linked = linked_playlist_ids()
+    pending = [d for d, playlist_id in linked.items() if include_enriched or not playlist_id]
+    if not pending:
+        print("No playlists waiting for post-upload enrichment.")
+        return
+
+    loaded = {}
+    for playlist_dir in pending:
+        result = load_playlist(playlist_dir)
+        if result:
+            loaded[playlist_dir] = result
+    print(f"Found {len(loaded)} playlists to enrich: {', '.join(os.path.basename(d) for d in loaded)}")
+
+    channel = crawl_channel(youtube, channel_id)
+
+    file_details = None
+    # Uploads already claimed by a playlist; their file details are never needed
+    matched_ids = set()
+    def get_file_details():
+        # Only fetched if some playlist can't be matched by title. Renamed uploads can have
+        # any title, so every upload not yet claimed by title is looked up.
+        nonlocal file_details
+        if file_details is None:
+            upload_ids = [
+                item['contentDetails']['videoId']
+                for playlist in channel.values() for item in playlist["items"]
+                if item['contentDetails']['videoId'] not in matched_ids
+            ]
+            print(f"Fetching file details for {len(set(upload_ids))} uploads...")
+            file_details = fetch_file_details(youtube, upload_ids)
+        return file_details
+
+    # Image credits for every playlist in one go
+    image_filenames = [f for _, curated in loaded.values() for f in narration_image_filenames(curated)]
+    attributions = fetch_attributions(image_filenames) if image_filenames else {}
+
+    enriched = []
+    for playlist_dir, (playlist_config, curated_playlist) in loaded.items():
+        name = os.path.basename(os.path.normpath(playlist_dir))
+        print(f"\n📁 {name}")
+        exclude = {podcast_playlist_id} | {pid for d, pid in linked.items() if pid and d != playlist_dir}
+        playlist_id, narration_uploads = match_playlist_uploads(name, playlist_dir, curated_playlist, channel, get_file_details, exclude)
+        if not playlist_id:
+            print(f"  ⚠️ No uploads found for {name}; skipping.")
+            continue
+        print(f"  Matched YouTube playlist {playlist_id} ({channel[playlist_id]['title']}) with {len(narration_uploads)} narration parts.")
+        matched_ids.update(narration_uploads.values())
+        linked[playlist_dir] = playlist_id
+        if enrich_playlist(playlist_dir, curated_playlist, playlist_config, playlist_id, narration_uploads, attributions):
+            enriched.append(name)
+
+    print(f"\n🎉 Enriched {len(enriched)} of {len(loaded)} playlists.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich curated_playlist.json with uploaded clips metadata.")
+    parser.add_argument("playlist_dir", nargs="?", help="Path to the playlist directory (e.g. data/playlists/space_jazz)")
+    parser.add_argument("--playlist-id", help="The ID of the manual playlist containing your uploads")
+    parser.add_argument("--all", action="store_true", help="Enrich every pending playlist under data/playlists/ from one crawl of the channel")
+    parser.add_argument("--include-enriched", action="store_true", help="With --all, also redo playlists that already have a playlist_id")
+    args = parser.parse_args()
+
+    if not args.all and (not args.playlist_dir or not args.playlist_id):
+        parser.error("playlist_dir and --playlist-id are required unless --all is given")
+
+    # Load configs
+    from core.config import GlobalConfig
+
+    try:
+        global_config = GlobalConfig.load()
+    except Exception as e:
+        print(f"Error loading global config: {e}")
+        return
+
+    channel_id = global_config.channel_id
+    if not channel_id or channel_id == "UC_YOUR_CHANNEL_ID_HERE":
+        print("Error: channel_id not set in config.json. Please add your YouTube Channel ID.")
+        return
+
+    if args.all:
+        youtube = get_authenticated_service()
+        if not youtube:
+            print("Authentication failed.")
+            return
+        enrich_all(youtube, channel_id, include_enriched=args.include_enriched,
+                   podcast_playlist_id=global_config.podcast_playlist_id)
+        return
+
+    playlist_dir = args.playlist_dir
+    if not os.path.exists(playlist_dir):
+        print(f"Error: Directory {playlist_dir} not found.")
+        return
+
+    loaded = load_playlist(playlist_dir)
+    if not loaded:
+        return
+    playlist_config, curated_playlist = loaded
+
+    youtube = get_authenticated_service()
+    if not youtube:
+        print("Authentication failed.")
+        return
+
+    playlist_id = args.playlist_id
+    print(f"Found playlist ID: {playlist_id}")
+
+    # Get all items in the playlist to find uploaded videos
+    print("Fetching playlist items to find uploaded narration parts...")
+    yt_items = get_all_playlist_items(youtube, playlist_id)
+    
+    narration_uploads = find_narration_uploads(yt_items)
+    if not narration_uploads:
+        print("Warning: No narration parts found in playlist matching 'part_N' pattern.")
+
+    enrich_playlist(playlist_dir, curated_playlist, playlist_config, playlist_id, narration_uploads)
 
 if __name__ == "__main__":
     main()
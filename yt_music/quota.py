@@ -0,0 +1,180 @@
+"""
+Daily YouTube Data API quota accounting.
+
+Every call made through QuotaAwareService is charged to a QuotaTracker, which keeps
+per-day usage (by API method) in data/youtube_quota.json. The quota resets at
+midnight Pacific time, so days are keyed by the Pacific date.
+"""
+import json
+import os
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from core.config import DATA_DIR
+
+QUOTA_FILE = os.path.join(DATA_DIR, "youtube_quota.json")
+DEFAULT_DAILY_QUOTA = 10000
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Units per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+METHOD_COSTS = {
+    "search.list": 100,
+    "videos.insert": 1600,
+}
+VERB_COSTS = {
+    "list": 1,
+    "insert": 50,
+    "update": 50,
+    "delete": 50,
+}
+
+# Days of history kept in the quota file
+HISTORY_DAYS = 14
+
+
+def method_cost(method: str) -> int:
+    """Units charged for one call of e.g. 'playlistItems.insert'."""
+    if method in METHOD_COSTS:
+        return METHOD_COSTS[method]
+    verb = method.rsplit(".", 1)[-1]
+    if verb.endswith("_next"):
+        verb = verb[:-len("_next")]
+    return VERB_COSTS.get(verb, 50)
+
+
+def quota_day() -> str:
+    """The current quota day (Pacific date) as YYYY-MM-DD."""
+    return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class QuotaTracker:
+    def __init__(self, daily_limit: int = DEFAULT_DAILY_QUOTA, path: str = QUOTA_FILE, today=quota_day):
+        self.daily_limit = daily_limit
+        self.path = path
+        self.today = today
+        self.days = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.days = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️ Could not read quota usage from {path} ({e}); starting from zero.")
+
+    def _day(self) -> dict:
+        return self.days.setdefault(self.today(), {"used": 0, "by_method": {}})
+
+    def used(self) -> int:
+        return self.days.get(self.today(), {}).get("used", 0)
+
+    def remaining(self) -> int:
+        return max(0, self.daily_limit - self.used())
+
+    def charge(self, method: str, units: int = None):
+        units = method_cost(method) if units is None else units
+        day = self._day()
+        day["used"] += units
+        day["by_method"][method] = day["by_method"].get(method, 0) + units
+        self.save()
+
+    def save(self):
+        for old in sorted(self.days)[:-HISTORY_DAYS]:
+            del self.days[old]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.days, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def summary(self) -> str:
+        return f"{self.used()} / {self.daily_limit} units used today ({self.today()}, Pacific)"
+
+
+class _QuotaRequest:
+    """An HttpRequest that charges its method when executed."""
+    def __init__(self, request, method, tracker):
+        self.request = request
+        self.method = method
+        self.tracker = tracker
+
+    def execute(self, *args, **kwargs):
+        self.tracker.charge(self.method)
+        return self.request.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.request, name)
+
+
+def _unwrap(request):
+    return request.request if isinstance(request, _QuotaRequest) else request
+
+
+class _QuotaResource:
+    def __init__(self, resource, name, tracker):
+        self._resource = resource
+        self._name = name
+        self._tracker = tracker
+
+    def __getattr__(self, attr):
+        target = getattr(self._resource, attr)
+        if not callable(target):
+            return target
+        method = f"{self._name}.{attr[:-len('_next')] if attr.endswith('_next') else attr}"
+
+        def call(*args, **kwargs):
+            args = [_unwrap(a) for a in args]
+            kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+            result = target(*args, **kwargs)
+            if result is None:
+                return None  # list_next at the last page
+            return _QuotaRequest(result, method, self._tracker)
+        return call
+
+
+class _QuotaBatch:
+    """A BatchHttpRequest that charges every added request when executed."""
+    def __init__(self, batch, tracker):
+        self.batch = batch
+        self.tracker = tracker
+        self.methods = []
+
+    def add(self, request, *args, **kwargs):
+        if isinstance(request, _QuotaRequest):
+            self.methods.append(request.method)
+        self.batch.add(_unwrap(request), *args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        for method in self.methods:
+            self.tracker.charge(method)
+        self.methods = []
+        return self.batch.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.batch, name)
+
+
+class QuotaAwareService:
+    """
+    Wraps the service returned by get_authenticated_service; usage is the same
+    (youtube.playlistItems().list(...).execute(), new_batch_http_request, ...).
+    """
+    def __init__(self, service, tracker: QuotaTracker):
+        self._service = service
+        self.tracker = tracker
+
+    def new_batch_http_request(self, *args, **kwargs):
+        return _QuotaBatch(self._service.new_batch_http_request(*args, **kwargs), self.tracker)
+
+    def __getattr__(self, name):
+        target = getattr(self._service, name)
+        if not callable(target):
+            return target
+
+        def resource(*args, **kwargs):
+            return _QuotaResource(target(*args, **kwargs), name, self.tracker)
+        return resource
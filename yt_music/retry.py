@@ -0,0 +1,76 @@
+"""
+Retry policy for YouTube Data API calls: exponential backoff with full jitter for
+server errors, rate limiting and dropped connections. Daily quota exhaustion
+(quotaExceeded) is not retried, since it only clears at midnight Pacific.
+"""
+import json
+import random
+import socket
+import time
+
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+RATE_LIMIT_STATUSES = {403, 429}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+DEFAULT_RETRIES = 5
+BASE_DELAY = 1.0
+MAX_DELAY = 32.0
+
+
+def error_status(error):
+    """HTTP status of a googleapiclient HttpError (None for other exceptions)."""
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def error_reason(error):
+    """The first 'reason' in an HttpError's JSON body, e.g. 'quotaExceeded'."""
+    content = getattr(error, "content", None)
+    if not content:
+        return None
+    try:
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        errors = json.loads(content).get("error", {}).get("errors", [])
+        return errors[0].get("reason") if errors else None
+    except (ValueError, AttributeError, UnicodeDecodeError):
+        return None
+
+
+def is_retryable(error) -> bool:
+    status = error_status(error)
+    if status in RETRYABLE_STATUSES:
+        return True
+    if status in RATE_LIMIT_STATUSES:
+        # 429 without a reason is plain rate limiting; 403 is only retryable for rate limits
+        reason = error_reason(error)
+        return reason in RATE_LIMIT_REASONS or (status == 429 and reason is None)
+    return isinstance(error, (ConnectionError, TimeoutError, socket.timeout))
+
+
+def is_not_found(error) -> bool:
+    return error_status(error) == 404
+
+
+def backoff_delay(attempt: int, base: float = BASE_DELAY, cap: float = MAX_DELAY) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_retry(fn, retries: int = DEFAULT_RETRIES, sleep=time.sleep):
+    """Calls fn(), retrying retryable errors up to `retries` times with backoff."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt)
+            print(f"    ⏳ {e.__class__.__name__} ({error_status(e) or 'no status'}), retrying in {delay:.1f}s...")
+            sleep(delay)
+            attempt += 1
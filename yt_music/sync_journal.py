@@ -0,0 +1,93 @@
+"""
+On-disk journal of a playlist update, so an interrupted run (quota error, 5xx,
+Ctrl-C) can be resumed with --resume instead of being planned and applied again.
+
+Every planned operation is written to sync_journal.json in the playlist directory
+before anything is executed. An operation is marked "started" before its request is
+sent and "done" (or "failed") once the response is in. A "started" operation may or
+may not have reached YouTube, so on resume it is checked before being repeated.
+"""
+import json
+import os
+from datetime import datetime
+
+JOURNAL_FILENAME = "sync_journal.json"
+
+PENDING = "pending"
+STARTED = "started"
+DONE = "done"
+FAILED = "failed"
+
+
+class SyncJournal:
+    def __init__(self, path, data: dict):
+        # path None keeps the journal in memory only
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def in_memory(cls, ops: list) -> "SyncJournal":
+        return cls(None, {"ops": [{**op, "status": op.get("status", PENDING)} for op in ops]})
+
+    @classmethod
+    def path_for(cls, playlist_dir: str) -> str:
+        return os.path.join(playlist_dir, JOURNAL_FILENAME)
+
+    @classmethod
+    def create(cls, playlist_dir: str, playlist_id: str, ops: list, **meta) -> "SyncJournal":
+        """Writes a fresh journal for ops (replacing any previous one)."""
+        data = {
+            "playlist_id": playlist_id,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            **meta,
+            "ops": [{**op, "status": PENDING} for op in ops],
+        }
+        journal = cls(cls.path_for(playlist_dir), data)
+        journal.save()
+        return journal
+
+    @classmethod
+    def load(cls, playlist_dir: str):
+        """The journal in playlist_dir, or None if there is none."""
+        path = cls.path_for(playlist_dir)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return cls(path, json.load(f))
+
+    @property
+    def ops(self) -> list:
+        return self.data["ops"]
+
+    def incomplete(self) -> list:
+        return [op for op in self.ops if op["status"] != DONE]
+
+    def is_complete(self) -> bool:
+        return not self.incomplete()
+
+    @staticmethod
+    def record(op: dict, status: str, error=None):
+        """Sets the status of one journal op without writing the journal."""
+        op["status"] = status
+        if error is not None:
+            op["error"] = str(error)
+        else:
+            op.pop("error", None)
+
+    def mark(self, ops: list, status: str, error=None):
+        """Sets the status of the given journal ops and writes the journal."""
+        for op in ops:
+            self.record(op, status, error)
+        self.save()
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
@@ -2,11 +2,29 @@ import os
 import json
 import argparse
 import pickle
-import requests
-import re
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+try:
+    from .playlist_sync import plan_sync, summarize_ops
+except ImportError:
+    from yt_music.playlist_sync import plan_sync, summarize_ops
+try:
+    from .batching import execute_batched, MAX_BATCH_SIZE
+    from .quota import QuotaAwareService, QuotaTracker, method_cost
+    from .retry import DEFAULT_RETRIES, call_with_retry, is_not_found
+    from .sync_journal import SyncJournal, STARTED, DONE, FAILED
+    from .podcast_index import PodcastIndex
+    from .wikimedia import fetch_attributions
+    from .client import list_all, PLAYLIST_FIELDS, PLAYLIST_ITEM_FIELDS, VIDEO_FIELDS
+except ImportError:
+    from yt_music.batching import execute_batched, MAX_BATCH_SIZE
+    from yt_music.quota import QuotaAwareService, QuotaTracker, method_cost
+    from yt_music.retry import DEFAULT_RETRIES, call_with_retry, is_not_found
+    from yt_music.sync_journal import SyncJournal, STARTED, DONE, FAILED
+    from yt_music.podcast_index import PodcastIndex
+    from yt_music.wikimedia import fetch_attributions
+    from yt_music.client import list_all, PLAYLIST_FIELDS, PLAYLIST_ITEM_FIELDS, VIDEO_FIELDS
 
 # Scopes required for managing playlists and videos
 SCOPES = [
@@ -40,60 +58,25 @@ def get_authenticated_service():
 def get_wikimedia_attribution(filename):
     """
     Fetch author, license, and source url from Wikimedia Commons for a given filename.
+    To look up many images at once use wikimedia.fetch_attributions.
     """
-    # Clean filename (remove file:// prefix if present)
-    if filename.startswith('file://'):
-        filename = filename.replace('file://', '')
-    
-    # Extract just the name if it's a path
-    filename = os.path.basename(filename)
-    
-    print(f"    🔍 Searching Wikimedia for: {filename}...")
-    
-    url = "https://commons.wikimedia.org/w/api.php"
-    params = {
-        "action": "query",
-        "titles": f"File:{filename}",
-        "prop": "imageinfo",
-        "iiprop": "extmetadata",
-        "format": "json"
-    }
-    headers = {
-        'User-Agent': 'PlaylistCurator/1.0 (https://github.com/yourusername/playlist-curator; contact@example.com)'
+    return fetch_attributions([filename]).get(filename)
+
+# Values every narration/track video is normalised to by update_video_metadata
+VIDEO_CATEGORY_ID = "10"  # Music
+VIDEO_PRIVACY_STATUS = "unlisted"
+
+# The API accepts up to 50 ids per videos.list / playlists.list call
+MAX_IDS_PER_LIST = 50
+
+def playlist_metadata_body(playlist_id, title, description):
+    return {
+        "id": playlist_id,
+        "snippet": {
+            "title": title,
+            "description": description
+        }
     }
-    
-    try:
-        resp = requests.get(url, params=params, headers=headers).json()
-        
-        # Handle case where response might be empty or invalid structure
-        if 'query' not in resp:
-            print("      ⚠️ Unexpected API response format.")
-            return None
-            
-        pages = resp['query']['pages']
-        page_id = next(iter(pages))
-        
-        if page_id == "-1":
-             print("      ⚠️ Image not found on Wikimedia Commons.")
-             return None
-             
-        metadata = pages[page_id]['imageinfo'][0]['extmetadata']
-        
-        # Clean HTML tags from values
-        def clean_html(raw_html):
-            cleanr = re.compile('<.*?>')
-            return re.sub(cleanr, '', raw_html)
-
-        artist = clean_html(metadata.get('Artist', {}).get('value', 'Unknown'))
-        license_name = metadata.get('LicenseShortName', {}).get('value', 'Unknown License')
-        license_url = metadata.get('LicenseUrl', {}).get('value', '')
-        source_url = f"https://commons.wikimedia.org/wiki/File:{filename.replace(' ', '_')}"
-        
-        return f"\n\nImage Credit:\nTitle: {filename}\nAuthor: {artist}\nSource: {source_url}\nLicense: {license_name} {license_url}"
-        
-    except Exception as e:
-        print(f"      ⚠️ Error fetching attribution: {e}")
-        return None
 
 def update_playlist_metadata(youtube, playlist_id, title, description):
     """
@@ -104,68 +87,451 @@ def update_playlist_metadata(youtube, playlist_id, title, description):
         # First, just update snippet
         youtube.playlists().update(
             part="snippet",
-            body={
-                "id": playlist_id,
-                "snippet": {
-                    "title": title,
-                    "description": description
-                }
-            }
+            body=playlist_metadata_body(playlist_id, title, description)
         ).execute()
         print("    ✅ Playlist metadata updated.")
         
     except Exception as e:
         print(f"    ❌ Failed to update playlist metadata: {e}")
 
+def video_metadata_body(video_id, title, description, attribution=""):
+    final_description = description
+    if attribution:
+        final_description += attribution
+
+    return {
+        "id": video_id,
+        "snippet": {
+            "title": title,
+            "description": final_description,
+            "categoryId": VIDEO_CATEGORY_ID
+        },
+        "status": {
+            "privacyStatus": VIDEO_PRIVACY_STATUS,
+            "selfDeclaredMadeForKids": False
+        }
+    }
+
 def update_video_metadata(youtube, video_id, title, description, attribution=""):
     """
     Updates the title, description, and status (unlisted, not for kids, music category) of a video.
     """
     # print(f"  📝 Updating metadata for {video_id}...")
-    
-    final_description = description
-    if attribution:
-        final_description += attribution
-        
     try:
         youtube.videos().update(
             part="snippet,status",
-            body={
-                "id": video_id,
-                "snippet": {
-                    "title": title,
-                    "description": final_description,
-                    "categoryId": "10" # Music
-                },
-                "status": {
-                    "privacyStatus": "unlisted",
-                    "selfDeclaredMadeForKids": False
-                }
-            }
+            body=video_metadata_body(video_id, title, description, attribution)
         ).execute()
         # print("    ✅ Metadata updated.")
     except Exception as e:
         print(f"    ❌ Failed to update metadata for {video_id}: {e}")
 
-def get_playlist_items(youtube, playlist_id):
+def fetch_videos(youtube, video_ids):
     """
-    Returns a list of video items from the playlist.
+    Returns {video_id: videos resource (snippet + status)} for the given ids,
+    using one videos.list call (1 unit) per 50 ids.
     """
-    items = []
-    request = youtube.playlistItems().list(
-        part="snippet,contentDetails",
-        playlistId=playlist_id,
-        maxResults=50
+    unique_ids = list(dict.fromkeys(video_ids))
+    videos = {}
+    for start in range(0, len(unique_ids), MAX_IDS_PER_LIST):
+        chunk = unique_ids[start:start + MAX_IDS_PER_LIST]
+        for video in list_all(youtube, "videos", VIDEO_FIELDS, part="snippet,status", id=",".join(chunk)):
+            videos[video['id']] = video
+    return videos
+
+def fetch_playlist(youtube, playlist_id):
+    """Returns the playlists resource (snippet) or None."""
+    for playlist in list_all(youtube, "playlists", PLAYLIST_FIELDS, part="snippet", id=playlist_id):
+        return playlist
+    return None
+
+def video_metadata_changed(current, body):
+    """True if the live video differs from the metadata update_video_metadata would write."""
+    if not current:
+        return True
+    snippet = current.get('snippet', {})
+    status = current.get('status', {})
+    wanted_snippet = body["snippet"]
+    wanted_status = body["status"]
+    return (
+        snippet.get('title') != wanted_snippet["title"]
+        or snippet.get('description') != wanted_snippet["description"]
+        or snippet.get('categoryId') != wanted_snippet["categoryId"]
+        or status.get('privacyStatus') != wanted_status["privacyStatus"]
+        or status.get('selfDeclaredMadeForKids', False) != wanted_status["selfDeclaredMadeForKids"]
+    )
+
+def playlist_metadata_changed(current, body):
+    if not current:
+        return True
+    snippet = current.get('snippet', {})
+    return (
+        snippet.get('title') != body["snippet"]["title"]
+        or snippet.get('description', "") != body["snippet"]["description"]
     )
-    while request:
-        response = request.execute()
-        items.extend(response.get('items', []))
-        request = youtube.playlistItems().list_next(request, response)
-    return items
+
+def get_playlist_items(youtube, playlist_id):
+    """
+    Returns a list of video items from the playlist (id, title, position, videoId).
+    """
+    return list_all(youtube, "playlistItems", PLAYLIST_ITEM_FIELDS, part="snippet,contentDetails", playlistId=playlist_id)
+
+def _playlist_item_body(playlist_id, video_id, position=None):
+    snippet = {
+        "playlistId": playlist_id,
+        "resourceId": {
+            "kind": "youtube#video",
+            "videoId": video_id
+        }
+    }
+    if position is not None:
+        snippet["position"] = position
+    return {"snippet": snippet}
+
+def op_request(youtube, playlist_id, op, position=True):
+    """Builds the (unexecuted) API request for one planned operation (see build_update_plan)."""
+    kind = op["op"]
+    if kind == "update_playlist":
+        return youtube.playlists().update(part="snippet", body=op["body"])
+    if kind == "delete":
+        return youtube.playlistItems().delete(id=op["item_id"])
+    if kind == "move":
+        body = _playlist_item_body(playlist_id, op["video_id"], op["position"])
+        body["id"] = op["item_id"]
+        return youtube.playlistItems().update(part="snippet", body=body)
+    if kind == "insert":
+        return youtube.playlistItems().insert(
+            part="snippet",
+            body=_playlist_item_body(playlist_id, op["video_id"], op["position"] if position else None)
+        )
+    if kind == "update_video":
+        return youtube.videos().update(part="snippet,status", body=op["body"])
+    if kind == "podcast_insert":
+        return youtube.playlistItems().insert(
+            part="snippet",
+            body=_playlist_item_body(op["playlist_id"], op["video_id"])
+        )
+    raise ValueError(f"Unknown operation '{kind}'")
+
+def describe_op(op):
+    kind = op["op"]
+    if kind == "update_playlist":
+        return "✅ Playlist metadata updated."
+    if kind == "delete":
+        return f"🗑️ Removed {op['video_id']}"
+    if kind == "move":
+        return f"↕️ Moved {op['video_id']} to position {op['position']}"
+    if kind == "insert":
+        return f"✅ Added {op['video_id']} at position {op['position']}"
+    if kind == "update_video":
+        return f"📝 Updated metadata for {op['video_id']}"
+    return f"🎙️ Added narration {op['video_id']} to global podcast playlist."
+
+def execute_op(youtube, playlist_id, op):
+    """Executes one planned operation on its own, retrying transient errors."""
+    call_with_retry(lambda: op_request(youtube, playlist_id, op).execute())
+    print(f"    {describe_op(op)}")
+
+def already_applied(youtube, playlist_id, op, desired_video_ids=None):
+    """
+    For an op that was started (or failed) in an interrupted run: True if it reached
+    YouTube anyway. Only inserts need a look; deletes treat 404 as done and updates
+    and moves are safe to repeat.
+    """
+    if op["op"] not in ("insert", "podcast_insert"):
+        return False
+    target = op["playlist_id"] if op["op"] == "podcast_insert" else playlist_id
+    response = call_with_retry(lambda: youtube.playlistItems().list(
+        part="snippet",
+        playlistId=target,
+        videoId=op["video_id"],
+        maxResults=50,
+        fields="items(snippet(position))"
+    ).execute())
+    found = response.get('items', [])
+    if op["op"] == "podcast_insert":
+        return bool(found)
+    if any(item.get('snippet', {}).get('position') == op["position"] for item in found):
+        return True
+    # Appended inserts are batched without positions; a video wanted once is enough to find
+    wanted = (desired_video_ids or []).count(op["video_id"])
+    return 0 < wanted <= len(found)
+
+def _settle_uncertain(youtube, playlist_id, ops, journal, desired_video_ids):
+    """Marks started/failed ops from an earlier run that did reach YouTube as done."""
+    pending = []
+    for op in ops:
+        if op["status"] in (STARTED, FAILED) and already_applied(youtube, playlist_id, op, desired_video_ids):
+            journal.mark([op], DONE)
+            print(f"    ⏭️ Already applied: {describe_op(op)}")
+        else:
+            pending.append(op)
+    return pending
+
+def _finish(journal, op, error):
+    """Records the outcome of one executed op; a delete that 404s was already done."""
+    if error is None or (op["op"] == "delete" and is_not_found(error)):
+        journal.record(op, DONE)
+        print(f"    {describe_op(op)}")
+        return True
+    journal.record(op, FAILED, error)
+    print(f"    ❌ Failed to {op['op']} {op.get('video_id', '')}: {error}")
+    return False
+
+def _run_single(youtube, playlist_id, op, journal):
+    journal.mark([op], STARTED)
+    try:
+        call_with_retry(lambda: op_request(youtube, playlist_id, op).execute())
+        error = None
+    except Exception as e:
+        error = e
+    ok = _finish(journal, op, error)
+    journal.save()
+    return [] if ok else [op]
+
+def _run_batch(youtube, playlist_id, ops, journal, position=True):
+    journal.mark(ops, STARTED)
+    entries = [(i, op_request(youtube, playlist_id, op, position=position)) for i, op in enumerate(ops)]
+    results = execute_batched(youtube, entries, retries=DEFAULT_RETRIES)
+    failed = [op for i, op in enumerate(ops) if not _finish(journal, op, results[i][1])]
+    journal.save()
+    return failed
+
+# Playlist order ops carry absolute positions that assume every earlier one succeeded
+ORDERED_OPS = {"delete", "move", "insert"}
+
+def group_order_ops(order_ops, playlist_length):
+    """
+    Splits move/insert ops into steps to run one after the other. Consecutive inserts
+    that each append to the end of the playlist form one step that can be batched
+    (without positions); every other op is a step of its own. Ops already marked done
+    (when resuming) only count towards the playlist length.
+    """
+    steps = []
+    length = playlist_length
+    for op in order_ops:
+        appends = op["op"] == "insert" and op["position"] == length
+        if op["op"] == "insert":
+            length += 1
+        if op.get("status") == DONE:
+            continue
+        if appends and steps and steps[-1]["append"]:
+            steps[-1]["ops"].append(op)
+        else:
+            steps.append({"append": appends, "ops": [op]})
+    return steps
+
+def apply_ops(youtube, playlist_id, ops, playlist_length=None, desired_video_ids=None, journal=None):
+    """
+    Applies planned operations using batch requests (up to 50 calls per round-trip):
+      1. everything whose order does not matter: playlist/video metadata, podcast
+         inserts and the deletes of the order sync,
+      2. moves and inserts in order; runs of inserts that append to the end of the
+         playlist are batched, everything else goes one request at a time.
+    A batch does not guarantee execution order, so when appends were batched the
+    playlist is re-listed and any items that landed out of order are moved.
+
+    Progress is recorded in journal (a SyncJournal over the same ops; in memory if
+    None). Ops already done are skipped, so a resumed journal continues where the
+    interrupted run stopped. Transient errors are retried with backoff; any other
+    failed order op stops the remaining order ops. Returns the number of failed ops.
+
+    playlist_length: item count before the deletes; without it no appends are batched.
+    """
+    if journal is None:
+        journal = SyncJournal.in_memory(ops)
+    ops = journal.ops
+
+    unordered = [op for op in ops if op["op"] not in ("move", "insert")]
+    order_ops = [op for op in ops if op["op"] in ("move", "insert")]
+
+    todo = _settle_uncertain(youtube, playlist_id, [op for op in unordered if op["status"] != DONE], journal, desired_video_ids)
+    failed = _run_batch(youtube, playlist_id, todo, journal) if todo else []
+    if not any(op["status"] != DONE for op in order_ops):
+        return len(failed)
+    if any(op["op"] == "delete" for op in failed):
+        print("    Skipping order changes; re-run with --resume once the deletes go through.")
+        return len(failed)
+
+    if playlist_length is not None:
+        length = playlist_length - sum(1 for op in unordered if op["op"] == "delete")
+        steps = group_order_ops(order_ops, length)
+    else:
+        steps = [{"append": False, "ops": [op]} for op in order_ops if op["status"] != DONE]
+
+    batched_appends = False
+    for step in steps:
+        step_ops = _settle_uncertain(youtube, playlist_id, step["ops"], journal, desired_video_ids)
+        if not step_ops:
+            continue
+        if len(step_ops) == 1:
+            step_failed = _run_single(youtube, playlist_id, step_ops[0], journal)
+        else:
+            batched_appends = True
+            step_failed = _run_batch(youtube, playlist_id, step_ops, journal, position=False)
+        if step_failed:
+            failed.extend(step_failed)
+            print("    Skipping remaining order changes; re-run with --resume to continue.")
+            return len(failed)
+
+    if batched_appends and desired_video_ids is not None:
+        fixes = plan_sync(get_playlist_items(youtube, playlist_id), desired_video_ids)
+        if fixes and all(op["op"] == "move" for op in fixes):
+            print(f"  Batched inserts landed out of order; applying {len(fixes)} moves...")
+            for op in fixes:
+                try:
+                    execute_op(youtube, playlist_id, op)
+                except Exception as e:
+                    print(f"    ❌ Failed to move {op['video_id']}: {e}")
+                    return len(failed) + 1
+        elif fixes:
+            print(f"  ⚠️ Playlist still differs from the plan ({summarize_ops(fixes)}); re-run to sync again.")
+    return len(failed)
+
+def build_update_plan(youtube, curated_playlist, podcast_playlist_id=None, podcast_index=None, reconcile_podcast=False):
+    """
+    Reads the live state (list calls only) and returns (ops, stats) describing every
+    mutation needed to make YouTube match curated_playlist.json:
+      update_playlist -> order ops from plan_sync -> update_video -> podcast_insert.
+    Metadata that already matches is left out; stats counts the calls that saves and
+    carries the playlist_length / desired_video_ids that apply_ops needs. Podcast
+    membership comes from the local PodcastIndex (a full scan only when it is out of
+    step or reconcile_podcast is set).
+    """
+    playlist_id = curated_playlist.playlist_id
+    items = curated_playlist.items
+    ops = []
+    stats = {"playlist_update_skipped": 0, "video_updates_skipped": 0}
+
+    # 1. Playlist metadata
+    title = curated_playlist.playlist_title or "Curated Playlist"
+    desc = curated_playlist.playlist_description or ""
+    playlist_body = playlist_metadata_body(playlist_id, title, desc)
+    try:
+        current_playlist = fetch_playlist(youtube, playlist_id)
+    except Exception as e:
+        print(f"⚠️ Could not fetch playlist metadata ({e}); will update it.")
+        current_playlist = None
+    if playlist_metadata_changed(current_playlist, playlist_body):
+        ops.append({"op": "update_playlist", "body": playlist_body})
+    else:
+        stats["playlist_update_skipped"] = 1
+
+    # 2. Playlist order (minimal diff instead of clear + rebuild)
+    print("Fetching current playlist items...")
+    current_items = get_playlist_items(youtube, playlist_id)
+
+    desired_video_ids = []
+    for i, item in enumerate(items):
+        if not item.video_id:
+            print(f"    ⚠️ Skipping item {i}: No video_id found")
+            continue
+        desired_video_ids.append(item.video_id)
+
+    sync_ops = plan_sync(current_items, desired_video_ids)
+    stats["playlist_length"] = len(current_items)
+    stats["desired_video_ids"] = desired_video_ids
+    print(f"Found {len(current_items)} items; {len(desired_video_ids)} wanted -> {summarize_ops(sync_ops)}.")
+    ops.extend(sync_ops)
+
+    # 3. Video metadata, compared against the live values in bulk
+    wanted = {}
+    for item in items:
+        if item.video_id and item.description:
+            wanted[item.video_id] = video_metadata_body(item.video_id, item.title, item.description)
+    if wanted:
+        print(f"Comparing metadata of {len(wanted)} videos...")
+        try:
+            current_videos = fetch_videos(youtube, list(wanted))
+        except Exception as e:
+            print(f"⚠️ Could not fetch current video metadata ({e}); updating all.")
+            current_videos = {}
+        for video_id, body in wanted.items():
+            if video_metadata_changed(current_videos.get(video_id), body):
+                ops.append({"op": "update_video", "video_id": video_id, "body": body})
+            else:
+                stats["video_updates_skipped"] += 1
+
+    # 4. Global podcast playlist (narrations only)
+    if podcast_playlist_id:
+        podcast_video_ids = set()
+        try:
+            if podcast_index is None:
+                podcast_index = PodcastIndex(podcast_playlist_id)
+            podcast_video_ids = podcast_index.refresh(youtube, force=reconcile_podcast)
+        except Exception as e:
+             print(f"⚠️ Error fetching podcast playlist: {e}")
+
+        for item in items:
+            vid_id = item.video_id
+            if vid_id and item.kind == "narration" and vid_id not in podcast_video_ids:
+                ops.append({"op": "podcast_insert", "video_id": vid_id, "playlist_id": podcast_playlist_id})
+                podcast_video_ids.add(vid_id)
+
+    return ops, stats
+
+def estimate_round_trips(ops, playlist_length):
+    """HTTP round-trips apply_ops will need for ops (excluding the post-batch re-list)."""
+    unordered = [op for op in ops if op["op"] not in ("move", "insert")]
+    order_ops = [op for op in ops if op["op"] in ("move", "insert")]
+    deletes = sum(1 for op in unordered if op["op"] == "delete")
+    trips = -(-len(unordered) // MAX_BATCH_SIZE)
+    for step in group_order_ops(order_ops, playlist_length - deletes):
+        trips += -(-len(step["ops"]) // MAX_BATCH_SIZE)
+    return trips
+
+# API method behind each planned operation (for quota estimates)
+OP_METHODS = {
+    "update_playlist": "playlists.update",
+    "delete": "playlistItems.delete",
+    "move": "playlistItems.update",
+    "insert": "playlistItems.insert",
+    "update_video": "videos.update",
+    "podcast_insert": "playlistItems.insert",
+}
+
+def estimate_plan_cost(ops, desired_count=0):
+    """Quota units apply_ops will spend, including the re-list that checks batched appends."""
+    cost = sum(method_cost(OP_METHODS[op["op"]]) for op in ops)
+    if any(op["op"] == "insert" for op in ops):
+        cost += max(1, -(-desired_count // MAX_IDS_PER_LIST)) * method_cost("playlistItems.list")
+    return cost
+
+def ops_within_budget(ops, budget, desired_count=0):
+    """
+    Longest prefix of ops whose estimated cost fits the budget. The plan is ordered
+    (playlist metadata, order sync, video metadata, podcast), so a prefix is always
+    safe to apply and the next run re-plans the rest from the live playlist.
+    """
+    for end in range(len(ops), -1, -1):
+        if estimate_plan_cost(ops[:end], desired_count) <= budget:
+            return ops[:end]
+    return []
+
+def print_plan(ops, stats):
+    counts = {}
+    for op in ops:
+        counts[op["op"]] = counts.get(op["op"], 0) + 1
+    print("\n📋 Planned changes:")
+    if not ops:
+        print("  Nothing to do, YouTube already matches curated_playlist.json.")
+    for op in ops:
+        detail = op.get("video_id") or op.get("body", {}).get("snippet", {}).get("title", "")
+        position = f" @ {op['position']}" if "position" in op else ""
+        print(f"  - {op['op']}: {detail}{position}")
+    saved = stats["playlist_update_skipped"] + stats["video_updates_skipped"]
+    print(f"\n  {len(ops)} write calls planned ({', '.join(f'{v} {k}' for k, v in counts.items()) or 'none'}), "
+          f"~{estimate_round_trips(ops, stats.get('playlist_length', 0))} batched round-trips.")
+    print(f"  {saved} update calls saved by skipping unchanged metadata "
+          f"({stats['video_updates_skipped']} videos, {stats['playlist_update_skipped']} playlist).")
 
 def main():
     parser = argparse.ArgumentParser(description="Update playlist from curated_playlist.json")
     parser.add_argument("playlist_dir", help="Path to the playlist directory (e.g. data/playlists/space_jazz)")
+    parser.add_argument("--dry-run", action="store_true", help="Only read YouTube and report the planned changes")
+    parser.add_argument("--split", action="store_true", help="If the plan exceeds today's remaining quota, apply what fits and leave the rest for the next run")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted update from its sync journal instead of planning a new one")
+    parser.add_argument("--reconcile-podcast", action="store_true", help="Rescan the whole podcast playlist instead of trusting the local index")
     args = parser.parse_args()
     
     # Load global config for podcast playlist
@@ -195,98 +561,97 @@ def main():
     youtube = get_authenticated_service()
     if not youtube:
         return
+    tracker = QuotaTracker(daily_limit=global_config.youtube_daily_quota)
+    youtube = QuotaAwareService(youtube, tracker)
         
-    # 1. Update Playlist Metadata
-    title = curated_playlist.playlist_title or "Curated Playlist"
-    desc = curated_playlist.playlist_description or ""
-    update_playlist_metadata(youtube, playlist_id, title, desc)
-    
-    # 2. Clear Playlist
-    print("Fetching current playlist items to clear...")
-    current_items = get_playlist_items(youtube, playlist_id)
-    print(f"Found {len(current_items)} items to clear.")
-    
-    for item in current_items:
-        try:
-            youtube.playlistItems().delete(id=item['id']).execute()
-            # print(f"  Deleted item {item['id']}")
-        except Exception as e:
-            print(f"  ❌ Failed to delete item {item['id']}: {e}")
+    podcast_index = PodcastIndex(podcast_playlist_id) if podcast_playlist_id else None
 
-    # Pre-fetch podcast playlist items if configured
-    podcast_video_ids = set()
-    if podcast_playlist_id:
-        print(f"Fetching podcast playlist ({podcast_playlist_id}) items...")
-        try:
-            p_items = get_playlist_items(youtube, podcast_playlist_id)
-            for item in p_items:
-                podcast_video_ids.add(item['contentDetails']['videoId'])
-        except Exception as e:
-             print(f"⚠️ Error fetching podcast playlist: {e}")
+    journal = SyncJournal.load(playlist_dir)
+    if args.resume and journal and not journal.is_complete() and journal.data.get("playlist_id") == playlist_id:
+        remaining_ops = journal.incomplete()
+        desired_video_ids = journal.data.get("desired_video_ids")
+        complete = not journal.data.get("partial", False)
+        print(f"🔁 Resuming the sync started {journal.data.get('created')}: "
+              f"{len(remaining_ops)} of {len(journal.ops)} operations left.")
+        cost = estimate_plan_cost(remaining_ops, len(desired_video_ids or []))
+        print(f"📊 Estimated cost: {cost} units. Quota: {tracker.summary()}.")
+        if args.dry_run:
+            print("\nDry run: no changes made.")
+            return
+        if cost > tracker.remaining():
+            print(f"❌ Not enough quota left today ({tracker.remaining()} units) to resume ({cost} units).")
+            print("   Re-run with --resume after midnight Pacific time.")
+            return
+    else:
+        if args.resume:
+            print("No unfinished sync journal for this playlist; planning a fresh sync.")
+        elif journal and not journal.is_complete():
+            print(f"⚠️ An unfinished sync from {journal.data.get('created')} will be replaced "
+                  "(the new plan starts from the playlist's current state; use --resume to continue it instead).")
 
-    # 3. Rebuild from JSON
-    print("Rebuilding playlist...")
-    items = curated_playlist.items
-    
-    print(f"  Adding {len(items)} items to playlist...")
-    for i, item in enumerate(items):
-        vid_id = item.video_id
-        if not vid_id:
-            print(f"    ⚠️ Skipping item {i}: No video_id found")
-            continue
-            
-        kind = item.kind or "video"
-        
-        # Add to main playlist (Sequential)
-        try:
-            body = {
-                "snippet": {
-                    "playlistId": playlist_id,
-                    "resourceId": {
-                        "kind": "youtube#video",
-                        "videoId": vid_id
-                    }
-                }
-            }
-            # Position is implicitly "end of playlist", which preserves order during sequential insert
-            youtube.playlistItems().insert(
-                part="snippet",
-                body=body
-            ).execute()
-            print(f"    ✅ Added {kind}: {item.title or vid_id}")
-        except Exception as e:
-            print(f"    ❌ Failed to add item {vid_id}: {e}")
-            
-        # 4. Update Video Metadata if needed
-        description = item.description
-        if description:
-            update_video_metadata(youtube, vid_id, item.title, description)
-
-        # 5. Add to Global Podcast Playlist (Narrations ONLY)
-        if podcast_playlist_id and kind == "narration":
-            if vid_id not in podcast_video_ids:
-                print(f"    🎙️ Adding narration {vid_id} to global podcast playlist...")
-                try:
-                    podcast_body = {
-                        "snippet": {
-                            "playlistId": podcast_playlist_id,
-                            "resourceId": {
-                                "kind": "youtube#video",
-                                "videoId": vid_id
-                            }
-                        }
-                    }
-                    youtube.playlistItems().insert(
-                        part="snippet",
-                        body=podcast_body
-                    ).execute()
-                    podcast_video_ids.add(vid_id)
-                    print("      ✅ Added to podcast playlist.")
-                except Exception as e:
-                    print(f"      ❌ Failed to add to podcast playlist: {e}")
+        ops, stats = build_update_plan(
+            youtube, curated_playlist, podcast_playlist_id,
+            podcast_index=podcast_index, reconcile_podcast=args.reconcile_podcast
+        )
+        print_plan(ops, stats)
+
+        desired_video_ids = stats["desired_video_ids"]
+        desired_count = len(desired_video_ids)
+        cost = estimate_plan_cost(ops, desired_count)
+        print(f"\n📊 Estimated cost: {cost} units. Quota: {tracker.summary()}.")
+
+        if args.dry_run:
+            print("\nDry run: no changes made.")
+            return
+
+        complete = True
+        remaining = tracker.remaining()
+        if cost > remaining:
+            if not args.split:
+                print(f"❌ Not enough quota left today ({remaining} units) for this update ({cost} units).")
+                print("   Re-run after midnight Pacific time, or use --split to apply part of it now.")
+                return
+            ops = ops_within_budget(ops, remaining, desired_count)
+            complete = False
+            print(f"✂️ Applying the first {len(ops)} operations ({estimate_plan_cost(ops, desired_count)} units); "
+                  "re-run after midnight Pacific time to continue.")
+            if not ops:
+                return
+
+        journal = SyncJournal.create(
+            playlist_dir, playlist_id, ops,
+            playlist_length=stats["playlist_length"],
+            desired_video_ids=desired_video_ids,
+            partial=not complete
+        )
+
+    print("\nApplying changes...")
+    try:
+        failures = apply_ops(
+            youtube, playlist_id, journal.ops,
+            playlist_length=journal.data["playlist_length"],
+            desired_video_ids=desired_video_ids if complete else None,
+            journal=journal
+        )
+    except KeyboardInterrupt:
+        print(f"\n⏹️ Interrupted. Progress is saved in {journal.path}; run again with --resume to continue.")
+        return
+    finally:
+        print(f"📊 Quota: {tracker.summary()}.")
+        if podcast_index:
+            podcast_index.add(op["video_id"] for op in journal.ops if op["op"] == "podcast_insert" and op["status"] == DONE)
+
+    if journal.is_complete():
+        journal.remove()
+    else:
+        print(f"\n⚠️ {len(journal.incomplete())} operations did not complete ({failures} failed); "
+              "fix the cause (or wait for the quota reset) and run again with --resume.")
+        return
+    if not complete:
+        print("\n⏸️ Partial update applied; run again tomorrow to finish.")
+        return
 
     print("\n🎉 Playlist update complete!")
 
 if __name__ == "__main__":
     main()
-
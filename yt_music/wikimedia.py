@@ -0,0 +1,141 @@
+"""
+Image attribution from Wikimedia Commons, resolved in bulk.
+
+The MediaWiki API accepts up to 50 titles per query, so all filenames of a playlist
+are looked up together over the shared pooled session (core.clients). Results (including "not on
+Commons") are kept in data/wikimedia_attribution.json and shared across playlists.
+"""
+import json
+import os
+import re
+from urllib.parse import unquote
+
+from core.clients import get_http_session
+from core.config import DATA_DIR
+
+COMMONS_API_URL = "https://commons.wikimedia.org/w/api.php"
+USER_AGENT = 'PlaylistCurator/1.0 (https://github.com/yourusername/playlist-curator; contact@example.com)'
+MAX_TITLES_PER_QUERY = 50
+ATTRIBUTION_CACHE_FILE = os.path.join(DATA_DIR, "wikimedia_attribution.json")
+
+def filename_from_url(image_url: str) -> str:
+    """'https://upload.wikimedia.org/.../Miles_Davis_1955.jpg' -> 'Miles_Davis_1955.jpg'"""
+    if image_url.startswith('file://'):
+        image_url = image_url.replace('file://', '')
+    return unquote(os.path.basename(image_url.split('?')[0]))
+
+
+def normalize_title(filename: str) -> str:
+    """The title MediaWiki would normalise to: spaces, first letter upper case."""
+    name = filename_from_url(filename).replace('_', ' ').strip()
+    return name[:1].upper() + name[1:]
+
+
+def _clean_html(raw_html):
+    return re.sub(re.compile('<.*?>'), '', raw_html)
+
+
+def format_attribution(filename: str, metadata: dict) -> str:
+    artist = _clean_html(metadata.get('Artist', {}).get('value', 'Unknown'))
+    license_name = metadata.get('LicenseShortName', {}).get('value', 'Unknown License')
+    license_url = metadata.get('LicenseUrl', {}).get('value', '')
+    source_url = f"https://commons.wikimedia.org/wiki/File:{filename.replace(' ', '_')}"
+    return f"\n\nImage Credit:\nTitle: {filename}\nAuthor: {artist}\nSource: {source_url}\nLicense: {license_name} {license_url}"
+
+
+def _load_cache(path):
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️ Could not read attribution cache {path} ({e}); starting empty.")
+    return {}
+
+
+def _save_cache(path, cache):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _query_titles(titles):
+    """
+    One batched imageinfo query (following 'continue'). Returns {requested title:
+    extmetadata or None if the file does not exist}.
+    """
+    params = {
+        "action": "query",
+        "titles": "|".join(f"File:{title}" for title in titles),
+        "prop": "imageinfo",
+        "iiprop": "extmetadata",
+        "redirects": 1,
+        "format": "json"
+    }
+    pages = {}
+    aliases = {}
+    continuation = {}
+    while True:
+        # Wikimedia asks API clients for a descriptive, contactable User-Agent
+        resp = get_http_session().get(COMMONS_API_URL, params={**params, **continuation},
+                                      headers={'User-Agent': USER_AGENT}, timeout=30)
+        resp.raise_for_status()
+        data = resp.json()
+        query = data.get('query', {})
+        # Map e.g. "File:miles davis.jpg" -> "File:Miles davis.jpg", then redirects
+        for step in query.get('normalized', []) + query.get('redirects', []):
+            aliases[step['from']] = step['to']
+        for page in query.get('pages', {}).values():
+            merged = pages.setdefault(page['title'], page)
+            if merged is not page and page.get('imageinfo'):
+                merged['imageinfo'] = page['imageinfo']
+        if 'continue' not in data:
+            break
+        continuation = data['continue']
+
+    results = {}
+    for title in titles:
+        page_title = f"File:{title}"
+        while page_title in aliases:
+            page_title = aliases[page_title]
+        page = pages.get(page_title)
+        if page is None or 'missing' in page or not page.get('imageinfo'):
+            results[title] = None
+        else:
+            results[title] = page['imageinfo'][0].get('extmetadata', {})
+    return results
+
+
+def fetch_attributions(filenames, cache_path: str = ATTRIBUTION_CACHE_FILE) -> dict:
+    """
+    Returns {filename: attribution text or None} for image filenames or URLs.
+    Only filenames missing from the cache hit the network, 50 per request.
+    """
+    cache = _load_cache(cache_path)
+    titles = {filename: normalize_title(filename) for filename in filenames}
+
+    missing = sorted({title for title in titles.values() if title and title not in cache})
+    if missing:
+        print(f"    🔍 Looking up {len(missing)} images on Wikimedia Commons...")
+    for start in range(0, len(missing), MAX_TITLES_PER_QUERY):
+        chunk = missing[start:start + MAX_TITLES_PER_QUERY]
+        try:
+            found = _query_titles(chunk)
+        except Exception as e:
+            # Leave these uncached so the next run tries again
+            print(f"      ⚠️ Error fetching attribution: {e}")
+            continue
+        for title, metadata in found.items():
+            cache[title] = format_attribution(title.replace(' ', '_'), metadata) if metadata is not None else None
+        _save_cache(cache_path, cache)
+
+    results = {}
+    for filename, title in titles.items():
+        results[filename] = cache.get(title)
+        if title in cache and cache[title] is None:
+            print(f"      ⚠️ Image not found on Wikimedia Commons: {filename}")
+    return results